@@ -47,7 +47,7 @@ class IsAuthenticatedAndAgentForWrite(permissions.BasePermission):
             return True
 
         # Write permissions are only allowed to the agent who created it
-        return request.user.is_agent and obj.created_by == request.user
+        return request.user.is_agent and obj.created_by_id == request.user.id
 
 
 class PropertyFilter(django_filters.FilterSet):
@@ -175,7 +175,7 @@ class PropertyViewSet(viewsets.ModelViewSet):
         queryset = super().get_queryset()
         my_properties = self.request.query_params.get("my_properties", None)
         if my_properties and self.request.user.is_agent:
-            queryset = queryset.filter(created_by=self.request.user)
+            queryset = queryset.filter(created_by_id=self.request.user.id)
         return queryset
 
     def perform_create(self, serializer):
@@ -0,0 +1,116 @@
+"""Async API views.
+
+`AsyncGenericAPIView` is DRF's `GenericAPIView` with an async `dispatch`. Its
+handlers are coroutines reading through the async ORM, so under ASGI a request
+waiting on the database does not hold a worker thread. Authenticators with an
+`aauthenticate` coroutine are awaited, others run in a thread, as do permission
+and throttle checks: a database user loads its roles lazily.
+"""
+
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import exceptions, generics
+
+
+async def aauthenticate(request):
+    """Await `Request._authenticate` of DRF, which has no async counterpart.
+
+    This is the one place Request internals are relied on: the loop mirrors
+    `_authenticate` step for step, recording the authenticator in
+    `_authenticator` and resetting through `_not_authenticated()` as it does,
+    and the tests compare both on the same requests.
+    """
+    for authenticator in request.authenticators:
+        authenticate = getattr(authenticator, "aauthenticate", None)
+        if authenticate is None:
+            authenticate = sync_to_async(authenticator.authenticate)
+        try:
+            user_auth_tuple = await authenticate(request)
+        except exceptions.APIException:
+            request._not_authenticated()
+            raise
+
+        if user_auth_tuple is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth_tuple
+            return
+    request._not_authenticated()
+
+
+class AsyncGenericAPIView(generics.GenericAPIView):
+    """`GenericAPIView` serving reads from `async def get()`"""
+
+    http_method_names = ["get", "head", "options"]
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            method = request.method.lower()
+            if method in self.http_method_names:
+                handler = getattr(self, method, self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        """`initial` awaiting authentication"""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        await sync_to_async(self.check_permissions)(request)
+        if self.throttle_classes:
+            await sync_to_async(self.check_throttles)(request)
+
+    async def aperform_authentication(self, request):
+        """Authenticate `request` up front, `request.user` is set afterwards"""
+        await aauthenticate(request)
+
+    async def aget_object(self):
+        """`get_object` through the async ORM"""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except (
+            queryset.model.DoesNotExist,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ) as e:
+            model_name = queryset.model._meta.object_name
+            raise Http404(f"No {model_name} matches the given query.") from e
+
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        """`paginate_queryset` with a paginator providing `apaginate_queryset`"""
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
@@ -0,0 +1,192 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend.models import RoleChecksMixin
+
+User = get_user_model()
+
+ROLES_CLAIM = "roles"
+IS_ACTIVE_CLAIM = "is_active"
+IS_SUPERUSER_CLAIM = "is_superuser"
+
+
+def add_user_claims(token, user):
+    """Embed everything role checks need into the token"""
+    token[ROLES_CLAIM] = sorted(user.role_names)
+    token[IS_ACTIVE_CLAIM] = user.is_active
+    token[IS_SUPERUSER_CLAIM] = user.is_superuser
+    return token
+
+
+class RoleRefreshToken(RefreshToken):
+    """Refresh token issuing access tokens with the user's current roles"""
+
+    @classmethod
+    def for_user(cls, user):
+        return add_user_claims(super().for_user(user), user)
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}
+        ).first()
+        if user is not None:
+            add_user_claims(access, user)
+        return access
+
+
+class ValidatedTokenCache:
+    """Bounded LRU of validated tokens keyed by a digest of the raw token.
+
+    Entries expire together with the token's `exp` claim, so a cached token is
+    never accepted after simplejwt itself would have rejected it.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(raw_token):
+        return hashlib.sha256(raw_token).digest()
+
+    def get(self, raw_token):
+        key = self.make_key(raw_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, token = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return token
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def set(self, raw_token, token):
+        if self.maxsize <= 0 or "exp" not in token:
+            return
+
+        key = self.make_key(raw_token)
+        with self._lock:
+            self._entries[key] = (token["exp"], token)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+validated_token_cache = ValidatedTokenCache(settings.JWT_VALIDATED_TOKEN_CACHE_SIZE)
+
+
+class RoleTokenUser(RoleChecksMixin, TokenUser):
+    """User built from access token claims without touching the database"""
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def is_active(self):
+        return self.token.get(IS_ACTIVE_CLAIM, False)
+
+    @cached_property
+    def role_names(self):
+        return frozenset(self.token.get(ROLES_CLAIM, ()))
+
+    @cached_property
+    def user(self):
+        """The full user row, loaded on first access"""
+        return User.objects.get(pk=self.id)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT authentication trusting the role claims of the access token.
+
+    The user row is only loaded for view actions listed in the view's
+    `db_user_actions` attribute or the `JWT_DB_USER_ACTIONS` setting, and for
+    tokens issued before role claims were added.
+
+    Validated tokens are kept in `token_cache`, so repeated requests with the
+    same access token skip decoding and signature verification.
+    """
+
+    token_cache = validated_token_cache
+
+    def authenticate(self, request):
+        self.request = request
+        return super().authenticate(request)
+
+    async def aauthenticate(self, request):
+        """`authenticate` for async views, a user row is loaded in a thread"""
+        self.request = request
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if self.requires_db_user(validated_token):
+            return await sync_to_async(self.get_user)(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_validated_token(self, raw_token):
+        if self.token_cache is None:
+            return super().get_validated_token(raw_token)
+
+        token = self.token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            self.token_cache.set(raw_token, token)
+        return token
+
+    def requires_db_user(self, validated_token):
+        if ROLES_CLAIM not in validated_token:
+            return True
+
+        view = self.request.parser_context.get("view")
+        actions = getattr(view, "db_user_actions", settings.JWT_DB_USER_ACTIONS)
+        return getattr(view, "action", None) in actions
+
+    def get_user(self, validated_token):
+        if self.requires_db_user(validated_token):
+            return super().get_user(validated_token)
+
+        user = RoleTokenUser(validated_token)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
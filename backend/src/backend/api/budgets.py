@@ -0,0 +1,151 @@
+"""SQL query budgets per view action.
+
+A view declares the most queries each action may run, either in a
+`query_budgets` mapping of action names or with `@query_budget()` on the action
+method. Budgets are independent of the page size, an action whose query count
+grows with the rows it returns is an N+1 and exceeds them. The queries of a
+streaming response are counted until its content is consumed.
+"""
+
+import logging
+import traceback
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def query_budget(max_queries):
+    """Declare the most queries the decorated view action may run"""
+
+    def decorator(func):
+        func.query_budget = max_queries
+        return func
+
+    return decorator
+
+
+def get_query_budget(view):
+    """Query budget of the action `view` handled, None without one"""
+    action = getattr(view, "action", None)
+    if action is None:
+        return None
+
+    budgets = getattr(view, "query_budgets", {})
+    if action in budgets:
+        return budgets[action]
+    return getattr(getattr(view, action, None), "query_budget", None)
+
+
+class QueryRecorder:
+    """Records the queries run on every database connection while active.
+
+    `connection.queries` is reset when a request starts and only kept with
+    DEBUG, so queries are captured with an execute wrapper instead. With
+    `capture_stack` each query also keeps the stack that ran it.
+    """
+
+    def __init__(self, capture_stack=False):
+        self.capture_stack = capture_stack
+        self.queries = []
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(
+                connection.execute_wrapper(self.wrapper_for(connection.alias))
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def __len__(self):
+        return len(self.queries)
+
+    def wrapper_for(self, alias):
+        def record(execute, sql, params, many, context):
+            stack = traceback.format_stack()[:-1] if self.capture_stack else None
+            self.queries.append({"alias": alias, "sql": sql, "stack": stack})
+            return execute(sql, params, many, context)
+
+        return record
+
+
+def describe_violation(view, budget, queries):
+    """Human readable report of an action running more queries than budgeted"""
+    lines = [
+        f"{type(view).__name__}.{view.action} ran {len(queries)} queries, "
+        f"its budget is {budget}:"
+    ]
+    for number, query in enumerate(queries, 1):
+        lines.append(f"{number}. [{query['alias']}] {query['sql']}")
+        if query["stack"]:
+            lines.append("".join(query["stack"]).rstrip())
+    return "\n".join(lines)
+
+
+class QueryBudgetMiddleware:
+    """Logs requests whose view action exceeds its query budget.
+
+    Meant for development, it is only enabled with `QUERY_BUDGET_WARNINGS`. The
+    warning lists every query of the request with the stack that ran it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_WARNINGS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with QueryRecorder(capture_stack=True) as recorder:
+            response = self.get_response(request)
+        return self.check_when_done(request, response, recorder)
+
+    async def __acall__(self, request):
+        # The async ORM queries from the request's sync thread, record there
+        recorder = QueryRecorder(capture_stack=True)
+        await sync_to_async(recorder.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recorder.__exit__)(None, None, None)
+        return self.check_when_done(request, response, recorder)
+
+    def check_when_done(self, request, response, recorder):
+        if response.streaming and not response.is_async:
+            response.streaming_content = self.stream(
+                request, response, recorder, response.streaming_content
+            )
+        else:
+            self.check(request, response, recorder)
+        return response
+
+    def stream(self, request, response, recorder, content):
+        """Record the queries run while `content` is consumed, then check"""
+        with recorder:
+            yield from content
+        self.check(request, response, recorder)
+
+    def check(self, request, response, recorder):
+        view = (getattr(response, "renderer_context", None) or {}).get("view")
+        budget = get_query_budget(view)
+        if budget is not None and len(recorder) > budget:
+            logger.warning(
+                "%s %s\n%s",
+                request.method,
+                request.path,
+                describe_violation(view, budget, recorder.queries),
+            )
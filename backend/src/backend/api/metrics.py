@@ -0,0 +1,340 @@
+"""Request phase timings and in-process request metrics.
+
+`ServerTimingMiddleware` times every request, its database queries and, for
+views using `ServerTimingMixin`, authentication, permission checks,
+serialization and rendering. Queries run during authentication or a permission
+check are timed in that phase rather than `db`, so the phases do not overlap.
+The phases are sent back in a `Server-Timing` header and aggregated per view
+into `metrics`, which `metrics_view` exposes in the Prometheus text format
+along with the connection pool statistics. The aggregates are per process,
+every worker is scraped on its own.
+"""
+
+import bisect
+import hmac
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+from .properties import cache as property_cache
+
+# Upper bounds in seconds of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PHASES = ("auth", "perm", "db", "serialize", "render")
+
+
+class RequestTimings:
+    """Seconds spent per phase of one request, and the queries it ran"""
+
+    def __init__(self):
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.current = None
+
+    def add(self, phase, seconds):
+        self.phases[phase] += seconds
+
+    @contextmanager
+    def measure(self, phase):
+        outer, self.current = self.current, phase
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+            self.current = outer
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.perf_counter() - start
+            if self.current is None:
+                self.add("db", seconds)
+            self.queries += 1
+
+    def header(self, total):
+        parts = [
+            f"{phase};dur={seconds * 1000:.2f}"
+            for phase, seconds in self.phases.items()
+            if seconds
+        ]
+        parts.append(f'queries;desc="{self.queries} queries"')
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+class Metrics:
+    """Thread-safe request counters and latency histograms per view and method"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.responses = {}
+            self.durations = {}
+            self.queries = {}
+            self.phases = {}
+
+    def observe(self, view, method, status, total, timings):
+        series = (view, method)
+        bucket = bisect.bisect_left(DURATION_BUCKETS, total)
+        with self._lock:
+            key = (view, method, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+            histogram = self.durations.get(series)
+            if histogram is None:
+                histogram = self.durations[series] = {
+                    "buckets": [0] * (len(DURATION_BUCKETS) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            histogram["buckets"][bucket] += 1
+            histogram["sum"] += total
+            histogram["count"] += 1
+
+            self.queries[series] = self.queries.get(series, 0) + timings.queries
+            for phase, seconds in timings.phases.items():
+                key = (view, method, phase)
+                self.phases[key] = self.phases.get(key, 0.0) + seconds
+
+    def render(self):
+        """The metrics in the Prometheus text exposition format"""
+        with self._lock:
+            responses = dict(self.responses)
+            durations = {
+                series: {**histogram, "buckets": list(histogram["buckets"])}
+                for series, histogram in self.durations.items()
+            }
+            queries = dict(self.queries)
+            phases = dict(self.phases)
+
+        lines = [
+            "# HELP http_responses_total Responses sent, by view, method and status.",
+            "# TYPE http_responses_total counter",
+        ]
+        for (view, method, status), count in sorted(responses.items()):
+            lines.append(
+                f"http_responses_total{labels(view=view, method=method, status=status)} "
+                f"{count}"
+            )
+
+        lines += [
+            "# HELP http_request_duration_seconds Request duration, by view and method.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (view, method), histogram in sorted(durations.items()):
+            cumulative = 0
+            bounds = [*(str(bound) for bound in DURATION_BUCKETS), "+Inf"]
+            for bound, count in zip(bounds, histogram["buckets"]):
+                cumulative += count
+                lines.append(
+                    "http_request_duration_seconds_bucket"
+                    f"{labels(view=view, method=method, le=bound)} {cumulative}"
+                )
+            lines.append(
+                f"http_request_duration_seconds_sum{labels(view=view, method=method)} "
+                f"{histogram['sum']}"
+            )
+            lines.append(
+                f"http_request_duration_seconds_count{labels(view=view, method=method)} "
+                f"{histogram['count']}"
+            )
+
+        lines += [
+            "# HELP http_request_db_queries_total Database queries, by view and method.",
+            "# TYPE http_request_db_queries_total counter",
+        ]
+        for (view, method), count in sorted(queries.items()):
+            lines.append(
+                f"http_request_db_queries_total{labels(view=view, method=method)} {count}"
+            )
+
+        lines += [
+            "# HELP http_request_phase_seconds_total Time spent per request phase.",
+            "# TYPE http_request_phase_seconds_total counter",
+        ]
+        for (view, method, phase), seconds in sorted(phases.items()):
+            lines.append(
+                "http_request_phase_seconds_total"
+                f"{labels(view=view, method=method, phase=phase)} {seconds}"
+            )
+
+        lines += [
+            "# HELP property_response_cache_total Property responses served from the "
+            "response cache.",
+            "# TYPE property_response_cache_total counter",
+        ]
+        stats = property_cache.response_cache_stats()
+        for result in property_cache.METRICS:
+            lines.append(
+                f"property_response_cache_total{labels(result=result)} {stats[result]}"
+            )
+
+        pools = get_pool_stats()
+        for name in sorted({name for stats in pools.values() for name in stats}):
+            lines += [
+                f"# HELP db_pool_{name} Connection pool `{name}` statistic, by database.",
+                f"# TYPE db_pool_{name} gauge",
+            ]
+            for alias, stats in sorted(pools.items()):
+                if name in stats:
+                    lines.append(
+                        f"db_pool_{name}{labels(database=alias)} {stats[name]}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(**values):
+    pairs = ",".join(f'{name}="{escape(value)}"' for name, value in values.items())
+    return f"{{{pairs}}}"
+
+
+metrics = Metrics()
+
+
+def get_pool_stats():
+    """psycopg_pool statistics of the pooled databases, by alias"""
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
+
+
+def get_view_name(request):
+    """Metric label of the route `request` matched, bounded to the URLconf"""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route
+
+
+class ServerTimingMiddleware:
+    """Times requests into a `Server-Timing` header and `metrics`.
+
+    Under ASGI the query wrappers are installed from the request's sync thread,
+    where the async ORM runs its queries.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timings = request.server_timing = RequestTimings()
+        start = time.perf_counter()
+        with self.record_queries(timings):
+            response = self.get_response(request)
+        return self.finish(request, response, timings, start)
+
+    async def __acall__(self, request):
+        timings = request.server_timing = RequestTimings()
+        start = time.perf_counter()
+        stack = await sync_to_async(self.record_queries)(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, timings, start)
+
+    def record_queries(self, timings):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timings.record_query))
+        return stack
+
+    def finish(self, request, response, timings, start):
+        total = time.perf_counter() - start
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = timings.header(total)
+        metrics.observe(
+            get_view_name(request), request.method, response.status_code, total, timings
+        )
+        return response
+
+
+class ServerTimingMixin:
+    """Splits the request time of an API view into its phases.
+
+    Authentication and permission checks are timed directly. The rest of the
+    view, less its queries, is counted as serialization, and rendering from
+    the end of the view until the response is rendered.
+    """
+
+    def get_timings(self, request):
+        return getattr(request, "server_timing", None)
+
+    def perform_authentication(self, request):
+        timings = self.get_timings(request)
+        if timings is None:
+            return super().perform_authentication(request)
+        with timings.measure("auth"):
+            return super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        timings = self.get_timings(request)
+        if timings is None:
+            return super().check_permissions(request)
+        with timings.measure("perm"):
+            return super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        timings = self.get_timings(request)
+        if timings is None:
+            return super().check_object_permissions(request, obj)
+        with timings.measure("perm"):
+            return super().check_object_permissions(request, obj)
+
+    def dispatch(self, request, *args, **kwargs):
+        timings = self.get_timings(request)
+        if timings is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        before = dict(timings.phases)
+        start = time.perf_counter()
+        response = super().dispatch(request, *args, **kwargs)
+        end = time.perf_counter()
+
+        measured = sum(timings.phases[phase] - before[phase] for phase in PHASES)
+        timings.add("serialize", max(end - start - measured, 0.0))
+        if hasattr(response, "add_post_render_callback") and not response.is_rendered:
+            response.add_post_render_callback(
+                lambda rendered: timings.add("render", time.perf_counter() - end)
+            )
+        return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, needs the `METRICS_TOKEN` as bearer token"""
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+    authorization = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
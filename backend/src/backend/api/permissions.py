@@ -18,5 +18,5 @@ class IsAuthenticatedAndAgentForWrite(IsAuthenticated):
 
     def has_object_permission(self, request, view, obj):
         if request.method in ["PUT", "PATCH", "DELETE"]:
-            return obj.created_by == request.user
+            return obj.created_by_id == request.user.id
         return True
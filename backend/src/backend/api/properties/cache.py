@@ -0,0 +1,159 @@
+"""Caching of derived property data and API responses.
+
+Entries embed a global properties version that every property write bumps,
+so stale entries are never read again and simply expire. The version only
+reaches every worker through a shared cache, the caches are off without one.
+"""
+
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = "properties:version"
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Missing or evicted, any fresh value invalidates the old entries
+        cache.add(VERSION_KEY, 1, timeout=None)
+
+
+def normalize_params(query_params, ignored=()):
+    """Query parameters as a sorted list, independent of their order in the URL"""
+    return sorted(
+        (key, sorted(values))
+        for key, values in query_params.lists()
+        if key not in ignored and any(values)
+    )
+
+
+def digest(*parts):
+    """Hash of `parts`, keeps keys within the backends' length limits"""
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def make_key(prefix, *parts, version=None):
+    """Versioned cache key for `parts`"""
+    if version is None:
+        version = get_version()
+    return f"{prefix}:{version}:{digest(*parts)}"
+
+
+RESPONSE_PREFIX = "property_response"
+METRICS = ("hit", "miss", "stale")
+
+
+# Outcomes served by this process, like `api.metrics` every worker is
+# scraped on its own rather than counting into the cache on each request
+stats = dict.fromkeys(METRICS, 0)
+stats_lock = threading.Lock()
+
+
+def record(metric):
+    with stats_lock:
+        stats[metric] += 1
+
+
+def response_cache_stats():
+    """Hits, misses and stale responses served by this process"""
+    with stats_lock:
+        counts = dict(stats)
+    served = sum(counts.values())
+    counts["hit_rate"] = (counts["hit"] + counts["stale"]) / served if served else 0.0
+    return counts
+
+
+def reset_response_cache_stats():
+    with stats_lock:
+        stats.update(dict.fromkeys(METRICS, 0))
+
+
+class CachedResponseMixin:
+    """Serve `cache_actions` of a viewset from the cache.
+
+    Responses are keyed on the host, path and normalized query string, plus
+    the user for parameters in `user_scoped_params`, under the current
+    properties version. With PROPERTY_RESPONSE_CACHE_STALE_TIMEOUT set, the
+    last response of a key outlives version bumps that long: while one request
+    rebuilds it, concurrent ones get the stale copy instead of piling onto the
+    database. The `X-Cache` header tells HIT, MISS or STALE.
+    """
+
+    cache_actions = ("list", "retrieve")
+    user_scoped_params = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_response_cache_parts(self, request):
+        params = normalize_params(request.query_params)
+        scoped = any(param in request.query_params for param in self.user_scoped_params)
+        return (
+            request.get_host(),
+            request.path,
+            params,
+            request.user.id if scoped else None,
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        timeout = settings.PROPERTY_RESPONSE_CACHE_TIMEOUT
+        if not timeout or self.action not in self.cache_actions:
+            return handler(request, *args, **kwargs)
+
+        parts = self.get_response_cache_parts(request)
+        key = make_key(RESPONSE_PREFIX, *parts)
+        data = cache.get(key)
+        if data is not None:
+            record("hit")
+            return self.cached(data, "HIT")
+
+        stale_timeout = settings.PROPERTY_RESPONSE_CACHE_STALE_TIMEOUT
+        if not stale_timeout:
+            record("miss")
+            return self.store(handler(request, *args, **kwargs), key, timeout)
+
+        latest_key = f"{RESPONSE_PREFIX}:latest:{digest(*parts)}"
+        lock_key = f"{latest_key}:lock"
+        if not cache.add(lock_key, True, timeout=stale_timeout):
+            stale = cache.get(latest_key)
+            if stale is not None:
+                record("stale")
+                return self.cached(stale, "STALE")
+
+        record("miss")
+        try:
+            response = self.store(handler(request, *args, **kwargs), key, timeout)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(latest_key, response.data, timeout + stale_timeout)
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    def cached(self, data, outcome):
+        return Response(data, headers={"X-Cache": outcome})
+
+    def store(self, response, key, timeout):
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, timeout)
+        response["X-Cache"] = "MISS"
+        return response
@@ -0,0 +1,121 @@
+"""Conditional GET support for the property endpoints.
+
+Validators come from a cheap stamp, the properties version or a row's
+modification time, rather than the rendered response. `If-None-Match` and
+`If-Modified-Since` are answered with a 304 before anything is fetched or
+serialized.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+
+from . import cache as property_cache
+
+
+class ConditionalGetMixin:
+    """Strong ETags on list and detail responses, Last-Modified on detail.
+
+    A list stamp is the properties version that every property write bumps,
+    so revalidating a list only reads the cache. Workers only agree on the
+    version through the shared cache, lists carry no validators without it
+    (PROPERTY_VALIDATOR_CACHE_TIMEOUT is 0). A detail stamp is the row's
+    `modified_at`, cached under the properties version for
+    PROPERTY_VALIDATOR_CACHE_TIMEOUT. The ETag also covers the normalized
+    query string and the media type, which change the representation but not
+    the stamp.
+    """
+
+    modified_field = "modified_at"
+    user_scoped_params = ()
+
+    def list(self, request, *args, **kwargs):
+        if not settings.PROPERTY_VALIDATOR_CACHE_TIMEOUT:
+            return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            super().list, self.get_list_stamp(), request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        stamp = self.get_stamp("detail", self.get_detail_stamp)
+        if stamp["modified"] is None:
+            # Missing rows get the usual 404 from the handler
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            super().retrieve, stamp, request, *args, **kwargs
+        )
+
+    def get_stamp(self, kind, compute):
+        timeout = settings.PROPERTY_VALIDATOR_CACHE_TIMEOUT
+        if not timeout:
+            return compute()
+
+        key = property_cache.make_key(
+            f"property_{kind}_stamp",
+            self.kwargs,
+            property_cache.normalize_params(self.request.query_params),
+            self.get_scope(),
+        )
+        stamp = cache.get(key)
+        if stamp is None:
+            stamp = compute()
+            cache.set(key, stamp, timeout)
+        return stamp
+
+    def get_scope(self):
+        """The user id when user scoped parameters make the response theirs"""
+        scoped = any(
+            param in self.request.query_params for param in self.user_scoped_params
+        )
+        return self.request.user.id if scoped else None
+
+    def get_list_stamp(self):
+        return {"version": property_cache.get_version(), "user": self.get_scope()}
+
+    def get_detail_stamp(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        modified = (
+            self.get_queryset()
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list(self.modified_field, flat=True)
+            .first()
+        )
+        return {"modified": modified}
+
+    def get_etag(self, stamp):
+        variant = (
+            sorted(stamp.items()),
+            self.request.path,
+            property_cache.normalize_params(self.request.query_params),
+            self.request.accepted_media_type,
+        )
+        return quote_etag(hashlib.sha256(repr(variant).encode()).hexdigest()[:32])
+
+    def conditional_response(self, handler, stamp, request, *args, **kwargs):
+        validators = {"ETag": self.get_etag(stamp)}
+        last_modified = None
+        if self.action == "retrieve":
+            last_modified = int(stamp["modified"].timestamp())
+            validators["Last-Modified"] = http_date(last_modified)
+
+        # Headers the 304 carries over
+        headers_only = HttpResponse(headers=validators)
+        conditional = get_conditional_response(
+            request._request,
+            etag=validators["ETag"],
+            last_modified=last_modified,
+            response=headers_only,
+        )
+        if conditional is not headers_only:
+            return conditional
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in validators.items():
+                response[header] = value
+        return response
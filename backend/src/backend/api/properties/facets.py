@@ -0,0 +1,128 @@
+"""Facet counts and histograms for the property filter UI."""
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, Max, Min, Q
+
+from backend.models import Property
+
+CHOICE_FACETS = {
+    "property_type": Property.PROPERTY_TYPES,
+    "status": Property.STATUS_CHOICES,
+}
+HISTOGRAM_FACETS = ("price", "size")
+
+
+def bucket_edges(low, high, buckets):
+    """Lower edges of `buckets` equal width buckets between `low` and `high`"""
+    if low == high:
+        return [low]
+    width = (high - low) / buckets
+    return [low + width * i for i in range(buckets)]
+
+
+def compute(queryset):
+    """Facets of the properties in `queryset`.
+
+    One grouped query counts every choice and finds the slider ranges, a
+    second buckets prices and sizes and a third ranks the cities.
+    """
+    queryset = queryset.order_by()
+    summary = queryset.aggregate(**summary_aggregates())
+    if not summary["count"]:
+        return empty_facets(summary)
+
+    edges = histogram_edges(summary)
+    counts = queryset.aggregate(**bucket_aggregates(edges))
+    return build_facets(summary, edges, counts, list(top_cities(queryset)))
+
+
+async def acompute(queryset):
+    """`compute` through the async ORM"""
+    queryset = queryset.order_by()
+    summary = await queryset.aaggregate(**summary_aggregates())
+    if not summary["count"]:
+        return empty_facets(summary)
+
+    edges = histogram_edges(summary)
+    counts = await queryset.aaggregate(**bucket_aggregates(edges))
+    cities = [row async for row in top_cities(queryset)]
+    return build_facets(summary, edges, counts, cities)
+
+
+def summary_aggregates():
+    aggregates = {"count": Count("pk")}
+    for field, choices in CHOICE_FACETS.items():
+        for i, (value, _) in enumerate(choices):
+            aggregates[f"{field}_{i}"] = Count("pk", filter=Q(**{field: value}))
+    for field in HISTOGRAM_FACETS:
+        aggregates[f"{field}_min"] = Min(field)
+        aggregates[f"{field}_max"] = Max(field)
+    return aggregates
+
+
+def choice_facets(summary):
+    facets = {"count": summary["count"]}
+    for field, choices in CHOICE_FACETS.items():
+        facets[field] = [
+            {"value": value, "label": str(label), "count": summary[f"{field}_{i}"]}
+            for i, (value, label) in enumerate(choices)
+        ]
+    return facets
+
+
+def empty_facets(summary):
+    facets = choice_facets(summary)
+    facets.update({field: None for field in HISTOGRAM_FACETS}, city=[])
+    return facets
+
+
+def histogram_edges(summary):
+    return {
+        field: bucket_edges(
+            summary[f"{field}_min"],
+            summary[f"{field}_max"],
+            settings.PROPERTY_FACET_BUCKETS,
+        )
+        for field in HISTOGRAM_FACETS
+    }
+
+
+def bucket_aggregates(edges):
+    buckets = {}
+    for field, lows in edges.items():
+        for i, low in enumerate(lows):
+            condition = Q(**{f"{field}__gte": low})
+            if i + 1 < len(lows):
+                condition &= Q(**{f"{field}__lt": lows[i + 1]})
+            buckets[f"{field}_{i}"] = Count("pk", filter=condition)
+    return buckets
+
+
+def top_cities(queryset):
+    return (
+        queryset.values("city")
+        .annotate(count=Count("pk"))
+        .order_by("-count", "city")[: settings.PROPERTY_FACET_TOP_CITIES]
+    )
+
+
+def build_facets(summary, edges, counts, cities):
+    facets = choice_facets(summary)
+    for field, lows in edges.items():
+        highs = lows[1:] + [summary[f"{field}_max"]]
+        facets[field] = {
+            "min": summary[f"{field}_min"],
+            "max": summary[f"{field}_max"],
+            "buckets": [
+                {
+                    "min": low.quantize(Decimal("0.01")),
+                    "max": high.quantize(Decimal("0.01")),
+                    "count": counts[f"{field}_{i}"],
+                }
+                for i, (low, high) in enumerate(zip(lows, highs))
+            ],
+        }
+    facets["city"] = cities
+    return facets
@@ -0,0 +1,66 @@
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsetMixin:
+    """Let clients pick the fields of read responses.
+
+    `?fields=id,title,price` keeps only those fields, `?omit=description`
+    drops some. `fields` also takes the names of `field_presets`, e.g.
+    `?fields=card`. The selection reaches the serializer as the `fields`
+    context entry and the queryset, so unneeded columns are never read.
+    """
+
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+    field_presets = {}
+    sparse_actions = ("list", "retrieve")
+
+    def get_sparse_fields(self):
+        """Field names selected for this request, None for all of them"""
+        if self.action not in self.sparse_actions:
+            return None
+        params = self.request.query_params
+        if not (
+            params.get(self.fields_query_param) or params.get(self.omit_query_param)
+        ):
+            return None
+
+        available = self.get_serializer_class().Meta.fields
+        requested = self.parse_names(
+            self.fields_query_param, available, self.field_presets
+        )
+        omitted = self.parse_names(self.omit_query_param, available, {})
+        return tuple(
+            name
+            for name in available
+            if (not requested or name in requested) and name not in omitted
+        )
+
+    def parse_names(self, param, available, presets):
+        names = set()
+        for name in self.request.query_params.get(param, "").split(","):
+            name = name.strip()
+            if name in presets:
+                names.update(presets[name])
+            elif name in available:
+                names.add(name)
+            elif name:
+                raise ValidationError({param: [f"Unknown field `{name}`."]})
+        return names
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            context["fields"] = fields
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+
+        columns = {field.name for field in queryset.model._meta.concrete_fields}
+        selected = [name for name in fields if name in columns]
+        return queryset.only(*selected) if selected else queryset
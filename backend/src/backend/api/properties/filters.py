@@ -1,12 +1,29 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.functions import Upper
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter
+from backend import geo
 from backend.models import Property
 
+# Text search configuration used by the search_vector trigger
+SEARCH_CONFIG = "english"
+
 
 class PropertyFilter(filters.FilterSet):
     price_min = filters.NumberFilter(field_name="price", lookup_expr="gte")
     price_max = filters.NumberFilter(field_name="price", lookup_expr="lte")
     size_min = filters.NumberFilter(field_name="size", lookup_expr="gte")
     size_max = filters.NumberFilter(field_name="size", lookup_expr="lte")
+    city_similar = filters.CharFilter(method="filter_city_similar")
 
     class Meta:
         model = Property
@@ -17,3 +34,124 @@ class PropertyFilter(filters.FilterSet):
             "state": ["exact"],
             "zip_code": ["exact"],
         }
+
+    def filter_city_similar(self, queryset, name, value):
+        """Match misspelled city names, most similar first.
+
+        Uses the pg_trgm `%` operator against the trigram index on UPPER(city)
+        and falls back to `icontains` on other databases.
+        """
+        if connections[queryset.db].vendor != "postgresql":
+            return queryset.filter(city__icontains=value)
+
+        return (
+            queryset.alias(city_upper=Upper("city"))
+            .filter(city_upper__trigram_similar=value.upper())
+            .annotate(city_similarity=TrigramSimilarity(Upper("city"), value.upper()))
+            .order_by("-city_similarity", "-created_at")
+        )
+
+
+class PropertySearchFilter(SearchFilter):
+    """Full-text search over `Property.search_vector` on Postgres.
+
+    Every word of the search has to match, the last one also as a prefix so
+    search-as-you-type works. Results are ranked by relevance unless the client
+    passes an explicit ordering. Other databases keep the `ILIKE` matching of
+    `SearchFilter` over `search_fields`.
+    """
+
+    def get_search_query(self, request):
+        words = re.findall(r"\w+", " ".join(self.get_search_terms(request)))
+        if not words:
+            return None
+
+        raw_query = " & ".join(words[:-1] + [f"{words[-1]}:*"])
+        return SearchQuery(raw_query, search_type="raw", config=SEARCH_CONFIG)
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != "postgresql":
+            return super().filter_queryset(request, queryset, view)
+
+        search_query = self.get_search_query(request)
+        if search_query is None:
+            return queryset
+
+        return (
+            queryset.annotate(search_rank=SearchRank(F("search_vector"), search_query))
+            .filter(search_vector=search_query)
+            .order_by("-search_rank", "-created_at")
+        )
+
+
+class PropertyGeoFilter(BaseFilterBackend):
+    """Radius search around `?near=<lat>,<lng>`.
+
+    Annotates every matching property with its `distance` in km so clients can
+    pass `ordering=distance`. With `radius_km` the candidates are first narrowed
+    to the geohash cells covering the circle, an indexed prefix scan, before the
+    exact great-circle distance is checked.
+    """
+
+    near_query_param = "near"
+    radius_query_param = "radius_km"
+
+    def get_point(self, request):
+        near = request.query_params.get(self.near_query_param)
+        if not near:
+            return None
+
+        try:
+            latitude, longitude = (float(part) for part in near.split(","))
+        except ValueError as e:
+            raise ValidationError(
+                {self.near_query_param: "Expected `<latitude>,<longitude>`."}
+            ) from e
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({self.near_query_param: "Coordinates out of range."})
+        return latitude, longitude
+
+    def get_radius(self, request):
+        radius = request.query_params.get(self.radius_query_param)
+        if not radius:
+            return None
+
+        try:
+            radius = float(radius)
+        except ValueError as e:
+            raise ValidationError(
+                {self.radius_query_param: "Expected a number."}
+            ) from e
+        if radius <= 0:
+            raise ValidationError({self.radius_query_param: "Must be positive."})
+        return radius
+
+    def filter_queryset(self, request, queryset, view):
+        point = self.get_point(request)
+        if point is None:
+            return queryset
+
+        queryset = queryset.exclude(geohash="").annotate(
+            distance=geo.haversine_km(*point)
+        )
+        radius = self.get_radius(request)
+        if radius is None:
+            return queryset
+
+        prefixes = geo.covering_prefixes(*point, radius)
+        if prefixes:
+            cells = Q()
+            for prefix in prefixes:
+                cells |= Q(geohash__startswith=prefix)
+            queryset = queryset.filter(cells)
+        return queryset.filter(distance__lte=radius)
+
+
+class PropertyOrderingFilter(OrderingFilter):
+    """`OrderingFilter` that only offers `distance` when `near` was given"""
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid = super().remove_invalid_fields(queryset, fields, view, request)
+        if "distance" in queryset.query.annotations:
+            return valid
+        return [term for term in valid if term.lstrip("-") != "distance"]
@@ -0,0 +1,367 @@
+import base64
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import EmptyPage, InvalidPage, Page
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Seek pagination over a single sort key with an `id` tiebreaker.
+
+    Cursors are opaque and encode the sort key and id of the last row of the
+    page, so every page is an index range scan instead of `OFFSET n`. Only the
+    fields in `ordering_fields` can be paginated, `supports()` tells the caller
+    whether the queryset ordering qualifies. Rows may be instances or
+    `.values()` dicts including the sort key and `id`.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering_fields = ("created_at", "price", "size")
+    invalid_cursor_message = _("Invalid cursor")
+
+    def get_ordering(self, queryset):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        ordering = [
+            field for field in ordering if field.lstrip("-") not in ("id", "pk")
+        ]
+        if len(ordering) != 1 or not isinstance(ordering[0], str):
+            return None
+        if ordering[0].lstrip("-") not in self.ordering_fields:
+            return None
+        return ordering[0]
+
+    def supports(self, queryset):
+        return self.get_ordering(queryset) is not None
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({"v": values, "r": reverse}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request, field):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            value, pk = payload["v"]
+            return (field.to_python(value), int(pk)), bool(payload["r"])
+        except (TypeError, ValueError, KeyError, DjangoValidationError) as e:
+            raise NotFound(self.invalid_cursor_message) from e
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.get_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` for async views"""
+        rows = self.get_page_queryset(queryset, request).aiterator()
+        return self.get_page([row async for row in rows])
+
+    def get_page_queryset(self, queryset, request):
+        """The rows of the requested page plus one, telling whether more follow"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.field_name = self.ordering.lstrip("-")
+        descending = self.ordering.startswith("-")
+        field = queryset.model._meta.get_field(self.field_name)
+
+        position, self.reverse = self.decode_cursor(request, field)
+        self.position = position
+
+        # Walking backwards flips the scan direction, the page is re-reversed below
+        scan_descending = descending != self.reverse
+        prefix = "-" if scan_descending else ""
+        queryset = queryset.order_by(f"{prefix}{self.field_name}", f"{prefix}id")
+
+        if position is not None:
+            value, pk = position
+            lookup = "lt" if scan_descending else "gt"
+            # The redundant inclusive bound lets the planner seek the index
+            queryset = queryset.filter(
+                Q(**{f"{self.field_name}__{lookup}e": value}),
+                Q(**{f"{self.field_name}__{lookup}": value})
+                | Q(**{self.field_name: value, f"id__{lookup}": pk}),
+            )
+
+        return queryset[: self.page_size + 1]
+
+    def get_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        after_cursor = self.position is not None
+        self.has_next = has_more if not self.reverse else after_cursor
+        self.has_previous = after_cursor if not self.reverse else has_more
+        self.first, self.last = (rows[0], rows[-1]) if rows else (None, None)
+        return rows
+
+    def get_cursor_link(self, row, reverse):
+        if isinstance(row, dict):
+            value, pk = row[self.field_name], row["id"]
+        else:
+            value, pk = getattr(row, self.field_name), row.pk
+        cursor = self.encode_cursor([str(value), pk], reverse)
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, cursor
+        )
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self.get_cursor_link(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first is None:
+            return None
+        return self.get_cursor_link(self.first, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class EstimatedPage(Page):
+    """Page of an estimated count, `has_next` comes from the row past its end"""
+
+    def __init__(self, object_list, number, paginator, next_exists):
+        super().__init__(object_list, number, paginator)
+        self.next_exists = next_exists
+
+    def has_next(self):
+        return self.next_exists
+
+    def end_index(self):
+        return (self.number - 1) * self.paginator.per_page + len(self)
+
+
+class EstimatedCountPaginator(DjangoPaginator):
+    """Paginator trusting the planner's row estimate for large result sets.
+
+    Below `PROPERTY_EXACT_COUNT_THRESHOLD` estimated rows, or on databases
+    without a usable estimate, the count is exact. `count_is_exact` tells which.
+    Pages of an estimate are read with one row more rather than bounded by it,
+    so an estimate that is off neither cuts pages short nor links empty ones.
+    """
+
+    count_is_exact = True
+
+    def estimate_count(self):
+        queryset = self.object_list.order_by()
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def use_estimate(self, estimate):
+        if estimate is not None and estimate >= settings.PROPERTY_EXACT_COUNT_THRESHOLD:
+            self.count_is_exact = False
+            return True
+        return False
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate_count()
+        if self.use_estimate(estimate):
+            return estimate
+        return super().count
+
+    async def acount(self):
+        """Resolve `count` from an async view, exact counts run through the async ORM"""
+        if "count" not in self.__dict__:
+            estimate = await sync_to_async(self.estimate_count)()
+            if self.use_estimate(estimate):
+                self.count = estimate
+            else:
+                self.count = await self.object_list.acount()
+        return self.count
+
+    def validate_number(self, number):
+        # Counting first resolves count_is_exact, small counts are never estimated
+        if self.count < settings.PROPERTY_EXACT_COUNT_THRESHOLD or self.count_is_exact:
+            return super().validate_number(number)
+
+        # An estimate may undercount, pages past it are served rather than 404
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().validate_number(number)
+        if number < 1:
+            return super().validate_number(number)
+        return number
+
+    def get_page_rows(self, number):
+        bottom = (number - 1) * self.per_page
+        return self.object_list[bottom : bottom + self.per_page + 1]
+
+    def make_page(self, rows, number):
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        return EstimatedPage(
+            rows[: self.per_page], number, self, len(rows) > self.per_page
+        )
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_is_exact:
+            return super().page(number)
+        return self.make_page(list(self.get_page_rows(number)), number)
+
+    async def apage(self, number):
+        """`page` through the async ORM, its rows are fetched"""
+        number = self.validate_number(number)
+        if self.count_is_exact:
+            page = super().page(number)
+            page.object_list = [row async for row in page.object_list.aiterator()]
+            return page
+        rows = [row async for row in self.get_page_rows(number).aiterator()]
+        return self.make_page(rows, number)
+
+
+class PropertyPageNumberPagination(PageNumberPagination):
+    django_paginator_class = EstimatedCountPaginator
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` for async views"""
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        await paginator.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = await paginator.apage(page_number)
+        except InvalidPage as e:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(e)
+            )
+            raise NotFound(msg) from e
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data["count_is_exact"] = self.page.paginator.count_is_exact
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_exact"] = {"type": "boolean"}
+        return response_schema
+
+
+class PropertyPagination(BasePagination):
+    """Keyset pagination by default, page numbers when `page` is requested.
+
+    Clients that need numbered pages or totals pass `?page=`; orderings the
+    keyset paginator cannot seek on fall back to page numbers as well.
+    """
+
+    keyset_class = KeysetPagination
+    page_number_class = PropertyPageNumberPagination
+
+    def __init__(self):
+        self.keyset = self.keyset_class()
+        self.page_number = self.page_number_class()
+        self.paginator = self.keyset
+
+    def select(self, queryset, request):
+        page_requested = self.page_number.page_query_param in request.query_params
+        if page_requested or not self.keyset.supports(queryset):
+            self.paginator = self.page_number
+        else:
+            self.paginator = self.keyset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.select(queryset, request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.select(queryset, request)
+        return await self.paginator.apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.keyset.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        page_parameters = [
+            parameter
+            for parameter in self.page_number.get_schema_operation_parameters(view)
+            if parameter["name"] == self.page_number.page_query_param
+        ]
+        return self.keyset.get_schema_operation_parameters(view) + page_parameters
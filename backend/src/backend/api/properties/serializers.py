@@ -1,8 +1,109 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from backend import clusters
 from backend.models import Property
+from . import cache as property_cache
+
+
+class PropertyListSerializer(serializers.ListSerializer):
+    """Validates and writes a batch of properties with bulk queries.
+
+    Updates pass the caller's own properties as `instance` and every item names
+    the property it changes by `id`. Invalid items are left out and listed in
+    `item_errors` by position, unless the `atomic` context flag asks for the
+    whole batch to fail.
+
+    Bulk queries skip the model signals, the writes update the map clusters and
+    bump the properties version themselves.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["Expected a list of properties."]}
+            )
+        max_items = settings.PROPERTY_BULK_MAX_ITEMS
+        if len(data) > max_items:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [f"At most {max_items} items."]}
+            )
+
+        owned = {prop.pk: prop for prop in self.instance or []}
+        self.item_errors = []
+        validated = []
+        for index, item in enumerate(data):
+            try:
+                if self.instance is not None:
+                    self.child.instance = self.get_owned_instance(owned, item)
+                attrs = self.child.run_validation(item)
+            except serializers.ValidationError as exc:
+                self.item_errors.append({"index": index, "errors": exc.detail})
+                continue
+            if self.instance is not None:
+                attrs["id"] = self.child.instance.pk
+            validated.append(attrs)
+
+        if self.item_errors and self.context.get("atomic"):
+            raise serializers.ValidationError({"errors": self.item_errors})
+        return validated
+
+    def get_owned_instance(self, owned, item):
+        pk = item.get("id") if isinstance(item, dict) else None
+        if pk is None:
+            raise serializers.ValidationError({"id": ["This field is required."]})
+        try:
+            return owned[int(pk)]
+        except (KeyError, TypeError, ValueError):
+            raise serializers.ValidationError(
+                {"id": ["Not found or not one of your properties."]}
+            ) from None
+
+    def create(self, validated_data):
+        properties = [Property(**attrs) for attrs in validated_data]
+        for prop in properties:
+            prop.geohash = prop.compute_geohash()
+
+        with transaction.atomic():
+            Property.objects.bulk_create(properties, batch_size=500)
+            self.written(added=[prop.get_cluster_state() for prop in properties])
+        return properties
+
+    def update(self, instances, validated_data):
+        owned = {prop.pk: prop for prop in instances}
+        now = timezone.now()
+        fields = {"geohash", "modified_at"}
+        removed, properties = [], []
+        for attrs in validated_data:
+            prop = owned[attrs.pop("id")]
+            removed.append(prop.get_cluster_state())
+            for field, value in attrs.items():
+                setattr(prop, field, value)
+            fields.update(attrs)
+            prop.geohash = prop.compute_geohash()
+            prop.modified_at = now
+            properties.append(prop)
+
+        with transaction.atomic():
+            Property.objects.bulk_update(properties, sorted(fields), batch_size=500)
+            self.written(
+                added=[prop.get_cluster_state() for prop in properties], removed=removed
+            )
+        return properties
+
+    def written(self, added=(), removed=()):
+        clusters.apply(
+            added=added, removed=[state for state in removed if state is not None]
+        )
+        property_cache.bump_version()
 
 
 class PropertySerializer(serializers.ModelSerializer):
+    # Distance in km from `?near=`, only present on radius searches
+    distance = serializers.FloatField(read_only=True)
+
     class Meta:
         model = Property
         fields = [
@@ -21,4 +122,34 @@ class PropertySerializer(serializers.ModelSerializer):
             "longitude",
             "created_at",
             "modified_at",
+            "distance",
         ]
+        list_serializer_class = PropertyListSerializer
+
+    def get_fields(self):
+        """All fields, or the sparse fieldset in the `fields` context entry"""
+        fields = super().get_fields()
+        names = self.context.get("fields")
+        if names is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in names}
+
+
+class MapViewportSerializer(serializers.Serializer):
+    """Query parameters of the map clusters endpoint"""
+
+    bbox = serializers.CharField(help_text="`<west>,<south>,<east>,<north>` in degrees")
+    zoom = serializers.IntegerField(min_value=0, max_value=22)
+
+    def validate_bbox(self, value):
+        try:
+            west, south, east, north = (float(part) for part in value.split(","))
+        except ValueError as e:
+            raise serializers.ValidationError(
+                "Expected `<west>,<south>,<east>,<north>`."
+            ) from e
+        if not (-90 <= south <= north <= 90):
+            raise serializers.ValidationError("Latitudes out of range.")
+        if not (-180 <= west <= 180 and -180 <= east <= 180):
+            raise serializers.ValidationError("Longitudes out of range.")
+        return west, south, east, north
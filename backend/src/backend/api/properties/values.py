@@ -0,0 +1,195 @@
+"""Read-only fast path for list responses.
+
+`ValuesSerializer` renders `.values()` rows with the output of a
+`ModelSerializer`, without building model instances or walking serializer
+fields per row: each field is compiled into a plain converter once per page.
+`ValuesListMixin` serves a viewset's `list` through it, writes keep the full
+serializer and its validation.
+"""
+
+import decimal
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.fields import ISO_8601
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+def identity(value):
+    return value
+
+
+def decimal_converter(field):
+    coerce_to_string = getattr(
+        field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+    )
+    if (
+        field.decimal_places is None
+        or field.normalize_output
+        or field.localize
+        or not coerce_to_string
+    ):
+        return field.to_representation
+
+    exponent = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        return f"{value.quantize(exponent, rounding=rounding, context=context):f}"
+
+    return convert
+
+
+def datetime_converter(field, current_timezone):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if (
+        output_format is None
+        or output_format.lower() != ISO_8601
+        or hasattr(field, "timezone")
+        or not settings.USE_TZ
+    ):
+        return field.to_representation
+
+    def convert(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(current_timezone).isoformat()
+        if value.endswith("+00:00"):
+            return value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+class ValuesSerializer:
+    """Renders `.values()` rows exactly like `serializer_class` renders instances.
+
+    Every readable field must be a plain model column or an annotation, the
+    latter only rendered when the queryset has it, as the model serializer
+    skips read-only attributes an instance lacks.
+    """
+
+    # Fields whose representation of a database value is the value itself
+    identity_fields = (
+        serializers.CharField,
+        serializers.ChoiceField,
+        serializers.IntegerField,
+        serializers.BooleanField,
+    )
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def fields(self):
+        """Name, source, whether it is a column and field, in output order"""
+        model = self.serializer_class.Meta.model
+        columns = {field.name: field.attname for field in model._meta.concrete_fields}
+        columns["pk"] = model._meta.pk.attname
+        compiled = []
+        for field in self.serializer_class()._readable_fields:
+            if isinstance(field, serializers.SerializerMethodField) or (
+                isinstance(field, serializers.RelatedField)
+                and not isinstance(field, serializers.PrimaryKeyRelatedField)
+            ):
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{field.field_name} cannot be "
+                    "rendered from `.values()`."
+                )
+            if field.source in columns:
+                compiled.append((field.field_name, columns[field.source], True, field))
+            elif "." not in field.source and field.source != "*":
+                compiled.append((field.field_name, field.source, False, field))
+            else:
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{field.field_name} is not a "
+                    "column, it cannot be rendered from `.values()`."
+                )
+        return compiled
+
+    def compile(self, field):
+        if isinstance(field, serializers.DecimalField):
+            return decimal_converter(field)
+        if isinstance(field, serializers.DateTimeField):
+            return datetime_converter(field, timezone.get_current_timezone())
+        if isinstance(field, serializers.FloatField):
+            return float
+        if isinstance(field, self.identity_fields):
+            return identity
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and not field.pk_field:
+            return identity
+        return field.to_representation
+
+    def get_fields(self, queryset, names=None):
+        """The fields `queryset` provides, a column or one of its annotations.
+
+        `names` restricts them to a sparse fieldset.
+        """
+        annotations = queryset.query.annotations
+        return [
+            (name, source, field)
+            for name, source, is_column, field in self.fields
+            if (is_column or source in annotations) and (names is None or name in names)
+        ]
+
+    def get_queryset(self, queryset, names=None):
+        """`queryset` as `.values()` of the serialized sources.
+
+        The primary key and column sort keys are selected as well, paginators
+        read them from the rows.
+        """
+        model = queryset.model
+        columns = {field.attname for field in model._meta.concrete_fields}
+        ordering = queryset.query.order_by or model._meta.ordering
+        keys = [model._meta.pk.attname] + [
+            term.lstrip("-")
+            for term in ordering
+            if isinstance(term, str) and term.lstrip("-") in columns
+        ]
+        sources = [source for _, source, _ in self.get_fields(queryset, names)]
+        return queryset.values(*dict.fromkeys(sources + keys))
+
+    def to_representation(self, rows, queryset, names=None):
+        """Dicts of `rows`, values of `get_queryset(queryset, names)`"""
+        converters = [
+            (name, source, self.compile(field))
+            for name, source, field in self.get_fields(queryset, names)
+        ]
+        data = []
+        for row in rows:
+            item = {}
+            for name, source, convert in converters:
+                value = row[source]
+                item[name] = None if value is None else convert(value)
+            data.append(item)
+        return data
+
+
+class ValuesListMixin:
+    """Serve `list` from `.values()` rows through `values_serializer`.
+
+    A `fields` entry in the serializer context restricts the columns read and
+    rendered. The pagination classes must accept dict rows, `KeysetPagination`
+    does.
+    """
+
+    values_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        names = self.get_serializer_context().get("fields")
+        rows = self.values_serializer.get_queryset(queryset, names)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                self.values_serializer.to_representation(page, queryset, names)
+            )
+        return Response(self.values_serializer.to_representation(rows, queryset, names))
@@ -1,23 +1,62 @@
-from rest_framework import viewsets, filters
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models import Max, Min, Q, Sum
+from django.http import StreamingHttpResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters import rest_framework as django_filters
-from backend.models import Property
-from .serializers import PropertySerializer
-from .filters import PropertyFilter
+from backend import clusters
+from backend.models import Property, PropertyCluster
+from . import cache as property_cache
+from . import export, facets
+from .conditional import ConditionalGetMixin
+from .fieldsets import SparseFieldsetMixin
+from .serializers import MapViewportSerializer, PropertySerializer
+from .filters import (
+    PropertyFilter,
+    PropertyGeoFilter,
+    PropertyOrderingFilter,
+    PropertySearchFilter,
+)
+from .pagination import PropertyPagination
+from .values import ValuesListMixin, ValuesSerializer
+from ..asynchronous import AsyncGenericAPIView
+from ..budgets import query_budget
+from ..metrics import ServerTimingMixin
 from ..permissions import IsAuthenticatedAndAgentForWrite
+from ..replicas import ReplicaReadMixin
 
 
-class PropertyViewSet(viewsets.ModelViewSet):
+def is_id(value):
+    """Whether `value` is an integer id, booleans being integers to Python"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class PropertyQueryMixin:
+    """Properties a request reads, with the list filters, search and ordering"""
+
     queryset = Property.objects.all()
     serializer_class = PropertySerializer
+    values_serializer = ValuesSerializer(PropertySerializer)
     permission_classes = [IsAuthenticatedAndAgentForWrite]
+    pagination_class = PropertyPagination
     filter_backends = [
         django_filters.DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        PropertySearchFilter,
+        PropertyGeoFilter,
+        PropertyOrderingFilter,
     ]
     filterset_class = PropertyFilter
-    search_fields = ["title", "description", "address"]
-    ordering_fields = ["price", "created_at", "size"]
+    search_fields = ["title", "description", "address", "city"]
+    ordering_fields = ["price", "created_at", "size", "distance"]
+    user_scoped_params = ["my_properties"]
+    # Named field selections for `?fields=`
+    field_presets = {
+        "card": ("id", "title", "price", "city", "latitude", "longitude"),
+        "map": ("id", "latitude", "longitude", "price"),
+    }
 
     def get_queryset(self):
         """
@@ -27,8 +66,331 @@ class PropertyViewSet(viewsets.ModelViewSet):
         queryset = super().get_queryset()
         my_properties = self.request.query_params.get("my_properties", None)
         if my_properties and self.request.user.is_agent:
-            queryset = queryset.filter(created_by=self.request.user)
+            queryset = queryset.filter(created_by_id=self.request.user.id)
         return queryset
 
+    # Parameters that do not change which properties match
+    facet_ignored_params = {"page", "page_size", "cursor", "ordering"}
+
+    def get_facets_key(self):
+        params = property_cache.normalize_params(
+            self.request.query_params, self.facet_ignored_params
+        )
+        scoped = any(
+            param in self.request.query_params for param in self.user_scoped_params
+        )
+        owner = self.request.user.id if scoped else None
+        return property_cache.make_key("property_facets", params, owner)
+
+
+class PropertyViewSet(
+    PropertyQueryMixin,
+    ReplicaReadMixin,
+    ServerTimingMixin,
+    ConditionalGetMixin,
+    property_cache.CachedResponseMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
+    # Most queries per action with cold caches, whatever the page size
+    query_budgets = {
+        "list": 4,
+        "retrieve": 2,
+        "create": 3,
+        "update": 2,
+        "partial_update": 2,
+        "destroy": 4,
+    }
+
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        serializer.save(created_by_id=self.request.user.id)
+
+    @action(detail=False, methods=["post", "patch", "delete"])
+    @query_budget(6)
+    def bulk(self, request, *args, **kwargs):
+        """Create, update or delete up to PROPERTY_BULK_MAX_ITEMS properties.
+
+        POST takes a list of properties, PATCH a list of partial properties with
+        their `id` and DELETE a list of ids. Items that fail validation or are
+        not the agent's own are reported in `errors` by position while the rest
+        is written, `?atomic=true` rejects the whole batch instead.
+        """
+        atomic = request.query_params.get("atomic", "").lower() in ("1", "true")
+        if request.method == "DELETE":
+            return self.bulk_destroy(request, atomic)
+
+        context = {**self.get_serializer_context(), "atomic": atomic}
+        if request.method == "POST":
+            serializer = self.get_serializer(
+                data=request.data, many=True, context=context
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save(created_by_id=request.user.id)
+            response_status = status.HTTP_201_CREATED
+        else:
+            serializer = self.get_serializer(
+                self.get_owned(request.data),
+                data=request.data,
+                many=True,
+                partial=True,
+                context=context,
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            response_status = status.HTTP_200_OK
+
+        return Response(
+            {"results": serializer.data, "errors": serializer.item_errors},
+            status=response_status,
+        )
+
+    def bulk_destroy(self, request, atomic):
+        ids = request.data
+        max_items = settings.PROPERTY_BULK_MAX_ITEMS
+        if not isinstance(ids, list) or len(ids) > max_items:
+            return Response(
+                {"detail": f"Expected a list of at most {max_items} ids."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        using = router.db_for_write(Property)
+        with transaction.atomic(using=using):
+            # Locked until the delete commits, so the clusters lose exactly the
+            # rows deleted
+            owned = {
+                prop.pk: prop
+                for prop in self.get_owned([{"id": pk} for pk in ids], lock=True)
+            }
+            deleted, errors = [], []
+            for index, pk in enumerate(ids):
+                if is_id(pk) and pk in owned:
+                    deleted.append(pk)
+                else:
+                    errors.append(
+                        {
+                            "index": index,
+                            "errors": ["Not found or not one of your properties."],
+                        }
+                    )
+            if errors and atomic:
+                return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+            removed = set(deleted)
+            if removed:
+                # Deleting through the collector sends the model signals,
+                # updating the clusters once per property. Nothing references
+                # properties, so they are deleted in one statement and the
+                # clusters updated once.
+                Property.objects.filter(pk__in=removed)._raw_delete(using)
+                clusters.apply(
+                    removed=[owned[pk].get_cluster_state() for pk in removed]
+                )
+        property_cache.bump_version()
+        return Response({"deleted": deleted, "errors": errors})
+
+    def get_owned(self, items, lock=False):
+        """The agent's own properties among the `id`s of `items`, one query.
+
+        `lock` selects them for update, within the caller's transaction.
+        """
+        ids = set()
+        if isinstance(items, list):
+            for item in items:
+                pk = item.get("id") if isinstance(item, dict) else None
+                if is_id(pk) or (isinstance(pk, str) and pk.isdigit()):
+                    ids.add(int(pk))
+        queryset = Property.objects.filter(
+            pk__in=ids, created_by_id=self.request.user.id
+        )
+        if lock:
+            queryset = queryset.select_for_update()
+        return list(queryset)
+
+    @action(detail=False, methods=["get"])
+    @query_budget(1)
+    def export(self, request, *args, **kwargs):
+        """Stream every matching property as CSV or NDJSON.
+
+        Takes the list filters, search and ordering. `export_format` picks the
+        output, `format` is DRF's renderer override.
+        """
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in export.FORMATS:
+            return Response(
+                {"export_format": [f"One of: {', '.join(export.FORMATS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        content_type, stream = export.FORMATS[export_format]
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(stream(queryset), content_type=content_type)
+        # DRF only sets this on its own responses, query budgets find the view by it
+        response.renderer_context = self.get_renderer_context()
+        response["Content-Disposition"] = (
+            f'attachment; filename="properties.{export_format}"'
+        )
+        return response
+
+    @action(detail=False, methods=["get"])
+    @query_budget(3)
+    def facets(self, request, *args, **kwargs):
+        """Facet counts and histograms of the properties matching the filters"""
+        if not settings.PROPERTY_FACETS_CACHE_TIMEOUT:
+            return Response(facets.compute(self.filter_queryset(self.get_queryset())))
+
+        key = self.get_facets_key()
+        data = cache.get(key)
+        if data is None:
+            data = facets.compute(self.filter_queryset(self.get_queryset()))
+            cache.set(key, data, settings.PROPERTY_FACETS_CACHE_TIMEOUT)
+        return Response(data)
+
+    # Filters the precomputed map clusters are kept per, any other filter
+    # parameter aggregates the matching properties on the fly
+    cluster_filter_params = {"status", "property_type"}
+    viewport_params = {"bbox", "zoom", "ordering"}
+
+    @action(detail=False, methods=["get"])
+    @query_budget(1)
+    def clusters(self, request, *args, **kwargs):
+        """Properties in a map viewport.
+
+        Below `clusters.PIN_ZOOM` returns clusters with their count, centroid and
+        price range, from there on individual pins.
+        """
+        viewport = MapViewportSerializer(data=request.query_params)
+        viewport.is_valid(raise_exception=True)
+        bbox, zoom = viewport.validated_data["bbox"], viewport.validated_data["zoom"]
+
+        if zoom >= clusters.PIN_ZOOM:
+            return self.viewport_pins(bbox, zoom)
+
+        precision, cells = clusters.viewport_cells(*bbox, zoom)
+        filter_params = set(request.query_params) - self.viewport_params
+        if filter_params <= self.cluster_filter_params:
+            rows = self.precomputed_clusters(precision, cells)
+        else:
+            rows = clusters.aggregate_cells(
+                self.filter_bbox(self.filter_queryset(self.get_queryset()), bbox),
+                precision,
+            )
+
+        return Response(
+            {
+                "zoom": zoom,
+                "type": "clusters",
+                "results": [
+                    {
+                        "cell": row["cell"],
+                        "count": row["total"],
+                        "latitude": row["latitude_total"] / row["total"],
+                        "longitude": row["longitude_total"] / row["total"],
+                        "price_min": row["lowest_price"],
+                        "price_max": row["highest_price"],
+                    }
+                    for row in rows
+                ],
+            }
+        )
+
+    def precomputed_clusters(self, precision, cells):
+        rows = PropertyCluster.objects.filter(precision=precision)
+        if cells is not None:
+            rows = rows.filter(cell__in=cells)
+        for param in self.cluster_filter_params:
+            value = self.request.query_params.get(param)
+            if value:
+                rows = rows.filter(**{param: value})
+
+        return (
+            rows.order_by()
+            .values("cell")
+            .annotate(
+                total=Sum("count"),
+                latitude_total=Sum("latitude_sum"),
+                longitude_total=Sum("longitude_sum"),
+                lowest_price=Min("price_min"),
+                highest_price=Max("price_max"),
+            )
+        )
+
+    def viewport_pins(self, bbox, zoom):
+        limit = settings.PROPERTY_MAP_MAX_PINS
+        pins = list(
+            self.filter_bbox(self.filter_queryset(self.get_queryset()), bbox).values(
+                "id", "latitude", "longitude", "price"
+            )[: limit + 1]
+        )
+        return Response(
+            {
+                "zoom": zoom,
+                "type": "pins",
+                "truncated": len(pins) > limit,
+                "results": pins[:limit],
+            }
+        )
+
+    def filter_bbox(self, queryset, bbox):
+        west, south, east, north = bbox
+        queryset = queryset.filter(latitude__range=(south, north))
+        if west <= east:
+            return queryset.filter(longitude__range=(west, east))
+        # The viewport crosses the antimeridian
+        return queryset.filter(Q(longitude__gte=west) | Q(longitude__lte=east))
+
+
+class AsyncPropertyListView(
+    PropertyQueryMixin, ReplicaReadMixin, SparseFieldsetMixin, AsyncGenericAPIView
+):
+    """Property list through the async ORM, see `PropertyViewSet.list`"""
+
+    action = "list"
+    query_budgets = {"list": 3}
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        names = self.get_serializer_context().get("fields")
+        rows = self.values_serializer.get_queryset(queryset, names)
+
+        page = await self.apaginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                self.values_serializer.to_representation(page, queryset, names)
+            )
+        rows = [row async for row in rows.aiterator()]
+        return Response(self.values_serializer.to_representation(rows, queryset, names))
+
+
+class AsyncPropertyDetailView(
+    PropertyQueryMixin, ReplicaReadMixin, SparseFieldsetMixin, AsyncGenericAPIView
+):
+    """Property detail through the async ORM, see `PropertyViewSet.retrieve`"""
+
+    action = "retrieve"
+    query_budgets = {"retrieve": 1}
+
+    async def get(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+
+class AsyncPropertyFacetsView(
+    PropertyQueryMixin, ReplicaReadMixin, AsyncGenericAPIView
+):
+    """Property facets through the async ORM, see `PropertyViewSet.facets`"""
+
+    action = "facets"
+    query_budgets = {"facets": 3}
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not settings.PROPERTY_FACETS_CACHE_TIMEOUT:
+            return Response(await facets.acompute(queryset))
+
+        key = self.get_facets_key()
+        data = await cache.aget(key)
+        if data is None:
+            data = await facets.acompute(queryset)
+            await cache.aset(key, data, settings.PROPERTY_FACETS_CACHE_TIMEOUT)
+        return Response(data)
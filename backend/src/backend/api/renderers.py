@@ -0,0 +1,125 @@
+"""Faster drop-in renderers for the API.
+
+`ORJSONRenderer` writes the same bytes as DRF's `JSONRenderer` with compact,
+unicode output (the defaults) for everything the API returns, through orjson.
+Floats are the exception to mind: below 1e-4 or from 1e16 on, orjson spells
+the exponent differently (`1e-5` for `1e-05`), the same number either way.
+NaN and infinite floats are rejected like `JSONRenderer` rejects them.
+
+`MessagePackRenderer` needs the optional `msgpack` package.
+"""
+
+import datetime
+import decimal
+import math
+import uuid
+
+import orjson
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+FINITE_TYPES = frozenset((str, int, bool, type(None)))
+
+
+def default(obj):
+    """Types orjson leaves to the caller, encoded like DRF's `JSONEncoder`"""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "__getitem__"):
+        return list(obj) if isinstance(obj, tuple) else dict(obj)
+    if hasattr(obj, "__iter__"):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """`data` as compact UTF-8 JSON, byte-compatible with `JSONRenderer`"""
+    content = orjson.dumps(data, default=default, option=ORJSON_OPTIONS)
+    # JSONRenderer escapes these so the output stays a JavaScript subset
+    if LINE_SEPARATOR in content or PARAGRAPH_SEPARATOR in content:
+        content = content.replace(LINE_SEPARATOR, b"\\u2028").replace(
+            PARAGRAPH_SEPARATOR, b"\\u2029"
+        )
+    return content
+
+
+def has_non_finite(value):
+    """Whether `value` holds a NaN or infinite number, which orjson writes as null"""
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        return isinstance(value, (float, decimal.Decimal)) and not math.isfinite(value)
+    # Rows of strings, integers and nulls are the norm, ruled out in one pass
+    if FINITE_TYPES.issuperset(map(type, value)):
+        return False
+    return any(has_non_finite(item) for item in value if type(item) not in FINITE_TYPES)
+
+
+def dumps_strict(data):
+    """`dumps` raising on NaN and infinity like `JSONRenderer`, not writing null"""
+    content = dumps(data)
+    if b"null" in content and has_non_finite(data):
+        raise ValueError("Out of range float values are not JSON compliant")
+    return content
+
+
+class ORJSONRenderer(JSONRenderer):
+    """`JSONRenderer` through orjson.
+
+    Indented output, from the browsable API or `Accept: application/json;
+    indent=4`, and non-default JSON settings keep the stdlib encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is None and not self.ensure_ascii and self.compact and self.strict:
+            try:
+                return dumps_strict(data)
+            except orjson.JSONEncodeError:
+                pass  # e.g. integers beyond 64 bits, the stdlib copes
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+def msgpack_default(obj):
+    if isinstance(obj, datetime.datetime):
+        value = obj.isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    return default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders MessagePack, with the values `JSONRenderer` would write"""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=msgpack_default, use_bin_type=True)
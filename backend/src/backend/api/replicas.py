@@ -0,0 +1,51 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from backend import routers
+
+
+class ReplicaReadMixin:
+    """Serve the safe requests of a view from a read replica.
+
+    Requests are authenticated against the primary, the view itself reads
+    from the replica unless the user was pinned to the primary by a write
+    through a view using this mixin.
+    """
+
+    replica_context = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.reads_from_replica(request) and not self.is_pinned(request):
+            self.enter_replica()
+
+    async def ainitial(self, request, *args, **kwargs):
+        await super().ainitial(request, *args, **kwargs)
+        if self.reads_from_replica(request) and not await self.ais_pinned(request):
+            self.enter_replica()
+
+    def reads_from_replica(self, request):
+        return request.method in SAFE_METHODS
+
+    def is_pinned(self, request):
+        user = request.user
+        return user.is_authenticated and routers.is_pinned_to_primary(user.pk)
+
+    async def ais_pinned(self, request):
+        user = request.user
+        return user.is_authenticated and await routers.ais_pinned_to_primary(user.pk)
+
+    def enter_replica(self):
+        self.replica_context = routers.read_from_replica()
+        self.replica_context.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.replica_context is not None:
+            self.replica_context.__exit__(None, None, None)
+            self.replica_context = None
+        elif (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            routers.pin_to_primary(request.user.pk)
+        return super().finalize_response(request, response, *args, **kwargs)
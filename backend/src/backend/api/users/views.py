@@ -2,16 +2,30 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth import get_user_model
+from ..asynchronous import AsyncGenericAPIView
+from ..budgets import query_budget
+from ..metrics import ServerTimingMixin
+from ..replicas import ReplicaReadMixin
 from .serializers import UserSerializer
 
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ReplicaReadMixin, ServerTimingMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    # Most queries per action with cold caches, whatever the page size
+    query_budgets = {
+        "list": 2,
+        "retrieve": 1,
+        "create": 2,
+        "update": 2,
+        "partial_update": 2,
+        "destroy": 7,
+    }
 
     def get_queryset(self):
         if self.action in ["me", "change_password", "delete_account"]:
@@ -19,6 +33,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return self.queryset
 
     @action(detail=False, methods=["get", "put", "patch"])
+    @query_budget(2)
     def me(self, request, *args, **kwargs):
         instance = request.user
         if request.method == "GET":
@@ -31,6 +46,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=["post"])
+    @query_budget(2)
     def change_password(self, request, *args, **kwargs):
         user = request.user
         old_password = request.data.get("old_password")
@@ -46,7 +62,28 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response({"status": "password changed"})
 
     @action(detail=False, methods=["delete"])
+    @query_budget(7)
     def delete_account(self, request, *args, **kwargs):
         user = request.user
         user.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncUserMeView(ReplicaReadMixin, AsyncGenericAPIView):
+    """The authenticated user through the async ORM, see `UserViewSet.me`"""
+
+    serializer_class = UserSerializer
+    permission_classes = [IsAuthenticated]
+    action = "me"
+    query_budgets = {"me": 1}
+    # The row is loaded by the view, the token claims authenticate
+    db_user_actions = ()
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            user = await User.objects.aget(pk=request.user.pk)
+        except User.DoesNotExist as e:
+            raise AuthenticationFailed("User not found", code="user_not_found") from e
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return Response(self.get_serializer(user).data)
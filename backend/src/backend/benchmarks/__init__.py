@@ -0,0 +1,112 @@
+"""Microbenchmarks for the API hot paths, run them with `manage.py benchmark`."""
+
+import json
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.db import connection
+
+
+class BenchmarkSkipped(Exception):
+    """Raised by a benchmark that cannot run against the configured database"""
+
+
+def measure(func, iterations):
+    """Return the mean wall time of `func` in seconds over `iterations` calls"""
+    func()  # warm up
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def profile(func, iterations):
+    """Wall time, query count and peak memory of `func`.
+
+    Returns the mean and 95th percentile seconds over `iterations` calls, the
+    queries of one call and its peak traced allocation. Memory is traced in a
+    separate call, tracemalloc would skew the timings.
+    """
+    func()  # warm up
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    # Counted with a wrapper, requests reset `connection.queries` as they start
+    queries = []
+    with connection.execute_wrapper(
+        lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)
+    ):
+        func()
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": statistics.fmean(timings),
+        "p95": statistics.quantiles(timings, n=20)[-1]
+        if len(timings) > 1
+        else timings[0],
+        "queries": len(queries),
+        "peak_kb": peak / 1024,
+    }
+
+
+@contextmanager
+def seeded_database(size):
+    """Point the default connection at a database of `size` seeded properties.
+
+    Every size gets its own database, created like a test database next to the
+    configured one and kept between runs, so large datasets are seeded once.
+    """
+    from backend.models import Property, PropertyCluster
+
+    settings_dict = connection.settings_dict
+    old_name, old_test = settings_dict["NAME"], settings_dict.get("TEST", {})
+    settings_dict["TEST"] = {**old_test, "NAME": f"benchmark_{size}"}
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=True)
+    try:
+        if Property.objects.count() != size:
+            tables = [Property._meta.db_table, PropertyCluster._meta.db_table]
+            connection.ops.execute_sql_flush(
+                connection.ops.sql_flush(no_style(), tables, allow_cascade=True)
+            )
+            call_command("seed_properties", count=size, seed=0, stdout=StringIO())
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=True)
+        settings_dict["TEST"] = old_test
+
+
+def explain_analyze(queryset):
+    """Run EXPLAIN ANALYZE for `queryset` on Postgres.
+
+    Returns the execution time in seconds and the scan nodes of the plan.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    scans, nodes = [], [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Scan" in node["Node Type"]:
+            scans.append(node["Node Type"])
+        nodes.extend(node.get("Plans", []))
+    return plan[0]["Execution Time"] / 1000, scans
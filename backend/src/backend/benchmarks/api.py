@@ -0,0 +1,115 @@
+from django.core.cache import cache
+from django.db.models import Count
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from backend.api.properties.pagination import KeysetPagination
+from backend.models import Property
+
+from . import profile
+
+# Takes a dataset size, run inside `seeded_database(size)`
+SIZED = True
+
+# Seeded by `seed_properties`, whose agents all share this password
+USERNAME, PASSWORD = "agent1", "agent"
+
+
+def get_access_token():
+    # `testserver` is only allowed under the test runner
+    response = APIClient(SERVER_NAME="localhost").post(
+        "/api/token/", {"username": USERNAME, "password": PASSWORD}, format="json"
+    )
+    return response.data["access"]
+
+
+def get_client():
+    client = APIClient(SERVER_NAME="localhost")
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_access_token()}")
+    return client
+
+
+def deep_cursor(size):
+    """Keyset cursor pointing most of the way through the default ordering"""
+    created_at, pk = Property.objects.order_by("-created_at", "-id").values_list(
+        "created_at", "id"
+    )[size * 9 // 10]
+    return KeysetPagination().encode_cursor([created_at.isoformat(), pk], False)
+
+
+def get_requests(size):
+    """Name, method, path and payload of every benchmarked request"""
+    top_city = (
+        Property.objects.values("city")
+        .annotate(listings=Count("pk"))
+        .order_by("-listings")
+        .values_list("city", flat=True)
+        .first()
+    )
+    detail_id = Property.objects.order_by("pk").values_list("pk", flat=True)[size // 2]
+    deep_page = max(size // 10 // 2, 1)
+
+    properties = "/api/properties/"
+    return [
+        ("properties.list", "get", properties, {}),
+        (
+            "properties.filter",
+            "get",
+            properties,
+            {
+                "status": "on_market",
+                "property_type": "residential",
+                "price_min": 200_000,
+                "price_max": 600_000,
+            },
+        ),
+        ("properties.filter_city", "get", properties, {"city": top_city}),
+        ("properties.search", "get", properties, {"search": "sunny loft"}),
+        ("properties.ordering", "get", properties, {"ordering": "-price"}),
+        ("properties.deep_page", "get", properties, {"page": deep_page}),
+        ("properties.deep_cursor", "get", properties, {"cursor": deep_cursor(size)}),
+        ("properties.detail", "get", f"{properties}{detail_id}/", {}),
+        ("users.me", "get", "/api/users/me/", {}),
+        (
+            "auth.token_obtain",
+            "post",
+            "/api/token/",
+            {"username": USERNAME, "password": PASSWORD},
+        ),
+    ]
+
+
+def run(iterations, size):
+    """The API through the DRF test client with cold caches.
+
+    Caches are cleared before every request so each one runs its queries,
+    `properties.list_cached` measures the warm response cache.
+    """
+    client = get_client()
+    results = []
+
+    def call(method, path, payload):
+        if method == "post":
+            response = client.post(path, payload, format="json")
+        else:
+            response = client.get(path, payload)
+        assert response.status_code == 200, (path, response.status_code)
+
+    for name, method, path, payload in get_requests(size):
+
+        def cold(method=method, path=path, payload=payload):
+            cache.clear()
+            call(method, path, payload)
+
+        with override_settings(PROPERTY_RESPONSE_CACHE_TIMEOUT=0):
+            results.append({"name": name, **profile(cold, iterations)})
+
+    # One process, its local memory cache stands in for the shared one
+    with override_settings(PROPERTY_RESPONSE_CACHE_TIMEOUT=60 * 5):
+        results.append(
+            {
+                "name": "properties.list_cached",
+                **profile(lambda: call("get", "/api/properties/", {}), iterations),
+            }
+        )
+    return results
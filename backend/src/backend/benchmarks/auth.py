@@ -0,0 +1,48 @@
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.api.authentication import (
+    StatelessJWTAuthentication,
+    ValidatedTokenCache,
+    add_user_claims,
+)
+from backend.models import User, UserRole
+
+from . import measure
+
+
+def run(iterations):
+    """Per-request JWT authentication cost with and without the token cache"""
+    user = User(id=1, username="agent", is_active=True)
+    user.role_names = frozenset([UserRole.AGENT])
+
+    token = AccessToken()
+    token[api_settings.USER_ID_CLAIM] = str(user.id)
+    add_user_claims(token, user)
+
+    request = Request(
+        APIRequestFactory().get(
+            "/api/properties/", HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+    )
+
+    uncached = StatelessJWTAuthentication()
+    uncached.token_cache = None
+    cached = StatelessJWTAuthentication()
+    cached.token_cache = ValidatedTokenCache(maxsize=16)
+
+    results = [
+        {
+            "name": "auth.jwt_uncached",
+            "seconds": measure(lambda: uncached.authenticate(request), iterations),
+        },
+        {
+            "name": "auth.jwt_cached",
+            "seconds": measure(lambda: cached.authenticate(request), iterations),
+        },
+    ]
+    stats = cached.token_cache.stats()
+    results[1]["extra"] = f"hits={stats['hits']} misses={stats['misses']}"
+    return results
@@ -0,0 +1,177 @@
+"""Throughput of the hot reads under concurrent load, WSGI against ASGI.
+
+The WSGI deployment is a pool of `CONCURRENCY` threads calling the WSGI
+handler with the sync viewsets, like threaded workers. The ASGI deployment
+runs as many requests at once on one event loop through the ASGI handler with
+the async views. Both run in-process against the seeded database, without a
+server or network in front. Django's async ORM still runs the queries in a
+thread per request, what the ASGI side saves is the worker per connection.
+"""
+
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import override_settings
+
+from backend.models import Property
+
+from .api import get_access_token
+
+# Takes a dataset size, run inside `seeded_database(size)`
+SIZED = True
+
+# Requests in flight at any time
+CONCURRENCY = 64
+
+
+def get_endpoints(size):
+    """Name, sync path and async path of every benchmarked endpoint"""
+    detail_id = Property.objects.order_by("pk").values_list("pk", flat=True)[size // 2]
+    return [
+        ("properties.list", "/api/properties/", "/api/async/properties/"),
+        (
+            "properties.detail",
+            f"/api/properties/{detail_id}/",
+            f"/api/async/properties/{detail_id}/",
+        ),
+        (
+            "properties.facets",
+            "/api/properties/facets/",
+            "/api/async/properties/facets/",
+        ),
+        ("users.me", "/api/users/me/", "/api/async/users/me/"),
+    ]
+
+
+def wsgi_get(handler, path, token):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_AUTHORIZATION": f"Bearer {token}",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(),
+        "wsgi.errors": BytesIO(),
+    }
+    statuses = []
+    body = handler(environ, lambda status, headers: statuses.append(status))
+    try:
+        for _ in body:
+            pass
+    finally:
+        body.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_get(handler, path, token):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    statuses = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # The client stays connected, Django cancels this once it responded
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    await handler(scope, receive, send)
+    return statuses[0]
+
+
+def timed(get):
+    start = time.perf_counter()
+    status = get()
+    assert status == 200, status
+    return time.perf_counter() - start
+
+
+def run_wsgi(path, token, requests):
+    handler = WSGIHandler()
+    timed(lambda: wsgi_get(handler, path, token))  # warm up
+
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        start = time.perf_counter()
+        latencies = list(
+            pool.map(
+                lambda _: timed(lambda: wsgi_get(handler, path, token)), range(requests)
+            )
+        )
+        return time.perf_counter() - start, latencies
+
+
+async def run_asgi(path, token, requests):
+    handler = ASGIHandler()
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def request():
+        async with semaphore:
+            start = time.perf_counter()
+            status = await asgi_get(handler, path, token)
+            assert status == 200, status
+            return time.perf_counter() - start
+
+    await request()  # warm up
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(request() for _ in range(requests)))
+    return time.perf_counter() - start, latencies
+
+
+def result(name, elapsed, latencies):
+    return {
+        "name": name,
+        "seconds": elapsed / len(latencies),
+        "p95": statistics.quantiles(latencies, n=20)[-1],
+        "extra": f"{len(latencies) / elapsed:>8.0f} req/s",
+    }
+
+
+def run(iterations, size):
+    """`iterations` requests per concurrent client and endpoint, caches off.
+
+    `seconds` is the wall time per request at full load, the inverse of the
+    throughput, `p95` the latency clients saw.
+    """
+    token = get_access_token()
+    requests = iterations * CONCURRENCY
+    results = []
+    with override_settings(
+        PROPERTY_RESPONSE_CACHE_TIMEOUT=0, PROPERTY_FACETS_CACHE_TIMEOUT=0
+    ):
+        cache.clear()
+        for name, sync_path, async_path in get_endpoints(size):
+            elapsed, latencies = run_wsgi(sync_path, token, requests)
+            results.append(result(f"{name}.wsgi", elapsed, latencies))
+
+            elapsed, latencies = asyncio.run(run_asgi(async_path, token, requests))
+            results.append(result(f"{name}.asgi", elapsed, latencies))
+    return results
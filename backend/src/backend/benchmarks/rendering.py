@@ -0,0 +1,76 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+
+from backend.api.properties import export
+from backend.api.properties.serializers import PropertySerializer
+from backend.api.properties.values import ValuesSerializer
+from backend.api.renderers import (
+    MessagePackRenderer,
+    ORJSONRenderer,
+    dumps_strict,
+    msgpack,
+)
+from backend.models import Property
+
+from . import profile
+
+# Takes a dataset size, run inside `seeded_database(size)`
+SIZED = True
+
+PAGE_SIZES = (100, 1_000)
+
+
+def run(iterations, size):
+    """Property list pages and export lines encoded by each renderer.
+
+    Rows are fetched once, only the encoding is measured. `extra` tells the
+    rows per second and the encoded size.
+    """
+    values = ValuesSerializer(PropertySerializer)
+    queryset = Property.objects.order_by("-created_at", "-id")
+    renderers = {"json": JSONRenderer(), "orjson": ORJSONRenderer()}
+    if msgpack is not None:
+        renderers["msgpack"] = MessagePackRenderer()
+
+    results = []
+    for page_size in PAGE_SIZES:
+        rows = values.get_queryset(queryset)[:page_size]
+        page = {
+            "next": None,
+            "previous": None,
+            "results": values.to_representation(rows, queryset),
+        }
+        count = len(page["results"])
+        for name, renderer in renderers.items():
+            result = profile(
+                lambda renderer=renderer, page=page: renderer.render(page), iterations
+            )
+            results.append(
+                {
+                    "name": f"rendering.list_{name}_{page_size}",
+                    **result,
+                    "extra": f"rows/s={count / result['seconds']:,.0f} "
+                    f"bytes={len(renderer.render(page)):,}",
+                }
+            )
+
+    lines = [
+        dict(zip(export.FIELDS, map(export.to_primitive, row)))
+        for row in queryset.values_list(*export.FIELDS)[: PAGE_SIZES[-1]]
+    ]
+    for name, encode in (
+        ("json", lambda line: json.dumps(line).encode() + b"\n"),
+        ("orjson", lambda line: dumps_strict(line) + b"\n"),
+    ):
+        result = profile(
+            lambda encode=encode: [encode(line) for line in lines], iterations
+        )
+        results.append(
+            {
+                "name": f"rendering.export_ndjson_{name}",
+                **result,
+                "extra": f"rows/s={len(lines) / result['seconds']:,.0f}",
+            }
+        )
+    return results
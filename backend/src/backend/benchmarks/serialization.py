@@ -0,0 +1,43 @@
+from backend.api.properties.serializers import PropertySerializer
+from backend.api.properties.values import ValuesSerializer
+from backend.models import Property
+
+from . import profile
+
+# Takes a dataset size, run inside `seeded_database(size)`
+SIZED = True
+
+PAGE_SIZES = (100, 1_000)
+
+
+def run(iterations, size):
+    """A property list page fetched and serialized, per instance and per row.
+
+    Compares `PropertySerializer` over model instances with the `.values()`
+    fast path the list endpoint uses, `extra` tells the rows per second.
+    """
+    values = ValuesSerializer(PropertySerializer)
+    queryset = Property.objects.order_by("-created_at", "-id")
+
+    results = []
+    for page_size in PAGE_SIZES:
+        rows = min(page_size, size)
+
+        def instances(page_size=page_size):
+            return PropertySerializer(queryset[:page_size], many=True).data
+
+        def dicts(page_size=page_size):
+            return values.to_representation(
+                values.get_queryset(queryset)[:page_size], queryset
+            )
+
+        for name, func in (("model_serializer", instances), ("values", dicts)):
+            result = profile(func, iterations)
+            results.append(
+                {
+                    "name": f"serialization.{name}_{page_size}",
+                    **result,
+                    "extra": f"rows/s={rows / result['seconds']:,.0f}",
+                }
+            )
+    return results
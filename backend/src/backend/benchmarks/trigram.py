@@ -0,0 +1,66 @@
+from django.db import connection, transaction
+
+from backend.api.properties.filters import PropertyFilter
+from backend.models import Property
+
+from . import BenchmarkSkipped, explain_analyze
+
+# Takes a dataset size, run inside `seeded_database(size)`
+SIZED = True
+
+FILTERS = {
+    "city_icontains": {"city__icontains": "spring"},
+    "city_similar": {"city_similar": "Sprngfield"},
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def run(iterations, size):
+    """Plans of the city filters with and without the trigram indexes.
+
+    The 1M rows size reproduces the production plans. The freshly seeded table
+    is analyzed first, the planner only picks the indexes with statistics.
+    Index scans are disabled with SET LOCAL to get the pre-index plan, so no
+    DDL or locks are involved.
+    """
+    if connection.vendor != "postgresql":
+        raise BenchmarkSkipped("requires Postgres")
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            raise BenchmarkSkipped("requires the pg_trgm extension")
+        cursor.execute(f"ANALYZE {connection.ops.quote_name(Property._meta.db_table)}")
+
+    results = []
+    for name, params in FILTERS.items():
+        queryset = PropertyFilter(params, queryset=Property.objects.all()).qs[:10]
+
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_indexscan = off")
+                    cursor.execute("SET LOCAL enable_bitmapscan = off")
+                seconds, scans = explain_analyze(queryset)
+                results.append(
+                    {
+                        "name": f"trigram.{name}_without_index",
+                        "seconds": seconds,
+                        "extra": f"scans={','.join(scans)}",
+                    }
+                )
+                raise Rollback
+        except Rollback:
+            pass
+
+        seconds, scans = explain_analyze(queryset)
+        results.append(
+            {
+                "name": f"trigram.{name}_indexed",
+                "seconds": seconds,
+                "extra": f"scans={','.join(scans)}",
+            }
+        )
+    return results
@@ -0,0 +1,203 @@
+"""Precomputed map clusters of properties.
+
+Clusters are geohash cells, one precision per band of map zoom levels, so a
+property falls in exactly one cell per precision and a cell's properties are
+a prefix scan on the geohash index.
+"""
+
+from itertools import product
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FloatField, Max, Min, Q, Sum, Value
+from django.db.models.functions import Cast, Greatest, Least, Substr
+
+from . import geo
+from .models import Property, PropertyCluster
+
+# Geohash precision clustered at each map zoom level, from PIN_ZOOM on the map
+# shows individual properties
+ZOOM_PRECISIONS = (1, 1, 1, 2, 2, 3, 3, 3, 4, 4, 5, 5, 5, 6, 6)
+PRECISIONS = sorted(set(ZOOM_PRECISIONS))
+PIN_ZOOM = len(ZOOM_PRECISIONS)
+
+# Viewports needing more cells than this are clustered one precision coarser
+MAX_CELLS = 2048
+
+
+def precision_for_zoom(zoom):
+    return ZOOM_PRECISIONS[min(max(zoom, 0), PIN_ZOOM - 1)]
+
+
+def cells_in_bbox(west, south, east, north, precision):
+    """Geohash cells of `precision` intersecting a bounding box"""
+    height, width = geo.cell_size(precision)
+    # Boxes crossing the antimeridian are split in two
+    lng_ranges = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+
+    first_row = int((south + 90) // height)
+    last_row = int(min((north + 90) // height, 180 / height - 1))
+    cells = set()
+    for low, high in lng_ranges:
+        first_col = int((low + 180) // width)
+        last_col = int(min((high + 180) // width, 360 / width - 1))
+        if (last_row - first_row + 1) * (last_col - first_col + 1) > MAX_CELLS:
+            return None
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                latitude = (row + 0.5) * height - 90
+                longitude = (col + 0.5) * width - 180
+                cells.add(geo.encode(latitude, longitude, precision))
+    return cells
+
+
+def viewport_cells(west, south, east, north, zoom):
+    """Precision and cells of a viewport, coarser if it spans too many cells"""
+    precision = precision_for_zoom(zoom)
+    while True:
+        cells = cells_in_bbox(west, south, east, north, precision)
+        if cells is not None or precision == PRECISIONS[0]:
+            return precision, cells
+        precision = PRECISIONS[PRECISIONS.index(precision) - 1]
+
+
+def cluster_deltas(added, removed):
+    """Per cluster changes of adding and removing `Property.get_cluster_state()`s"""
+    deltas = {}
+    for sign, states in ((1, added), (-1, removed)):
+        for geohash, latitude, longitude, status, property_type, price in states:
+            if not geohash:
+                continue
+            for precision in PRECISIONS:
+                key = (precision, geohash[:precision], status, property_type)
+                delta = deltas.setdefault(
+                    key, {"count": 0, "latitude": 0.0, "longitude": 0.0, 1: [], -1: []}
+                )
+                delta["count"] += sign
+                delta["latitude"] += sign * latitude
+                delta["longitude"] += sign * longitude
+                delta[sign].append(price)
+    return deltas
+
+
+def price_range(precision, cell, status, property_type):
+    """Lowest and highest price of a cluster's properties.
+
+    Read from the properties of the cell at the finest precision and from the
+    cell's clusters one precision finer otherwise, at most 32 of them.
+    """
+    if precision == PRECISIONS[-1]:
+        return Property.objects.filter(
+            geohash__startswith=cell, status=status, property_type=property_type
+        ).aggregate(price_min=Min("price"), price_max=Max("price"))
+
+    finer = PRECISIONS[PRECISIONS.index(precision) + 1]
+    children = [
+        cell + "".join(suffix)
+        for suffix in product(geo.BASE32, repeat=finer - precision)
+    ]
+    return PropertyCluster.objects.filter(
+        precision=finer, cell__in=children, status=status, property_type=property_type
+    ).aggregate(price_min=Min("price_min"), price_max=Max("price_max"))
+
+
+def apply(added=(), removed=()):
+    """Count properties into and out of their clusters.
+
+    One update per affected cluster, however many properties it gains or
+    loses. A price range cannot be decremented, so it is re-read with
+    `price_range` when a removed price was one of its edges. Clusters are
+    updated finest first, coarser ranges are read from the finer clusters.
+    """
+    deltas = cluster_deltas(added, removed)
+    with transaction.atomic():
+        for key in sorted(deltas, key=lambda key: key[0], reverse=True):
+            precision, cell, status, property_type = key
+            delta = deltas[key]
+            lookup = {
+                "precision": precision,
+                "cell": cell,
+                "status": status,
+                "property_type": property_type,
+            }
+            clusters = PropertyCluster.objects.filter(**lookup)
+            added_prices, removed_prices = delta[1], delta[-1]
+
+            changes = {
+                "count": F("count") + delta["count"],
+                "latitude_sum": F("latitude_sum") + delta["latitude"],
+                "longitude_sum": F("longitude_sum") + delta["longitude"],
+            }
+            if added_prices:
+                changes.update(
+                    price_min=Least("price_min", Value(min(added_prices))),
+                    price_max=Greatest("price_max", Value(max(added_prices))),
+                )
+            if not clusters.update(**changes) and added_prices:
+                try:
+                    with transaction.atomic():
+                        PropertyCluster.objects.create(
+                            **lookup,
+                            count=delta["count"],
+                            latitude_sum=delta["latitude"],
+                            longitude_sum=delta["longitude"],
+                            price_min=min(added_prices),
+                            price_max=max(added_prices),
+                        )
+                except IntegrityError:
+                    # Created concurrently, count on top of it
+                    clusters.update(**changes)
+
+            if removed_prices:
+                clusters.filter(count__lte=0).delete()
+                edges = Q(price_min__in=removed_prices)
+                edges |= Q(price_max__in=removed_prices)
+                if clusters.filter(edges).exists():
+                    prices = price_range(precision, cell, status, property_type)
+                    # Queryset deletes remove every row before the per-row
+                    # signals, the cluster goes once they all counted out
+                    if prices["price_min"] is not None:
+                        clusters.update(**prices)
+
+
+def aggregate_cells(queryset, precision, *fields):
+    """Group properties by geohash cell and `fields` like `PropertyCluster`"""
+    return (
+        queryset.exclude(geohash="")
+        .annotate(cell=Substr("geohash", 1, precision))
+        .order_by()
+        .values("cell", *fields)
+        .annotate(
+            total=Count("id"),
+            latitude_total=Sum(Cast("latitude", FloatField())),
+            longitude_total=Sum(Cast("longitude", FloatField())),
+            lowest_price=Min("price"),
+            highest_price=Max("price"),
+        )
+    )
+
+
+def rebuild():
+    """Recompute every cluster from the properties table"""
+    with transaction.atomic():
+        PropertyCluster.objects.all().delete()
+        for precision in PRECISIONS:
+            rows = aggregate_cells(
+                Property.objects.all(), precision, "status", "property_type"
+            )
+            PropertyCluster.objects.bulk_create(
+                (
+                    PropertyCluster(
+                        precision=precision,
+                        cell=row["cell"],
+                        status=row["status"],
+                        property_type=row["property_type"],
+                        count=row["total"],
+                        latitude_sum=row["latitude_total"],
+                        longitude_sum=row["longitude_total"],
+                        price_min=row["lowest_price"],
+                        price_max=row["highest_price"],
+                    )
+                    for row in rows.iterator(chunk_size=2000)
+                ),
+                batch_size=2000,
+            )
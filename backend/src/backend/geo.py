@@ -0,0 +1,90 @@
+"""Geohash helpers for prefiltering properties by location.
+
+A geohash interleaves longitude and latitude bits into a base32 string, so
+points sharing a prefix share a cell and a prefix match is a B-tree range
+scan. Cells are coarse: callers refine candidates with `haversine_km`.
+"""
+
+import math
+
+from django.db.models import F, FloatField
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+PRECISION = 12
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Geohash of a point with `precision` characters"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars, bits, value, even = [], 0, 0, True
+
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Height and width in degrees of a geohash cell"""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180 / 2**lat_bits, 360 / 2**lng_bits
+
+
+def covering_prefixes(latitude, longitude, radius_km):
+    """Geohash prefixes whose cells cover a circle around a point.
+
+    Picks the finest precision whose cells are at least `radius_km` in both
+    directions, then returns the cell of the center and its eight neighbours.
+    An empty list means the circle is too large to prefilter.
+    """
+    latitude, longitude = float(latitude), float(longitude)
+    # Cells narrow towards the poles, size them for the circle's widest latitude
+    widest_latitude = min(abs(latitude) + radius_km / KM_PER_DEGREE, 89.0)
+    km_per_lng_degree = KM_PER_DEGREE * math.cos(math.radians(widest_latitude))
+
+    precision = 0
+    for candidate in range(1, PRECISION + 1):
+        height, width = cell_size(candidate)
+        if height * KM_PER_DEGREE < radius_km or width * km_per_lng_degree < radius_km:
+            break
+        precision = candidate
+    if precision == 0:
+        return []
+
+    height, width = cell_size(precision)
+    prefixes = set()
+    for lat_step in (-1, 0, 1):
+        for lng_step in (-1, 0, 1):
+            lat = max(min(latitude + lat_step * height, 90.0), -90.0)
+            lng = (longitude + lng_step * width + 180) % 360 - 180
+            prefixes.add(encode(lat, lng, precision))
+    return sorted(prefixes)
+
+
+def haversine_km(latitude, longitude, lat_field="latitude", lng_field="longitude"):
+    """Database expression for the great-circle distance in km to a point"""
+    lat1, lng1 = math.radians(float(latitude)), math.radians(float(longitude))
+    lat2 = Radians(Cast(F(lat_field), FloatField()))
+    lng2 = Radians(Cast(F(lng_field), FloatField()))
+
+    a = Power(Sin((lat2 - lat1) / 2), 2) + math.cos(lat1) * Cos(lat2) * Power(
+        Sin((lng2 - lng1) / 2), 2
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a), output_field=FloatField())
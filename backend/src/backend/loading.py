@@ -0,0 +1,80 @@
+"""Bulk loading of properties.
+
+Postgres streams the rows with COPY into a temporary table and merges them
+with one INSERT ... ON CONFLICT, other databases use `bulk_create`. Either
+way rows with a known `external_id` update the existing property.
+
+COPY keeps the given `created_at` and `modified_at`, `bulk_create` stamps
+them with the current time.
+
+Like every bulk write this skips the model signals, callers rebuild the map
+clusters and bump the properties version once they are done.
+"""
+
+from django.db import connections, transaction
+
+from .models import Property
+
+FIELDS = (
+    "title",
+    "description",
+    "property_type",
+    "status",
+    "price",
+    "size",
+    "address",
+    "city",
+    "state",
+    "zip_code",
+    "latitude",
+    "longitude",
+    "geohash",
+    "external_id",
+    "created_by",
+    "created_at",
+    "modified_at",
+)
+# Fields an upsert leaves alone on existing properties
+KEEP_ON_UPDATE = ("external_id", "created_by", "created_at")
+UPDATE_FIELDS = tuple(field for field in FIELDS if field not in KEEP_ON_UPDATE)
+
+
+def load_properties(properties, using="default"):
+    """Insert or update unsaved `Property` instances in one transaction"""
+    with transaction.atomic(using=using):
+        if connections[using].vendor == "postgresql":
+            copy_properties(properties, using)
+        else:
+            Property.objects.using(using).bulk_create(
+                properties,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=["external_id"],
+                update_fields=UPDATE_FIELDS,
+            )
+
+
+def copy_properties(properties, using):
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    fields = [Property._meta.get_field(name) for name in FIELDS]
+    columns = ", ".join(quote(field.column) for field in fields)
+    updates = ", ".join(
+        f"{quote(column)} = EXCLUDED.{quote(column)}"
+        for column in (Property._meta.get_field(name).column for name in UPDATE_FIELDS)
+    )
+    table = quote(Property._meta.db_table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE property_load AS "
+            f"SELECT {columns} FROM {table} WITH NO DATA"
+        )
+        with cursor.copy(f"COPY property_load ({columns}) FROM STDIN") as copy:
+            for prop in properties:
+                copy.write_row([getattr(prop, field.attname) for field in fields])
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM property_load "
+            f"ON CONFLICT ({quote('external_id')}) DO UPDATE SET {updates}"
+        )
+        cursor.execute("DROP TABLE property_load")
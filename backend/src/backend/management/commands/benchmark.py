@@ -0,0 +1,147 @@
+import json
+import platform
+from importlib import import_module
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from backend.benchmarks import BenchmarkSkipped, seeded_database
+
+BENCHMARKS = {
+    "api": "backend.benchmarks.api",
+    "auth": "backend.benchmarks.auth",
+    "concurrency": "backend.benchmarks.concurrency",
+    "rendering": "backend.benchmarks.rendering",
+    "serialization": "backend.benchmarks.serialization",
+    "trigram": "backend.benchmarks.trigram",
+}
+
+
+def parse_sizes(value):
+    try:
+        return [int(size) for size in value.split(",")]
+    except ValueError as e:
+        raise CommandError(f"Invalid --sizes {value!r}") from e
+
+
+class Command(BaseCommand):
+    help = "Runs microbenchmarks for the API hot paths"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help=f"Benchmarks to run, one of: {', '.join(BENCHMARKS)} (default: all)",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            help="Calls per measurement (default: 10000, 20 for dataset benchmarks)",
+        )
+        parser.add_argument(
+            "--sizes",
+            default="10000,100000,1000000",
+            help="Comma separated property counts the dataset benchmarks run against",
+        )
+        parser.add_argument(
+            "--report", type=Path, help="Write the results to this JSON file"
+        )
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            help="JSON report to compare against, fails on regressions",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Slowdown over the baseline accepted before failing (default: 0.2)",
+        )
+
+    def handle(self, *args, **options):
+        names = options["names"] or list(BENCHMARKS)
+        unknown = set(names) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+        sizes = parse_sizes(options["sizes"])
+
+        results = []
+        for name in names:
+            module = import_module(BENCHMARKS[name])
+            if getattr(module, "SIZED", False):
+                iterations = options["iterations"] or 20
+                for size in sizes:
+                    with seeded_database(size):
+                        results += self.run_module(name, module, iterations, size=size)
+            else:
+                results += self.run_module(
+                    name, module, options["iterations"] or 10_000
+                )
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "results": results,
+        }
+        if options["report"]:
+            options["report"].write_text(json.dumps(report, indent=2) + "\n")
+        if options["baseline"]:
+            self.compare(results, options["baseline"], options["tolerance"])
+
+    def run_module(self, name, module, iterations, **kwargs):
+        try:
+            results = module.run(iterations=iterations, **kwargs)
+        except BenchmarkSkipped as e:
+            self.stdout.write(self.style.WARNING(f"{name} skipped: {e}"))
+            return []
+
+        for result in results:
+            result.update(kwargs)
+            self.stdout.write(self.format_result(result))
+        return results
+
+    def format_result(self, result):
+        line = f"{self.format_label(result):<40} {result['seconds'] * 1e6:>12.2f} us/op"
+        if "p95" in result:
+            line = f"{line}  p95 {result['p95'] * 1e6:>10.2f} us"
+        if "queries" in result:
+            line = (
+                f"{line}  {result['queries']:>3} queries  {result['peak_kb']:>8.1f} KiB"
+            )
+        if result.get("extra"):
+            line = f"{line}  {result['extra']}"
+        return line
+
+    def compare(self, results, baseline_path, tolerance):
+        """Report changes against a baseline, raise on slowdowns or extra queries"""
+        baseline = {
+            (result["name"], result.get("size")): result
+            for result in json.loads(baseline_path.read_text())["results"]
+        }
+        regressions = []
+        self.stdout.write(f"\nCompared to {baseline_path}:")
+        for result in results:
+            before = baseline.get((result["name"], result.get("size")))
+            if before is None:
+                continue
+            change = result["seconds"] / before["seconds"] - 1
+            line = f"{self.format_label(result):<40} {change:>+8.1%}"
+            slower = change > tolerance
+            more_queries = result.get("queries", 0) > before.get("queries", 0)
+            if more_queries:
+                line = f"{line}  queries {before['queries']} -> {result['queries']}"
+            if slower or more_queries:
+                regressions.append(self.format_label(result))
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+        if regressions:
+            raise CommandError(f"Regressions: {', '.join(regressions)}")
+
+    def format_label(self, result):
+        if "size" in result:
+            return f"{result['name']}[{result['size']}]"
+        return result["name"]
@@ -0,0 +1,171 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from backend import clusters
+from backend.api.properties import cache as property_cache
+from backend.api.properties.serializers import PropertySerializer
+from backend.loading import load_properties
+from backend.models import Property
+
+User = get_user_model()
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+class PropertyImportSerializer(PropertySerializer):
+    class Meta(PropertySerializer.Meta):
+        fields = [*PropertySerializer.Meta.fields, "external_id"]
+        # Existing ids are upserted, not rejected, and checking them row by
+        # row would cost a query each
+        extra_kwargs = {"external_id": {"validators": []}}
+
+
+def read_csv(file):
+    for row in csv.DictReader(file):
+        # Empty cells are missing values, not empty strings
+        yield {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def read_ndjson(file):
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        yield row if isinstance(row, dict) else {"__invalid__": line.rstrip("\n")}
+
+
+class Command(BaseCommand):
+    help = "Imports properties from a CSV or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path, help="CSV or NDJSON file to import")
+        parser.add_argument(
+            "--format",
+            choices=sorted(set(FORMATS.values())),
+            help="File format (default: from the file extension)",
+        )
+        parser.add_argument(
+            "--created-by",
+            required=True,
+            help="Username of the agent new properties are created by",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5_000,
+            help="Rows validated and written per transaction",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the file without writing anything",
+        )
+        parser.add_argument(
+            "--rejects",
+            type=Path,
+            help="NDJSON file receiving the rejected rows and their errors",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or FORMATS.get(path.suffix.lower())
+        if file_format is None:
+            raise CommandError(f"Cannot tell the format of {path}, pass --format")
+        try:
+            self.owner = User.objects.get(username=options["created_by"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user {options['created_by']!r}") from None
+
+        # Building the serializer fields costs more than validating a row, one
+        # instance validates the whole file
+        self.serializer = PropertyImportSerializer()
+        dry_run = options["dry_run"]
+        rejects = options["rejects"].open("w") if options["rejects"] else None
+        totals = {"rows": 0, "created": 0, "updated": 0, "rejected": 0}
+        started = time.monotonic()
+        try:
+            with path.open(newline="") as file:
+                reader = read_csv(file) if file_format == "csv" else read_ndjson(file)
+                rows = enumerate(reader, start=1)
+                while batch := list(islice(rows, options["batch_size"])):
+                    properties, rejected = self.validate(batch)
+                    created, updated = self.count_upserts(properties)
+                    if not dry_run and properties:
+                        load_properties(properties)
+
+                    for line, row, errors in rejected:
+                        if rejects:
+                            rejects.write(
+                                json.dumps({"row": line, "errors": errors, "data": row})
+                                + "\n"
+                            )
+                    totals["rows"] += len(batch)
+                    totals["created"] += created
+                    totals["updated"] += updated
+                    totals["rejected"] += len(rejected)
+                    self.report(totals, started)
+        finally:
+            if rejects:
+                rejects.close()
+
+        if not dry_run and totals["created"] + totals["updated"]:
+            clusters.rebuild()
+            property_cache.bump_version()
+
+        prefix = "Dry run: " if dry_run else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}{totals['created']:,} created, {totals['updated']:,} updated, "
+                f"{totals['rejected']:,} rejected of {totals['rows']:,} rows "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+        )
+
+    def validate(self, batch):
+        """Valid rows as unsaved properties, the rest with their errors"""
+        now = timezone.now()
+        properties, rejected = {}, []
+        for line, row in batch:
+            if "__invalid__" in row:
+                rejected.append((line, row["__invalid__"], {"row": ["Invalid JSON."]}))
+                continue
+            try:
+                attrs = self.serializer.run_validation(row)
+            except ValidationError as exc:
+                rejected.append((line, row, exc.detail))
+                continue
+
+            prop = Property(
+                **attrs,
+                created_by=self.owner,
+                created_at=now,
+                modified_at=now,
+            )
+            prop.geohash = prop.compute_geohash()
+            # A listing repeated within the batch keeps its last version
+            properties[prop.external_id or ("line", line)] = prop
+        return list(properties.values()), rejected
+
+    def count_upserts(self, properties):
+        external_ids = [prop.external_id for prop in properties if prop.external_id]
+        existing = Property.objects.filter(external_id__in=external_ids).count()
+        return len(properties) - existing, existing
+
+    def report(self, totals, started):
+        elapsed = time.monotonic() - started
+        rate = totals["rows"] / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{totals['rows']:,} rows, {totals['rejected']:,} rejected, "
+            f"{rate:,.0f} rows/s"
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from backend import clusters
+from backend.models import PropertyCluster
+
+
+class Command(BaseCommand):
+    help = "Recomputes the map clusters from the properties table"
+
+    def handle(self, *args, **options):
+        clusters.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {PropertyCluster.objects.count()} clusters "
+                f"for precisions {', '.join(map(str, clusters.PRECISIONS))}"
+            )
+        )
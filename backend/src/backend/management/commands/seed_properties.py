@@ -1,56 +1,157 @@
-from django.core.management.base import BaseCommand
+import os
+import time
+from multiprocessing import Pool
+
 from django.contrib.auth import get_user_model
-from backend.models import Property
-from faker import Faker
-from decimal import Decimal
-import random
+from django.core.management.base import BaseCommand, CommandError
+
+from backend import clusters, seeding
+from backend.api.properties import cache as property_cache
+from backend.loading import load_properties
+from backend.models import Property, UserRole
 
 User = get_user_model()
 
+
+def chunk_sizes(count, batch_size):
+    return [min(batch_size, count - start) for start in range(0, count, batch_size)]
+
+
 class Command(BaseCommand):
-    help = 'Seeds the database with 1000 properties'
+    help = "Seeds the database with reproducible fake properties"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=1_000, help="Properties to create"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Same seed, same properties"
+        )
+        parser.add_argument(
+            "--agents", type=int, default=10, help="Agents owning the properties"
+        )
+        parser.add_argument("--cities", type=int, default=50, help="Distinct cities")
+        parser.add_argument(
+            "--city-skew",
+            type=float,
+            default=1.0,
+            help="Zipf exponent of city popularity, 0 spreads listings evenly",
+        )
+        parser.add_argument(
+            "--price-median", type=float, default=350_000, help="Median price"
+        )
+        parser.add_argument(
+            "--price-skew",
+            type=float,
+            default=0.6,
+            help="Sigma of the log-normal price distribution",
+        )
+        parser.add_argument(
+            "--on-market-ratio",
+            type=float,
+            default=0.7,
+            help="Share of listings on the market",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Processes generating rows",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Rows generated and written per batch",
+        )
 
     def handle(self, *args, **options):
-        fake = Faker()
-        
-        # Get or create a user for the properties
-        user, _ = User.objects.get_or_create(
-            username='admin',
+        if options["count"] < 0 or options["agents"] < 1 or options["cities"] < 1:
+            raise CommandError("--count, --agents and --cities must be positive")
+
+        agents = self.get_agents(options["agents"])
+        catalog_args = (
+            options["seed"],
+            options["cities"],
+            options["city_skew"],
+            options["price_median"],
+            options["price_skew"],
+            options["on_market_ratio"],
+        )
+        chunks = [
+            (chunk, size, options["seed"])
+            for chunk, size in enumerate(
+                chunk_sizes(options["count"], options["batch_size"])
+            )
+        ]
+
+        self.stdout.write(f"Seeding {options['count']:,} properties...")
+        started = time.monotonic()
+        created = 0
+        if options["workers"] > 1 and len(chunks) > 1:
+            pool = Pool(
+                options["workers"],
+                initializer=seeding.init_catalog,
+                initargs=catalog_args,
+            )
+            with pool:
+                # Ordered, so rows are written in the same order for a seed
+                for rows in pool.imap(seeding.generate, chunks):
+                    created += self.write(rows, agents, created)
+                    self.report(created, started)
+        else:
+            seeding.init_catalog(*catalog_args)
+            for chunk in chunks:
+                created += self.write(seeding.generate(chunk), agents, created)
+                self.report(created, started)
+
+        clusters.rebuild()
+        property_cache.bump_version()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created:,} properties in {time.monotonic() - started:.1f}s"
+            )
+        )
+
+    def get_agents(self, count):
+        """The admin account and `count` seed agents, created when missing"""
+        admin, created = User.objects.get_or_create(
+            username="admin",
             defaults={
-                'is_staff': True,
-                'is_superuser': True,
-                'email': 'admin@example.com'
-            }
-        )
-        
-        # Set password if user was just created
-        if _:
-            user.set_password('admin')
-            user.save()
-
-        property_types = ['residential', 'commercial']
-        statuses = ['on_market', 'off_market']
-
-        self.stdout.write('Starting to seed properties...')
-
-        for i in range(1000):
-            property = Property.objects.create(
-                title=fake.sentence(nb_words=4)[:-1],  # Remove trailing period
-                description=fake.text(max_nb_chars=100),
-                property_type=random.choice(property_types),
-                status=random.choice(statuses),
-                price=Decimal(str(random.uniform(100000, 2000000))).quantize(Decimal('0.01')),
-                size=Decimal(str(random.uniform(500, 10000))).quantize(Decimal('0.01')),
-                address=fake.street_address(),
-                city=fake.city(),
-                state=fake.state(),
-                zip_code=fake.zipcode(),
-                latitude=Decimal(str(fake.latitude())),
-                longitude=Decimal(str(fake.longitude())),
-                created_by=user
+                "is_staff": True,
+                "is_superuser": True,
+                "email": "admin@example.com",
+            },
+        )
+        if created:
+            admin.set_password("admin")
+            admin.save()
+
+        role, _ = UserRole.objects.get_or_create(name=UserRole.AGENT)
+        agents = []
+        for i in range(1, count + 1):
+            agent, created = User.objects.get_or_create(
+                username=f"agent{i}", defaults={"email": f"agent{i}@example.com"}
+            )
+            if created:
+                agent.set_password("agent")
+                agent.save()
+                agent.roles.add(role)
+            agents.append(agent)
+        return agents
+
+    def write(self, rows, agents, offset):
+        properties = []
+        for i, row in enumerate(rows, start=offset):
+            prop = Property(
+                **dict(zip(seeding.FIELDS, row)), created_by=agents[i % len(agents)]
             )
-            
-            if (i + 1) % 100 == 0:
-                self.stdout.write(f'Created {i + 1} properties...')
+            prop.modified_at = prop.created_at
+            properties.append(prop)
+        load_properties(properties)
+        return len(properties)
 
-        self.stdout.write(self.style.SUCCESS('Successfully created 1000 properties!'))
+    def report(self, created, started):
+        elapsed = time.monotonic() - started
+        rate = created / elapsed if elapsed else 0
+        self.stdout.write(f"Created {created:,} properties, {rate:,.0f} rows/s")
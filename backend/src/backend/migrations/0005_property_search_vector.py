@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+import backend.operations
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}city, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}address, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}description, '')), 'C')
+"""
+
+CREATE_TRIGGER_SQL = f"""
+CREATE FUNCTION properties_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR_SQL.format(row="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER properties_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, address, city ON properties
+    FOR EACH ROW EXECUTE FUNCTION properties_search_vector_update();
+
+UPDATE properties SET search_vector = {SEARCH_VECTOR_SQL.format(row="")};
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS properties_search_vector_trigger ON properties;
+DROP FUNCTION IF EXISTS properties_search_vector_update();
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0004_property_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='search vector'),
+        ),
+        backend.operations.PostgresRunSQL(CREATE_TRIGGER_SQL, DROP_TRIGGER_SQL),
+        backend.operations.PostgresAddIndex(
+            model_name='property',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='properties_search_idx'),
+        ),
+    ]
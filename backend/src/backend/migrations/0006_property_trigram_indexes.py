@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:22
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.db.models.functions.text
+from django.db import migrations
+
+import backend.operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0005_property_search_vector'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        backend.operations.PostgresAddIndex(
+            model_name='property',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('city'), name='gin_trgm_ops'), name='properties_city_trgm_idx'),
+        ),
+        backend.operations.PostgresAddIndex(
+            model_name='property',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('state'), name='gin_trgm_ops'), name='properties_state_trgm_idx'),
+        ),
+        backend.operations.PostgresAddIndex(
+            model_name='property',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('address'), name='gin_trgm_ops'), name='properties_address_trgm_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:23
+
+from django.db import migrations, models
+
+import backend.operations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('backend', '0006_property_trigram_indexes'),
+    ]
+
+    operations = [
+        backend.operations.AddIndexConcurrentlyOnPostgres(
+            model_name='property',
+            index=models.Index(condition=models.Q(('status', 'on_market')), fields=['created_at', 'id'], name='properties_on_market_idx'),
+        ),
+        backend.operations.AddIndexConcurrentlyOnPostgres(
+            model_name='property',
+            index=models.Index(condition=models.Q(('status', 'on_market')), fields=['price', 'id'], name='properties_on_market_price_idx'),
+        ),
+        backend.operations.AddIndexConcurrentlyOnPostgres(
+            model_name='property',
+            index=models.Index(fields=['property_type', 'price'], name='properties_type_price_idx'),
+        ),
+        backend.operations.AddIndexConcurrentlyOnPostgres(
+            model_name='property',
+            index=models.Index(fields=['city', 'status', 'created_at'], name='properties_city_status_idx'),
+        ),
+        backend.operations.AddIndexConcurrentlyOnPostgres(
+            model_name='property',
+            index=models.Index(fields=['state', 'city'], name='properties_state_city_idx'),
+        ),
+        backend.operations.AddIndexConcurrentlyOnPostgres(
+            model_name='property',
+            index=models.Index(fields=['zip_code'], name='properties_zip_code_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:25
+
+from django.db import migrations, models
+
+import backend.operations
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode(latitude, longitude, precision=12):
+    """Geohash of a point, a copy of `backend.geo.encode` as of this migration"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars, bits, value, even = [], 0, 0, True
+
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def backfill_geohash(apps, schema_editor):
+    Property = apps.get_model("backend", "Property")
+    located = Property.objects.filter(latitude__isnull=False, longitude__isnull=False)
+
+    batch = []
+    for prop in located.only("id", "latitude", "longitude").iterator(chunk_size=2000):
+        prop.geohash = encode(prop.latitude, prop.longitude)
+        batch.append(prop)
+        if len(batch) == 2000:
+            Property.objects.bulk_update(batch, ["geohash"])
+            batch = []
+    if batch:
+        Property.objects.bulk_update(batch, ["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0007_property_filter_indexes'),
+    ]
+
+    operations = [
+        backend.operations.PortableAddField(
+            model_name='property',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, verbose_name='geohash'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
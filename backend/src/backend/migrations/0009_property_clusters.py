@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:30
+
+from django.db import migrations, models
+from django.db.models import Count, FloatField, Max, Min, Sum
+from django.db.models.functions import Cast, Substr
+
+import backend.operations
+
+# Geohash precisions clustered as of this migration, see `backend.clusters`
+PRECISIONS = (1, 2, 3, 4, 5, 6)
+
+
+def build_clusters(apps, schema_editor):
+    Property = apps.get_model("backend", "Property")
+    PropertyCluster = apps.get_model("backend", "PropertyCluster")
+
+    for precision in PRECISIONS:
+        rows = (
+            Property.objects.exclude(geohash="")
+            .annotate(cell=Substr("geohash", 1, precision))
+            .order_by()
+            .values("cell", "status", "property_type")
+            .annotate(
+                total=Count("id"),
+                latitude_total=Sum(Cast("latitude", FloatField())),
+                longitude_total=Sum(Cast("longitude", FloatField())),
+                lowest_price=Min("price"),
+                highest_price=Max("price"),
+            )
+        )
+        PropertyCluster.objects.bulk_create(
+            (
+                PropertyCluster(
+                    precision=precision,
+                    cell=row["cell"],
+                    status=row["status"],
+                    property_type=row["property_type"],
+                    count=row["total"],
+                    latitude_sum=row["latitude_total"],
+                    longitude_sum=row["longitude_total"],
+                    price_min=row["lowest_price"],
+                    price_max=row["highest_price"],
+                )
+                for row in rows.iterator(chunk_size=2000)
+            ),
+            batch_size=2000,
+        )
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('backend', '0008_property_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('precision', models.PositiveSmallIntegerField(verbose_name='precision')),
+                ('cell', models.CharField(max_length=12, verbose_name='cell')),
+                ('status', models.CharField(max_length=20, verbose_name='status')),
+                ('property_type', models.CharField(max_length=20, verbose_name='property type')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='count')),
+                ('latitude_sum', models.FloatField(default=0, verbose_name='latitude sum')),
+                ('longitude_sum', models.FloatField(default=0, verbose_name='longitude sum')),
+                ('price_min', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='minimum price')),
+                ('price_max', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='maximum price')),
+            ],
+            options={
+                'verbose_name': 'property cluster',
+                'verbose_name_plural': 'property clusters',
+                'db_table': 'property_clusters',
+            },
+        ),
+        backend.operations.AddIndexConcurrentlyOnPostgres(
+            model_name='property',
+            index=models.Index(fields=['latitude', 'longitude'], name='properties_lat_lng_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='propertycluster',
+            constraint=models.UniqueConstraint(fields=('precision', 'cell', 'status', 'property_type'), name='property_clusters_unique_cell'),
+        ),
+        migrations.RunPython(build_clusters, migrations.RunPython.noop, atomic=True),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:39
+
+from django.db import migrations, models
+
+import backend.operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_property_clusters'),
+    ]
+
+    operations = [
+        backend.operations.PortableAddField(
+            model_name='property',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True, verbose_name='external id'),
+        ),
+    ]
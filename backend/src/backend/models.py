@@ -1,8 +1,18 @@
+from decimal import Decimal
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
+from . import geo
+
 
 class UserRole(models.Model):
     ADMIN = "admin"
@@ -29,7 +39,26 @@ class UserRole(models.Model):
         return self.get_name_display()
 
 
-class User(AbstractUser):
+class RoleChecksMixin:
+    """Role checks for user classes exposing `is_superuser` and `role_names`"""
+
+    @property
+    def is_admin(self):
+        """User is admin if they have admin role or are a superuser"""
+        return self.is_superuser or UserRole.ADMIN in self.role_names
+
+    @property
+    def is_agent(self):
+        """Agents are those with the agent role (superusers can also act as agents)"""
+        return self.is_superuser or UserRole.AGENT in self.role_names
+
+    @property
+    def is_regular_user(self):
+        """Regular users are those without admin or agent roles (superusers are never regular users)"""
+        return not (self.is_superuser or self.is_admin or self.is_agent)
+
+
+class User(RoleChecksMixin, AbstractUser):
     roles = models.ManyToManyField(
         UserRole, related_name="users", verbose_name=_("user roles"), blank=True
     )
@@ -55,20 +84,33 @@ class User(AbstractUser):
             self.add_role(UserRole.ADMIN)
             super().save(update_fields=["is_staff"] if not is_new else None)
 
-    @property
-    def is_admin(self):
-        """User is admin if they have admin role or are a superuser"""
-        return self.is_superuser or self.roles.filter(name=UserRole.ADMIN).exists()
+    @staticmethod
+    def role_cache_key(pk):
+        return f"user_roles:{pk}"
 
-    @property
-    def is_agent(self):
-        """Agents are those with the agent role (superusers can also act as agents)"""
-        return self.is_superuser or self.roles.filter(name=UserRole.AGENT).exists()
+    @cached_property
+    def role_names(self):
+        """Names of the user's roles, resolved once per instance.
 
-    @property
-    def is_regular_user(self):
-        """Regular users are those without admin or agent roles (superusers are never regular users)"""
-        return not (self.is_superuser or self.is_admin or self.is_agent)
+        The set is read from the cache when warm, otherwise it is loaded with a
+        single query and cached until the user's roles change.
+        """
+        if self.pk is None:
+            return frozenset()
+
+        timeout = settings.USER_ROLES_CACHE_TIMEOUT
+        key = self.role_cache_key(self.pk)
+        role_names = cache.get(key) if timeout else None
+        if role_names is None:
+            role_names = frozenset(self.roles.values_list("name", flat=True))
+            if timeout:
+                cache.set(key, role_names, timeout)
+        return role_names
+
+    def invalidate_role_names(self):
+        """Forget the memoized and cached role names of the user"""
+        self.__dict__.pop("role_names", None)
+        cache.delete(self.role_cache_key(self.pk))
 
     def add_role(self, role_name):
         """Add a role to the user"""
@@ -83,7 +125,7 @@ class User(AbstractUser):
         # Prevent removing admin role from superusers
         if self.is_superuser and role_name == UserRole.ADMIN:
             return
-        self.roles.filter(name=role_name).delete()
+        self.roles.remove(*self.roles.filter(name=role_name))
 
     def set_role(self, role_name):
         """Set a single role for the user, removing all other roles"""
@@ -94,6 +136,12 @@ class User(AbstractUser):
         self.add_role(role_name)
 
 
+class PropertyManager(models.Manager):
+    def get_queryset(self):
+        # The search document is only ever filtered and ranked on in SQL
+        return super().get_queryset().defer("search_vector")
+
+
 class Property(models.Model):
     STATUS_CHOICES = [
         ("on_market", _("On Market")),
@@ -131,23 +179,141 @@ class Property(models.Model):
     longitude = models.DecimalField(
         _("longitude"), max_digits=9, decimal_places=6, null=True, blank=True
     )
+    # Derived from latitude/longitude on save, prefilters radius searches
+    geohash = models.CharField(
+        _("geohash"),
+        max_length=geo.PRECISION,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
+
+    # Weighted title/city/address/description document, maintained by a
+    # database trigger on Postgres
+    search_vector = SearchVectorField(_("search vector"), null=True, editable=False)
 
     # Metadata
     created_by = models.ForeignKey(
         User, verbose_name=_("created by"), on_delete=models.PROTECT
     )
+    # Listing id in the brokerage feed the property was imported from
+    external_id = models.CharField(
+        _("external id"), max_length=100, null=True, blank=True, unique=True
+    )
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
     modified_at = models.DateTimeField(_("modified at"), auto_now=True)
 
+    objects = PropertyManager()
+
     class Meta:
         db_table = "properties"
         verbose_name = _("property")
         verbose_name_plural = _("properties")
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination seeks on (sort key, id) in either direction
+            models.Index(fields=["created_at", "id"], name="properties_created_id_idx"),
+            models.Index(fields=["price", "id"], name="properties_price_id_idx"),
+            models.Index(fields=["size", "id"], name="properties_size_id_idx"),
+            # PropertyFilter query shapes, most list traffic is on market listings
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(status="on_market"),
+                name="properties_on_market_idx",
+            ),
+            models.Index(
+                fields=["price", "id"],
+                condition=models.Q(status="on_market"),
+                name="properties_on_market_price_idx",
+            ),
+            models.Index(
+                fields=["property_type", "price"], name="properties_type_price_idx"
+            ),
+            models.Index(
+                fields=["city", "status", "created_at"],
+                name="properties_city_status_idx",
+            ),
+            models.Index(fields=["state", "city"], name="properties_state_city_idx"),
+            models.Index(fields=["zip_code"], name="properties_zip_code_idx"),
+            models.Index(
+                fields=["latitude", "longitude"], name="properties_lat_lng_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="properties_search_idx"),
+            # Django compiles icontains to UPPER(col::text) LIKE UPPER(...) on
+            # Postgres, the trigram indexes cover that expression
+            GinIndex(
+                OpClass(Upper("city"), name="gin_trgm_ops"),
+                name="properties_city_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("state"), name="gin_trgm_ops"),
+                name="properties_state_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("address"), name="gin_trgm_ops"),
+                name="properties_address_trgm_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.get_property_type_display()}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Kept for `_cluster_state`, only resolved when the row is written
+        instance._loaded_values = (field_names, values)
+        return instance
+
+    @cached_property
+    def _cluster_state(self):
+        """What the map clusters counted this row as when loaded, see signals.py"""
+        if "_loaded_values" not in self.__dict__:
+            return None
+        return self.make_cluster_state(dict(zip(*self._loaded_values)))
+
+    def get_cluster_state(self):
+        """Values `PropertyCluster` aggregates this property under.
+
+        None when any of them was deferred and not loaded.
+        """
+        return self.make_cluster_state(self.__dict__)
+
+    @staticmethod
+    def make_cluster_state(values):
+        fields = (
+            "geohash",
+            "latitude",
+            "longitude",
+            "status",
+            "property_type",
+            "price",
+        )
+        if any(field not in values for field in fields):
+            return None
+        if not values["geohash"]:
+            return ("", None, None, values["status"], values["property_type"], None)
+        return (
+            values["geohash"],
+            float(values["latitude"]),
+            float(values["longitude"]),
+            values["status"],
+            values["property_type"],
+            Decimal(str(values["price"])),
+        )
+
+    def save(self, *args, **kwargs):
+        self.geohash = self.compute_geohash()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+        super().save(*args, **kwargs)
+
+    def compute_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            return ""
+        return geo.encode(self.latitude, self.longitude)
+
     def clean(self):
         """Validate model fields"""
         super().clean()
@@ -155,3 +321,37 @@ class Property(models.Model):
             raise ValidationError({"price": _("Price must be positive")})
         if self.size and self.size <= 0:
             raise ValidationError({"size": _("Size must be positive")})
+
+
+class PropertyCluster(models.Model):
+    """Map cluster of the properties sharing a geohash cell.
+
+    Kept per status and property type so filtering on those still reads the
+    precomputed rows. Signals update them incrementally as properties change,
+    `rebuild_property_clusters` recomputes them from scratch.
+    """
+
+    precision = models.PositiveSmallIntegerField(_("precision"))
+    cell = models.CharField(_("cell"), max_length=12)
+    status = models.CharField(_("status"), max_length=20)
+    property_type = models.CharField(_("property type"), max_length=20)
+
+    count = models.PositiveIntegerField(_("count"), default=0)
+    latitude_sum = models.FloatField(_("latitude sum"), default=0)
+    longitude_sum = models.FloatField(_("longitude sum"), default=0)
+    price_min = models.DecimalField(_("minimum price"), max_digits=12, decimal_places=2)
+    price_max = models.DecimalField(_("maximum price"), max_digits=12, decimal_places=2)
+
+    class Meta:
+        db_table = "property_clusters"
+        verbose_name = _("property cluster")
+        verbose_name_plural = _("property clusters")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["precision", "cell", "status", "property_type"],
+                name="property_clusters_unique_cell",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.cell} ({self.count})"
@@ -0,0 +1,93 @@
+from django.contrib.postgres.indexes import PostgresIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db.migrations.operations import AddField, AddIndex, RunSQL
+
+
+class PostgresOnlyMixin:
+    """Apply the database side of a migration operation on Postgres only.
+
+    The model state is still updated everywhere, so SQLite test databases stay
+    in sync with the models while skipping Postgres specific DDL.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class PostgresAddIndex(PostgresOnlyMixin, AddIndex):
+    pass
+
+
+class PostgresRunSQL(PostgresOnlyMixin, RunSQL):
+    pass
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """Build the index with CREATE INDEX CONCURRENTLY on Postgres.
+
+    Other databases get a regular index. Migrations using this operation must
+    set `atomic = False`.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+
+def without_postgres_indexes(state, app_label, model_name):
+    """Copy of `state` without the Postgres only indexes of one model"""
+    state = state.clone()
+    model_state = state.models[app_label, model_name]
+    model_state.options["indexes"] = [
+        index
+        for index in model_state.options.get("indexes", [])
+        if not isinstance(index, PostgresIndex)
+    ]
+    state.reload_model(app_label, model_name, delay=True)
+    return state
+
+
+class PortableAddField(AddField):
+    """AddField for models with Postgres only indexes.
+
+    SQLite adds most columns by rebuilding the table, which recreates every
+    index of the model state including GIN indexes it cannot build. Other
+    databases get the state without those indexes.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            from_state = without_postgres_indexes(
+                from_state, app_label, self.model_name_lower
+            )
+            to_state = without_postgres_indexes(
+                to_state, app_label, self.model_name_lower
+            )
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            from_state = without_postgres_indexes(
+                from_state, app_label, self.model_name_lower
+            )
+            to_state = without_postgres_indexes(
+                to_state, app_label, self.model_name_lower
+            )
+        super().database_backwards(app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,76 @@
+"""Read replica routing.
+
+Writes always go to the primary, `default`. Reads go to the replica chosen
+with `read_from_replica()`, which API views enter for safe requests, and to
+the primary otherwise. A user who just wrote is pinned to the primary for
+`DATABASE_REPLICA_STICKY_SECONDS`, so they read their own writes despite
+replication lag. Pins are kept in the cache, which settings require to be
+the Redis every process shares when there are replicas.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+# Replica the reads of the current request go to, None for the primary
+replica_alias = ContextVar("replica_alias", default=None)
+
+PIN_PREFIX = "db_primary_pin"
+
+
+@contextmanager
+def read_from_replica():
+    """Route reads to one replica, the same for the whole block"""
+    if not settings.DATABASE_REPLICAS:
+        yield None
+        return
+
+    alias = random.choice(settings.DATABASE_REPLICAS)
+    token = replica_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        replica_alias.reset(token)
+
+
+def get_pin_key(user_id):
+    return f"{PIN_PREFIX}:{user_id}"
+
+
+def pin_to_primary(user_id):
+    """Send the reads of `user_id` to the primary for the sticky window"""
+    timeout = settings.DATABASE_REPLICA_STICKY_SECONDS
+    if settings.DATABASE_REPLICAS and timeout:
+        cache.set(get_pin_key(user_id), True, timeout)
+
+
+def is_pinned_to_primary(user_id):
+    return bool(settings.DATABASE_REPLICAS) and cache.get(get_pin_key(user_id), False)
+
+
+async def ais_pinned_to_primary(user_id):
+    if not settings.DATABASE_REPLICAS:
+        return False
+    return await cache.aget(get_pin_key(user_id), False)
+
+
+class ReplicaRouter:
+    """Reads from the replica of the current request, writes to the primary"""
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # Related objects come from where the instance was read
+            return instance._state.db
+        return replica_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
@@ -0,0 +1,133 @@
+"""Deterministic generation of fake properties.
+
+Kept free of models and database access so worker processes only generate
+rows. Every chunk draws from its own random generator seeded by the seed and
+the chunk number, so the data only depends on the seed, never on the number
+of workers.
+"""
+
+import datetime
+import math
+import random
+from decimal import Decimal
+
+from faker import Faker
+
+from . import geo
+
+FIELDS = (
+    "title",
+    "description",
+    "property_type",
+    "status",
+    "price",
+    "size",
+    "address",
+    "city",
+    "state",
+    "zip_code",
+    "latitude",
+    "longitude",
+    "geohash",
+    "created_at",
+)
+
+ADJECTIVES = (
+    "Bright",
+    "Charming",
+    "Cozy",
+    "Elegant",
+    "Modern",
+    "Quiet",
+    "Renovated",
+    "Spacious",
+    "Sunny",
+    "Updated",
+)
+RESIDENTIAL = ("Bungalow", "Condo", "Cottage", "Duplex", "Loft", "Townhouse")
+COMMERCIAL = ("Office", "Retail Space", "Storefront", "Studio", "Warehouse")
+
+# Listings are spread over a year ending here, not over a window ending now
+CREATED_UNTIL = datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC)
+CREATED_DAYS = 365
+
+# Set up once per worker process by `init_catalog`
+catalog = None
+
+
+def init_catalog(seed, cities, city_skew, price_median, price_skew, on_market_ratio):
+    """Cities with their popularity, streets and descriptions shared by all chunks"""
+    global catalog
+    fake = Faker("en_US")
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+
+    city_list = []
+    for _ in range(cities):
+        city_list.append(
+            {
+                "name": fake.unique.city(),
+                "state": fake.state_abbr(include_territories=False),
+                "zip_prefix": fake.numerify("###"),
+                "latitude": rng.uniform(26.0, 48.0),
+                "longitude": rng.uniform(-122.0, -72.0),
+                "streets": [fake.street_name() for _ in range(40)],
+            }
+        )
+    catalog = {
+        "cities": city_list,
+        # Zipf-like popularity, a few large cities and a long tail
+        "city_weights": [1 / (rank**city_skew) for rank in range(1, cities + 1)],
+        "descriptions": [fake.paragraph(nb_sentences=3) for _ in range(500)],
+        "price_mu": math.log(price_median),
+        "price_sigma": price_skew,
+        "on_market_ratio": on_market_ratio,
+    }
+
+
+def generate_chunk(chunk, size, seed):
+    """`size` rows of property values in FIELDS order"""
+    rng = random.Random(f"{seed}:{chunk}")
+    cities = catalog["cities"]
+    picks = rng.choices(cities, weights=catalog["city_weights"], k=size)
+    cents = Decimal("0.01")
+    micro = Decimal("0.000001")
+
+    rows = []
+    for city in picks:
+        commercial = rng.random() < 0.2
+        kind = rng.choice(COMMERCIAL if commercial else RESIDENTIAL)
+        price = rng.lognormvariate(catalog["price_mu"], catalog["price_sigma"])
+        price = min(max(price, 50_000), 50_000_000)
+        size_sqft = rng.lognormvariate(math.log(4_000 if commercial else 1_600), 0.4)
+        latitude = Decimal(city["latitude"] + rng.gauss(0, 0.05)).quantize(micro)
+        longitude = Decimal(city["longitude"] + rng.gauss(0, 0.05)).quantize(micro)
+        created_at = CREATED_UNTIL - datetime.timedelta(
+            seconds=rng.randrange(CREATED_DAYS * 24 * 3600)
+        )
+        rows.append(
+            (
+                f"{rng.choice(ADJECTIVES)} {kind} in {city['name']}",
+                rng.choice(catalog["descriptions"]),
+                "commercial" if commercial else "residential",
+                "on_market"
+                if rng.random() < catalog["on_market_ratio"]
+                else "off_market",
+                Decimal(price).quantize(cents),
+                Decimal(size_sqft).quantize(cents),
+                f"{rng.randrange(1, 9999)} {rng.choice(city['streets'])}",
+                city["name"],
+                city["state"],
+                f"{city['zip_prefix']}{rng.randrange(100):02d}",
+                latitude,
+                longitude,
+                geo.encode(latitude, longitude),
+                created_at,
+            )
+        )
+    return rows
+
+
+def generate(chunk_args):
+    """`generate_chunk` taking one tuple, for `Pool.imap`"""
+    return generate_chunk(*chunk_args)
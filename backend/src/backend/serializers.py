@@ -18,7 +18,7 @@ class UserCurrentSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
     def get_roles(self, obj):
-        return [role.name for role in obj.roles.all()]
+        return sorted(obj.role_names)
 
 
 class UserCurrentErrorSerializer(serializers.Serializer):
@@ -147,5 +147,5 @@ class PropertySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Property
-        fields = "__all__"
+        exclude = ("search_vector",)
         read_only_fields = ("created_by", "created_at", "modified_at")
@@ -1,6 +1,8 @@
+from importlib.util import find_spec
 from os import environ
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from django.core.management.utils import get_random_secret_key
 from django.utils.translation import gettext_lazy as _
 
@@ -32,6 +34,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     
     # Third-party apps
     "rest_framework",
@@ -48,6 +51,7 @@ INSTALLED_APPS = [
 # Middleware
 ######################################################################
 MIDDLEWARE = [
+    "backend.api.metrics.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -56,8 +60,19 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "backend.api.budgets.QueryBudgetMiddleware",
 ]
 
+# Log requests exceeding their view's query budget, with the offending SQL
+QUERY_BUDGET_WARNINGS = DEBUG
+
+# Send request phase timings to clients in a `Server-Timing` header
+SERVER_TIMING_HEADER = True
+
+# Bearer token Prometheus scrapes /api/metrics/ with, the endpoint is
+# disabled without one
+METRICS_TOKEN = environ.get("METRICS_TOKEN")
+
 ######################################################################
 # Templates
 ######################################################################
@@ -94,11 +109,73 @@ DATABASES = {
     }
 }
 
+# Read replicas as comma separated `host` or `host/name` entries, with the
+# primary's credentials. Two databases on one server can stand in for primary
+# and replica locally, e.g. `DB_REPLICAS=localhost/realwise_replica`.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(
+    filter(None, environ.get("DB_REPLICAS", "").split(",")), 1
+):
+    host, separator, name = replica.strip().partition("/")
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "NAME": name or DATABASES["default"]["NAME"],
+        # Tests read the primary's test database through the replica alias
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+# Safe API requests read from a replica, writes go to the primary
+DATABASE_ROUTERS = ["backend.routers.ReplicaRouter"]
+
+# Seconds a user reads from the primary after writing through the API, so
+# replication lag never hides their own changes. The pins are kept in the
+# cache, replicas need REDIS_URL so every process sees them.
+DATABASE_REPLICA_STICKY_SECONDS = 5
+
+# Connections are pooled per process when psycopg_pool is installed, their
+# statistics are exported by /api/metrics/. Without it they are persistent.
+for database in DATABASES.values():
+    if find_spec("psycopg_pool"):
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(environ.get("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(environ.get("DB_POOL_MAX_SIZE", 10)),
+            "timeout": int(environ.get("DB_POOL_TIMEOUT", 10)),
+        }
+    else:
+        database["CONN_MAX_AGE"] = 60
+        database["CONN_HEALTH_CHECKS"] = True
+
+######################################################################
+# Cache
+######################################################################
+# Redis shared by every process. Role names and cached API data are
+# invalidated through it, so without one each process would keep serving its
+# own stale copies and they are not cached across requests.
+REDIS_URL = environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+elif DATABASE_REPLICAS:
+    raise ImproperlyConfigured(
+        "DB_REPLICAS needs REDIS_URL, the primary pins of users who just wrote "
+        "must be shared by every process."
+    )
+
 ######################################################################
 # Authentication
 ######################################################################
 AUTH_USER_MODEL = "backend.User"
 
+# Seconds a user's resolved role names stay in the cache, 0 disables the cache
+USER_ROLES_CACHE_TIMEOUT = 60 * 5 if REDIS_URL else 0
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -149,7 +226,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "backend.api.authentication.StatelessJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_FILTER_BACKENDS": [
@@ -157,8 +234,71 @@ REST_FRAMEWORK = {
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "backend.api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "backend.api.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+# MessagePack is negotiated through Accept and Content-Type when the optional
+# msgpack package is installed
+if find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append(
+        "backend.api.renderers.MessagePackRenderer"
+    )
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"].append(
+        "backend.api.parsers.MessagePackParser"
+    )
+
+# Estimated result sizes from which page-number responses report the
+# planner's row estimate instead of running COUNT(*)
+PROPERTY_EXACT_COUNT_THRESHOLD = 10_000
+
+# Most individual pins a map viewport returns at high zoom
+PROPERTY_MAP_MAX_PINS = 2_000
+
+# Property facets: histogram buckets, cities listed and cache lifetime. Like
+# every property cache below, 0 disables it and it is off without REDIS_URL:
+# a property write invalidates them through the shared cache.
+PROPERTY_FACET_BUCKETS = 10
+PROPERTY_FACET_TOP_CITIES = 10
+PROPERTY_FACETS_CACHE_TIMEOUT = 60 * 10 if REDIS_URL else 0
+
+# Cached property list and detail responses. Stale responses are served that
+# long while one request rebuilds them, 0 disables stale-while-revalidate.
+PROPERTY_RESPONSE_CACHE_TIMEOUT = 60 * 5 if REDIS_URL else 0
+PROPERTY_RESPONSE_CACHE_STALE_TIMEOUT = 30
+
+# Cached ETag and Last-Modified stamps of property details. List ETags come
+# from the properties version in the shared cache, lists have none at 0.
+PROPERTY_VALIDATOR_CACHE_TIMEOUT = 60 * 5 if REDIS_URL else 0
+
+# Most properties one bulk create, update or delete request may carry
+PROPERTY_BULK_MAX_ITEMS = 1_000
+
+# Rows fetched per server-side cursor round trip and written per chunk by
+# property exports
+PROPERTY_EXPORT_CHUNK_SIZE = 2_000
+
+######################################################################
+# Simple JWT
+######################################################################
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "backend.api.users.serializers.RoleTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "backend.api.users.serializers.RoleTokenRefreshSerializer",
+}
+
+# View actions that load the user row instead of trusting the token claims
+JWT_DB_USER_ACTIONS = ["me", "change_password", "delete_account"]
+
+# Validated access tokens kept in memory per process, 0 disables the cache
+JWT_VALIDATED_TOKEN_CACHE_SIZE = 10_000
+
 ######################################################################
 # Admin
 ######################################################################
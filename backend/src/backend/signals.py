@@ -0,0 +1,90 @@
+from django.core.cache import cache
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from . import clusters
+from .api.properties import cache as property_cache
+from .models import Property, User, UserRole
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def invalidate_user_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached role names whenever the users <-> roles relation changes"""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            instance.invalidate_role_names()
+        return
+
+    # Reverse side: `instance` is a UserRole and `pk_set` holds user ids, except
+    # for clear() where the affected users have to be collected up front
+    if action == "pre_clear":
+        instance._cleared_user_ids = list(instance.users.values_list("pk", flat=True))
+        return
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_user_ids", [])
+    elif action not in ("post_add", "post_remove"):
+        return
+
+    cache.delete_many([User.role_cache_key(pk) for pk in pk_set])
+
+
+@receiver(pre_delete, sender=UserRole)
+def invalidate_role_holders(sender, instance, **kwargs):
+    """Deleting a role cascades to the through table without m2m_changed"""
+    user_ids = instance.users.values_list("pk", flat=True)
+    cache.delete_many([User.role_cache_key(pk) for pk in user_ids])
+
+
+@receiver(post_save, sender=User)
+def reset_new_user_roles(sender, instance, created, **kwargs):
+    """Primary keys can be reused, never trust a cached entry for a new user"""
+    if created:
+        instance.invalidate_role_names()
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user_roles(sender, instance, **kwargs):
+    cache.delete(User.role_cache_key(instance.pk))
+
+
+@receiver([pre_save, pre_delete], sender=Property)
+def load_cluster_state(sender, instance, **kwargs):
+    """Fetch the stored cluster values when the instance did not load them"""
+    if kwargs.get("raw") or instance._state.adding or instance._cluster_state:
+        return
+    stored = Property.objects.filter(pk=instance.pk).first()
+    instance._cluster_state = stored.get_cluster_state() if stored else None
+
+
+@receiver(post_save, sender=Property)
+def update_property_clusters(sender, instance, raw, **kwargs):
+    """Move the property between map clusters when its cluster values change"""
+    if raw:
+        return
+    old_state = instance.__dict__.get("_cluster_state")
+    new_state = instance.get_cluster_state()
+    if new_state is None:
+        # Saved with deferred fields, read back what was stored
+        new_state = Property.objects.get(pk=instance.pk).get_cluster_state()
+    if old_state == new_state:
+        return
+
+    clusters.apply(added=[new_state], removed=[old_state] if old_state else [])
+    instance._cluster_state = new_state
+
+
+@receiver(post_delete, sender=Property)
+def remove_from_property_clusters(sender, instance, **kwargs):
+    if instance.__dict__.get("_cluster_state") is not None:
+        clusters.apply(removed=[instance._cluster_state])
+
+
+@receiver([post_save, post_delete], sender=Property)
+def invalidate_property_caches(sender, **kwargs):
+    property_cache.bump_version()
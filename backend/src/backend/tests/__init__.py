@@ -1,3 +1,4 @@
+from backend.api.budgets import QueryRecorder, describe_violation, get_query_budget
 from backend.models import UserRole, Property
 from django.contrib.auth import get_user_model
 
@@ -34,3 +35,24 @@ def create_test_property(agent, **kwargs):
     property.full_clean()  # Validate before saving
     property.save()
     return property
+
+
+def assert_within_query_budget(testcase, request):
+    """Fail `testcase` when `request()` runs more queries than its view budgets.
+
+    `request` makes one API request and returns the response, the budget is
+    looked up from the view that handled it. Returns the response.
+    """
+    with QueryRecorder() as recorder:
+        response = request()
+        if response.streaming:
+            # Streaming responses query while their content is consumed
+            response.streaming_content = [b"".join(response.streaming_content)]
+
+    view = (getattr(response, "renderer_context", None) or {}).get("view")
+    budget = get_query_budget(view)
+    if budget is None:
+        testcase.fail(f"No query budget for {response.wsgi_request.path}")
+    if len(recorder) > budget:
+        testcase.fail(describe_violation(view, budget, recorder.queries))
+    return response
@@ -1,9 +1,20 @@
 from backend.settings import *
 
-DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+DATABASES = {
+    "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+    # Stands in for a read replica, tests enable it with DATABASE_REPLICAS
+    "replica": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+}
+DATABASE_REPLICAS = []
 
 PASSWORD_HASHERS = [
     "django.contrib.auth.hashers.MD5PasswordHasher",
 ]
 
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+# Tests run in one process, whose local memory cache is shared by every request
+USER_ROLES_CACHE_TIMEOUT = 60 * 5
+PROPERTY_FACETS_CACHE_TIMEOUT = 60 * 10
+PROPERTY_RESPONSE_CACHE_TIMEOUT = 60 * 5
+PROPERTY_VALIDATOR_CACHE_TIMEOUT = 60 * 5
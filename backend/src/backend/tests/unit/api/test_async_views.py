@@ -0,0 +1,225 @@
+import json
+
+from asgiref.sync import async_to_sync
+from backend.api.asynchronous import aauthenticate
+from backend.api.properties.views import (
+    AsyncPropertyDetailView,
+    AsyncPropertyFacetsView,
+    AsyncPropertyListView,
+)
+from backend.api.users.views import AsyncUserMeView
+from backend.tests import (
+    assert_within_query_budget,
+    create_test_agent,
+    create_test_property,
+)
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import exceptions
+from rest_framework.test import APIClient, APIRequestFactory
+
+
+@override_settings(PROPERTY_RESPONSE_CACHE_TIMEOUT=0)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        create_test_property(self.agent, price="100000.00", city="Portland")
+        create_test_property(
+            self.agent, price="250000.00", property_type="commercial", city="Salem"
+        )
+        self.property = create_test_property(
+            self.agent, price="500000.00", latitude="45.5", longitude="-122.6"
+        )
+
+    def obtain_access_token(self):
+        response = self.client.post(
+            "/api/token/",
+            {"username": "agent", "password": "testpass123"},
+            format="json",
+        )
+        return response.data["access"]
+
+    def assertSameResponse(self, sync_path, async_path, params=None):
+        expected = self.client.get(sync_path, params)
+        response = self.client.get(async_path, params)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(
+            json.loads(response.content.replace(b"/api/async/", b"/api/")),
+            json.loads(expected.content),
+        )
+        return response
+
+    def test_views_are_async(self):
+        """Test Django runs the views as coroutines"""
+        for view in (
+            AsyncPropertyListView,
+            AsyncPropertyDetailView,
+            AsyncPropertyFacetsView,
+            AsyncUserMeView,
+        ):
+            with self.subTest(view=view.__name__):
+                self.assertTrue(view.view_is_async)
+
+    def test_list_matches_sync_list(self):
+        """Test lists render like the sync viewset, paginated either way"""
+        for params in (
+            {},
+            {"page": 1, "page_size": 2},
+            {"ordering": "-price", "fields": "card"},
+            {"near": "45.5,-122.6", "radius_km": 5},
+            {"property_type": "commercial"},
+        ):
+            with self.subTest(params=params):
+                self.assertSameResponse(
+                    "/api/properties/", "/api/async/properties/", params
+                )
+
+    def test_cursor_pages(self):
+        """Test keyset cursors walk every property through the async view"""
+        response = self.client.get("/api/async/properties/", {"page_size": 2})
+        titles = [item["id"] for item in response.data["results"]]
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(response.status_code, 200)
+        titles += [item["id"] for item in response.data["results"]]
+        self.assertEqual(len(set(titles)), 3)
+        self.assertIsNone(response.data["next"])
+
+    def test_detail(self):
+        """Test detail responses match the sync viewset and 404 for unknown ids"""
+        self.assertSameResponse(
+            f"/api/properties/{self.property.id}/",
+            f"/api/async/properties/{self.property.id}/",
+            {"omit": "description"},
+        )
+        for pk in (self.property.id + 100, "abc"):
+            with self.subTest(pk=pk):
+                response = self.client.get(f"/api/async/properties/{pk}/")
+                self.assertEqual(response.status_code, 404)
+
+    def test_facets(self):
+        """Test facets match the sync action and are cached"""
+        self.assertSameResponse(
+            "/api/properties/facets/", "/api/async/properties/facets/"
+        )
+        self.assertSameResponse(
+            "/api/properties/facets/",
+            "/api/async/properties/facets/",
+            {"city": "Nowhere"},
+        )
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/async/properties/facets/")
+        self.assertEqual(response.data["count"], 3)
+
+    def test_query_budgets(self):
+        """Test the async views stay within their query budgets"""
+        for path in (
+            "/api/async/properties/",
+            "/api/async/properties/?page=1",
+            f"/api/async/properties/{self.property.id}/",
+            "/api/async/properties/facets/",
+            "/api/async/users/me/",
+        ):
+            with self.subTest(path=path):
+                cache.clear()
+                assert_within_query_budget(
+                    self, lambda path=path: self.client.get(path)
+                )
+
+    def test_me(self):
+        """Test the user is loaded by the view, not the authenticator"""
+        self.client.force_authenticate(user=None)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.obtain_access_token()}"
+        )
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/async/users/me/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], "agent@example.com")
+
+        self.agent.is_active = False
+        self.agent.save()
+        response = self.client.get("/api/async/users/me/")
+        self.assertEqual(response.status_code, 401)
+
+    def test_authentication_required(self):
+        """Test anonymous and invalid token requests are rejected"""
+        self.client.force_authenticate(user=None)
+        response = self.client.get("/api/async/properties/")
+        self.assertEqual(response.status_code, 401)
+
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+        response = self.client.get("/api/async/users/me/")
+        self.assertEqual(response.status_code, 401)
+
+    def test_authentication_matches_drf(self):
+        """Test `aauthenticate` leaves requests as DRF's own authentication does"""
+
+        def authenticate(request, authenticate):
+            try:
+                authenticate(request)
+            except exceptions.APIException as e:
+                error = type(e)
+            else:
+                error = None
+            # The attributes `Request._authenticate` sets, read directly so
+            # that a missing one is not filled in lazily by `request.user`
+            return (
+                error,
+                type(request._authenticator),
+                type(request._auth),
+                request._user.pk,
+                request._user.is_authenticated,
+                request._request.user.pk,
+                request._request.user.is_authenticated,
+            )
+
+        view = AsyncPropertyListView()
+        factory = APIRequestFactory()
+        for authorization in (
+            f"Bearer {self.obtain_access_token()}",
+            "Bearer invalid",
+            None,
+        ):
+            with self.subTest(authorization=authorization):
+                headers = {"HTTP_AUTHORIZATION": authorization} if authorization else {}
+                expected = authenticate(
+                    view.initialize_request(factory.get("/", **headers)),
+                    lambda request: request.user,
+                )
+                self.assertEqual(
+                    authenticate(
+                        view.initialize_request(factory.get("/", **headers)),
+                        async_to_sync(aauthenticate),
+                    ),
+                    expected,
+                )
+
+    def test_writes_not_allowed(self):
+        """Test async views only serve reads"""
+        response = self.client.post("/api/async/properties/", {}, format="json")
+        self.assertEqual(response.status_code, 405)
+
+    async def test_asgi(self):
+        """Test the views and middleware run on the ASGI handler"""
+        token = await self.async_client.post(
+            "/api/token/",
+            {"username": "agent", "password": "testpass123"},
+            content_type="application/json",
+        )
+        headers = {"authorization": f"Bearer {token.json()['access']}"}
+
+        response = await self.async_client.get(
+            "/api/async/properties/", headers=headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 3)
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+        response = await self.async_client.get("/api/async/users/me/", headers=headers)
+        self.assertEqual(response.json()["id"], self.agent.id)
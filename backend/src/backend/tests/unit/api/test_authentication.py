@@ -0,0 +1,113 @@
+from unittest import mock
+
+from backend.api.authentication import RoleTokenUser, ValidatedTokenCache
+from backend.models import UserRole
+from backend.tests import create_test_agent, create_test_property, create_test_user
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        create_test_property(self.agent)
+
+    def obtain_tokens(self, username="agent", password="testpass123"):
+        response = self.client.post(
+            "/api/token/", {"username": username, "password": password}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_token_carries_role_claims(self):
+        """Test obtained tokens embed roles and the active flag"""
+        tokens = self.obtain_tokens()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+        response = self.client.get("/api/properties/")
+        user = response.wsgi_request.user
+
+        self.assertIsInstance(user, RoleTokenUser)
+        self.assertEqual(user.id, self.agent.id)
+        self.assertTrue(user.is_agent)
+        self.assertFalse(user.is_admin)
+
+    def test_read_requests_skip_user_queries(self):
+        """Test property browsing runs no authentication queries"""
+        tokens = self.obtain_tokens()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+        # Only the page select, with a cold cache
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/properties/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_sensitive_actions_load_user(self):
+        """Test configured actions authenticate against the user row"""
+        tokens = self.obtain_tokens()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+        response = self.client.get("/api/users/me/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user, self.agent)
+        self.assertNotIsInstance(response.wsgi_request.user, RoleTokenUser)
+
+        with override_settings(JWT_DB_USER_ACTIONS=[]):
+            response = self.client.get("/api/users/me/")
+        self.assertIsInstance(response.wsgi_request.user, RoleTokenUser)
+
+    def test_refresh_picks_up_role_changes(self):
+        """Test refreshed access tokens reflect the current roles"""
+        buyer = create_test_user(username="buyer", email="buyer@example.com")
+        tokens = self.obtain_tokens(username="buyer")
+        buyer.add_role(UserRole.AGENT)
+
+        response = self.client.post(
+            "/api/token/refresh/", {"refresh": tokens["refresh"]}
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response = self.client.get("/api/properties/")
+
+        self.assertTrue(response.wsgi_request.user.is_agent)
+
+    def test_inactive_claim_is_rejected(self):
+        """Test tokens of deactivated users are refused"""
+        tokens = self.obtain_tokens()
+        self.agent.is_active = False
+        self.agent.save()
+
+        response = self.client.post(
+            "/api/token/refresh/", {"refresh": tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class ValidatedTokenCacheTests(SimpleTestCase):
+    def test_hits_and_misses_are_counted(self):
+        """Test cached tokens are returned until evicted"""
+        cache = ValidatedTokenCache(maxsize=1)
+        cache.set(b"first", {"exp": 2**40})
+
+        self.assertEqual(cache.get(b"first"), {"exp": 2**40})
+        self.assertIsNone(cache.get(b"second"))
+
+        cache.set(b"second", {"exp": 2**40})
+        self.assertIsNone(cache.get(b"first"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+        self.assertEqual(cache.stats()["size"], 1)
+
+    def test_entries_expire_with_the_token(self):
+        """Test tokens are dropped once their exp claim has passed"""
+        cache = ValidatedTokenCache(maxsize=8)
+        cache.set(b"token", {"exp": 1000})
+
+        with mock.patch("backend.api.authentication.time.time", return_value=999):
+            self.assertIsNotNone(cache.get(b"token"))
+        with mock.patch("backend.api.authentication.time.time", return_value=1000):
+            self.assertIsNone(cache.get(b"token"))
+        self.assertEqual(cache.stats()["size"], 0)
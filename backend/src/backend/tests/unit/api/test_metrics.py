@@ -0,0 +1,177 @@
+import re
+import threading
+from unittest import mock
+
+from backend.api.metrics import Metrics, RequestTimings, metrics
+from backend.tests import create_test_agent, create_test_property
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        create_test_property(self.agent)
+        self.client.force_authenticate(user=self.agent)
+        cache.clear()
+        metrics.reset()
+
+    def get_phases(self, response):
+        return dict(re.findall(r"(\w+);dur=([\d.]+)", response["Server-Timing"]))
+
+    def test_header_splits_request_phases(self):
+        """Test API responses carry the time spent per phase"""
+        response = self.client.get("/api/properties/")
+
+        self.assertEqual(response.status_code, 200)
+        phases = self.get_phases(response)
+        for phase in ("auth", "perm", "db", "serialize", "render", "total"):
+            self.assertIn(phase, phases)
+        self.assertIn('queries;desc="1 queries"', response["Server-Timing"])
+        self.assertLessEqual(
+            sum(float(phases[phase]) for phase in phases if phase != "total"),
+            float(phases["total"]),
+        )
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        """Test the header is optional while metrics are still collected"""
+        response = self.client.get("/api/properties/")
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertIn(
+            'http_responses_total{view="property-list",method="GET",status="200"} 1',
+            metrics.render(),
+        )
+
+    def test_metrics_per_view(self):
+        """Test requests are aggregated per route, not per URL"""
+        for prop in [create_test_property(self.agent) for _ in range(2)]:
+            self.client.get(f"/api/properties/{prop.pk}/")
+        self.client.get("/api/properties/0/")
+
+        output = metrics.render()
+        self.assertIn(
+            'http_responses_total{view="property-detail",method="GET",status="200"} 2',
+            output,
+        )
+        self.assertIn(
+            'http_responses_total{view="property-detail",method="GET",status="404"} 1',
+            output,
+        )
+        self.assertIn(
+            "http_request_duration_seconds_bucket"
+            '{view="property-detail",method="GET",le="+Inf"} 3',
+            output,
+        )
+        self.assertIn(
+            'http_request_duration_seconds_count{view="property-detail",method="GET"} 3',
+            output,
+        )
+        self.assertRegex(
+            output,
+            r'http_request_phase_seconds_total\{view="property-detail",method="GET",'
+            r'phase="auth"\} [\d.e-]+',
+        )
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_metrics_endpoint(self):
+        """Test the scrape endpoint needs the metrics token"""
+        self.client.get("/api/properties/")
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 401)
+        response = self.client.get(
+            "/api/metrics/", HTTP_AUTHORIZATION="Bearer scrape-secret"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            response["Content-Type"].startswith("text/plain; version=0.0.4")
+        )
+        content = response.content.decode()
+        self.assertIn("# TYPE http_request_duration_seconds histogram", content)
+        self.assertIn('property_response_cache_total{result="miss"}', content)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_endpoint_disabled_without_token(self):
+        """Test the scrape endpoint does not exist without a token configured"""
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 404)
+
+
+class MetricsTests(SimpleTestCase):
+    def test_concurrent_observations(self):
+        """Test no observation is lost when threads record at once"""
+        registry = Metrics()
+        timings = RequestTimings()
+        timings.queries = 2
+
+        def observe():
+            for _ in range(1_000):
+                registry.observe("property-list", "GET", 200, 0.02, timings)
+
+        threads = [threading.Thread(target=observe) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        output = registry.render()
+        self.assertIn(
+            'http_request_duration_seconds_count{view="property-list",method="GET"} 8000',
+            output,
+        )
+        self.assertIn(
+            'http_request_db_queries_total{view="property-list",method="GET"} 16000',
+            output,
+        )
+        self.assertIn(
+            "http_request_duration_seconds_bucket"
+            '{view="property-list",method="GET",le="0.01"} 0',
+            output,
+        )
+        self.assertIn(
+            "http_request_duration_seconds_bucket"
+            '{view="property-list",method="GET",le="0.025"} 8000',
+            output,
+        )
+
+    def test_phase_queries_not_counted_as_db(self):
+        """Test queries inside a timed phase are not timed again as `db`"""
+        timings = RequestTimings()
+        execute = mock.Mock()
+
+        # Authentication from 0 to 3 with a query from 1 to 2, then a
+        # query from 10 to 12
+        clock = [0.0, 1.0, 2.0, 3.0, 10.0, 12.0]
+        with mock.patch("time.perf_counter", side_effect=clock):
+            with timings.measure("auth"):
+                timings.record_query(execute, "SELECT 1", (), False, {})
+            timings.record_query(execute, "SELECT 1", (), False, {})
+
+        self.assertEqual(timings.queries, 2)
+        self.assertEqual(timings.phases["auth"], 3.0)
+        self.assertEqual(timings.phases["db"], 2.0)
+
+    def test_label_values_are_escaped(self):
+        """Test label values cannot break the exposition format"""
+        registry = Metrics()
+        registry.observe('odd"view\n', "GET", 200, 0.1, RequestTimings())
+
+        self.assertIn('view="odd\\"view\\n"', registry.render())
+
+    def test_pool_statistics(self):
+        """Test connection pool statistics are exported per database"""
+        pools = {
+            "default": {"pool_size": 4, "requests_waiting": 1},
+            "replica": {"pool_size": 2},
+        }
+        with mock.patch("backend.api.metrics.get_pool_stats", return_value=pools):
+            output = Metrics().render()
+
+        self.assertIn("# TYPE db_pool_pool_size gauge", output)
+        self.assertIn('db_pool_pool_size{database="default"} 4', output)
+        self.assertIn('db_pool_pool_size{database="replica"} 2', output)
+        self.assertIn('db_pool_requests_waiting{database="default"} 1', output)
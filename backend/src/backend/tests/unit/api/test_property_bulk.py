@@ -0,0 +1,179 @@
+from backend.models import Property, PropertyCluster, UserRole
+from backend.tests import create_test_agent, create_test_property, create_test_user
+from django.db import connection
+from django.test import TestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def listing(**overrides):
+    return {
+        "title": "Synced listing",
+        "description": "From the CRM",
+        "property_type": "residential",
+        "price": "250000.00",
+        "size": "120.00",
+        "address": "1 Sync St",
+        "city": "Portland",
+        "state": "OR",
+        "zip_code": "97201",
+        "latitude": "45.519000",
+        "longitude": "-122.679000",
+        **overrides,
+    }
+
+
+class PropertyBulkTests(TestCase):
+    url = "/api/properties/bulk/"
+    location = {"latitude": "45.519000", "longitude": "-122.679000"}
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        self.other_agent = create_test_user(username="other", email="other@example.com")
+        self.other_agent.roles.add(UserRole.objects.get(name=UserRole.AGENT))
+
+    def test_bulk_create(self):
+        """Test the query count does not grow with the batch size"""
+        with CaptureQueriesContext(connection) as small_batch:
+            self.client.post(self.url, [listing()], format="json")
+        items = [listing(title=f"Listing {i}") for i in range(49)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, items, format="json")
+        self.assertLessEqual(len(queries), len(small_batch))
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(len(response.data["results"]), 49)
+        self.assertEqual(response.data["errors"], [])
+        created = Property.objects.filter(created_by=self.agent)
+        self.assertEqual(created.count(), 50)
+        self.assertTrue(all(prop.geohash for prop in created))
+        self.assertEqual(
+            PropertyCluster.objects.get(precision=1, status="on_market").count, 50
+        )
+
+    def test_bulk_create_reports_item_errors(self):
+        """Test invalid items are skipped and reported by position"""
+        items = [listing(), listing(price="not a price"), listing(title="Second")]
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1])
+        self.assertIn("price", response.data["errors"][0]["errors"])
+
+    def test_atomic_batch_fails_as_a_whole(self):
+        """Test `atomic=true` writes nothing when any item is invalid"""
+        items = [listing(), listing(price="not a price")]
+        response = self.client.post(f"{self.url}?atomic=true", items, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Property.objects.exists())
+
+    @override_settings(PROPERTY_BULK_MAX_ITEMS=2)
+    def test_batch_size_limit(self):
+        """Test oversized batches are rejected"""
+        response = self.client.post(self.url, [listing()] * 3, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_update_checks_ownership(self):
+        """Test updates apply to the agent's own properties only"""
+        own = create_test_property(self.agent)
+        foreign = create_test_property(self.other_agent)
+        items = [
+            {
+                "id": own.id,
+                "price": "123456.00",
+                "latitude": "47.6",
+                "longitude": "-122.3",
+            },
+            {"id": foreign.id, "price": "1.00"},
+            {"price": "1.00"},
+        ]
+        response = self.client.patch(self.url, items, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2])
+        own.refresh_from_db()
+        foreign.refresh_from_db()
+        self.assertEqual(str(own.price), "123456.00")
+        self.assertTrue(own.geohash.startswith("c23"))
+        self.assertGreater(own.modified_at, own.created_at)
+        self.assertNotEqual(str(foreign.price), "1.00")
+        self.assertEqual(
+            PropertyCluster.objects.get(precision=6, cell=own.geohash[:6]).count, 1
+        )
+
+    def test_bulk_delete(self):
+        """Test deleting owned ids and reporting the rest"""
+        own = create_test_property(self.agent)
+        foreign = create_test_property(self.other_agent)
+        response = self.client.delete(self.url, [own.id, foreign.id, 0], format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["deleted"], [own.id])
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2])
+        self.assertFalse(Property.objects.filter(pk=own.id).exists())
+        self.assertTrue(Property.objects.filter(pk=foreign.id).exists())
+
+    def test_bulk_delete_single_statement(self):
+        """Test rows go in one DELETE and their clusters are updated once"""
+        cheap, mid, dear = (
+            create_test_property(self.agent, price=price, **self.location)
+            for price in ("100000.00", "200000.00", "300000.00")
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.client.delete(self.url, [cheap.id, dear.id], format="json")
+
+        deletes = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith('DELETE FROM "properties"')
+        ]
+        self.assertEqual(len(deletes), 1)
+        cluster = PropertyCluster.objects.get(precision=6, cell=mid.geohash[:6])
+        self.assertEqual(cluster.count, 1)
+        self.assertEqual((cluster.price_min, cluster.price_max), (mid.price, mid.price))
+
+    def test_bulk_delete_rejects_booleans(self):
+        """Test true and false are not taken for the ids 1 and 0"""
+        own = create_test_property(self.agent)
+        Property.objects.filter(pk=own.pk).update(id=1)
+        response = self.client.delete(self.url, [True, False], format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["deleted"], [])
+        self.assertEqual(len(response.data["errors"]), 2)
+        self.assertTrue(Property.objects.filter(pk=1).exists())
+
+    @skipUnlessDBFeature("has_select_for_update")
+    def test_bulk_delete_locks_owned_rows(self):
+        """Test the ownership read locks the rows the delete then removes"""
+        own = create_test_property(self.agent)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.delete(self.url, [own.id], format="json")
+
+        statements = [query["sql"] for query in queries.captured_queries]
+        locked = next(
+            index for index, sql in enumerate(statements) if "FOR UPDATE" in sql
+        )
+        deleted = next(
+            index
+            for index, sql in enumerate(statements)
+            if sql.startswith('DELETE FROM "properties"')
+        )
+        self.assertLess(locked, deleted)
+
+    def test_queryset_delete_empties_clusters(self):
+        """Test clusters whose rows are all deleted at once are removed"""
+        for price in ("100000.00", "200000.00"):
+            create_test_property(self.agent, price=price, **self.location)
+        Property.objects.all().delete()
+        self.assertFalse(PropertyCluster.objects.exists())
+
+    def test_non_agents_rejected(self):
+        """Test regular users cannot bulk write"""
+        user = create_test_user(username="user", email="user@example.com")
+        self.client.force_authenticate(user=user)
+        response = self.client.post(self.url, [listing()], format="json")
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,151 @@
+from backend import clusters
+from backend.models import Property, PropertyCluster
+from backend.tests import create_test_agent, create_test_property
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+# West, south, east, north around Portland, OR
+PORTLAND_BBOX = "-123.0,45.3,-122.3,45.7"
+
+
+class PropertyClusterTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        self.downtown = create_test_property(
+            self.agent, price="300000.00", latitude="45.519000", longitude="-122.679000"
+        )
+        self.east = create_test_property(
+            self.agent, price="500000.00", latitude="45.520000", longitude="-122.640000"
+        )
+        self.office = create_test_property(
+            self.agent,
+            property_type="commercial",
+            price="900000.00",
+            latitude="45.521000",
+            longitude="-122.675000",
+        )
+        self.seattle = create_test_property(
+            self.agent, latitude="47.606200", longitude="-122.332100"
+        )
+
+    def get_clusters(self, bbox=PORTLAND_BBOX, zoom=9, **params):
+        response = self.client.get(
+            "/api/properties/clusters/", {"bbox": bbox, "zoom": zoom, **params}
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def snapshot(self):
+        return sorted(
+            PropertyCluster.objects.values_list(
+                "precision",
+                "cell",
+                "status",
+                "property_type",
+                "count",
+                "price_min",
+                "price_max",
+            )
+        )
+
+    def test_clusters_in_viewport(self):
+        """Test clusters carry counts, centroids and price ranges"""
+        data = self.get_clusters()
+        self.assertEqual(data["type"], "clusters")
+        self.assertEqual(len(data["results"]), 1)
+
+        cluster = data["results"][0]
+        self.assertEqual(cluster["count"], 3)
+        self.assertAlmostEqual(cluster["latitude"], 45.52, places=3)
+        self.assertAlmostEqual(cluster["longitude"], -122.664667, places=4)
+        self.assertEqual((cluster["price_min"], cluster["price_max"]), (300000, 900000))
+
+    def test_precomputed_filters(self):
+        """Test status and property type are read from the precomputed rows"""
+        with self.assertNumQueries(1):
+            data = self.get_clusters(property_type="commercial")
+        self.assertEqual([c["count"] for c in data["results"]], [1])
+
+    def test_other_filters_aggregate_on_the_fly(self):
+        """Test any other PropertyFilter parameter is respected"""
+        data = self.get_clusters(price_max="600000")
+        self.assertEqual(len(data["results"]), 1)
+        self.assertEqual(data["results"][0]["count"], 2)
+        self.assertEqual(data["results"][0]["price_max"], 500000)
+
+    def test_pins_at_high_zoom(self):
+        """Test high zoom returns lightweight pins"""
+        data = self.get_clusters(zoom=clusters.PIN_ZOOM)
+        self.assertEqual(data["type"], "pins")
+        self.assertFalse(data["truncated"])
+        self.assertEqual(
+            {pin["id"] for pin in data["results"]},
+            {self.downtown.id, self.east.id, self.office.id},
+        )
+        self.assertEqual(
+            set(data["results"][0]), {"id", "latitude", "longitude", "price"}
+        )
+
+    @override_settings(PROPERTY_MAP_MAX_PINS=2)
+    def test_pins_are_capped(self):
+        """Test dense viewports are truncated"""
+        data = self.get_clusters(zoom=clusters.PIN_ZOOM)
+        self.assertTrue(data["truncated"])
+        self.assertEqual(len(data["results"]), 2)
+
+    def test_incremental_updates_match_rebuild(self):
+        """Test saves and deletes keep the clusters equal to a full rebuild"""
+        self.downtown.price = "100000.00"
+        self.downtown.save()
+        self.east.latitude, self.east.longitude = "47.600000", "-122.300000"
+        self.east.save()
+        Property.objects.get(pk=self.office.pk).delete()
+        moved = Property.objects.get(pk=self.seattle.pk)
+        moved.status = "off_market"
+        moved.save()
+
+        incremental = self.snapshot()
+        clusters.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_removing_price_edge_updates_range(self):
+        """Test deleting the most expensive property shrinks the price range"""
+        self.office.property_type = "residential"
+        self.office.save()
+        self.assertEqual(self.get_clusters()["results"][0]["price_max"], 900000)
+
+        self.office.delete()
+        self.assertEqual(self.get_clusters()["results"][0]["price_max"], 500000)
+
+        # Coarser ranges are read back from the finer clusters
+        incremental = self.snapshot()
+        clusters.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_cluster_state_resolved_on_write(self):
+        """Test loading properties leaves their cluster state until one is saved"""
+        loaded = Property.objects.get(pk=self.downtown.pk)
+        self.assertNotIn("_cluster_state", loaded.__dict__)
+
+        loaded.price = "200000.00"
+        loaded.save()
+        self.assertEqual(loaded._cluster_state, loaded.get_cluster_state())
+
+    def test_viewport_crossing_antimeridian(self):
+        """Test boxes with west > east wrap around"""
+        create_test_property(self.agent, latitude="-17.700000", longitude="178.000000")
+        create_test_property(self.agent, latitude="-17.700000", longitude="-179.000000")
+        data = self.get_clusters(bbox="170,-20,-170,-10", zoom=4, status="on_market")
+        self.assertEqual(sum(c["count"] for c in data["results"]), 2)
+
+    def test_invalid_viewport(self):
+        """Test malformed bounding boxes are rejected"""
+        for params in ({"bbox": "1,2,3"}, {"bbox": "0,50,10,40"}, {"zoom": -1}):
+            response = self.client.get(
+                "/api/properties/clusters/",
+                {"bbox": PORTLAND_BBOX, "zoom": 9, **params},
+            )
+            self.assertEqual(response.status_code, 400, params)
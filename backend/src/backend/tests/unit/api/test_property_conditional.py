@@ -0,0 +1,99 @@
+from backend.tests import create_test_agent, create_test_property
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+
+class PropertyConditionalGetTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        self.property = create_test_property(self.agent)
+        self.detail = f"/api/properties/{self.property.id}/"
+
+    def test_detail_validators(self):
+        """Test detail responses carry a strong ETag and Last-Modified"""
+        response = self.client.get(self.detail)
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertEqual(
+            response["Last-Modified"],
+            http_date(int(self.property.modified_at.timestamp())),
+        )
+
+    def test_detail_if_none_match(self):
+        """Test a matching ETag answers 304 from the cached stamp"""
+        etag = self.client.get(self.detail)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+    @override_settings(PROPERTY_VALIDATOR_CACHE_TIMEOUT=0)
+    def test_stamp_cache_disabled(self):
+        """Test revalidation reads the stamp from the database without the cache"""
+        etag = self.client.get(self.detail)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_if_modified_since(self):
+        """Test Last-Modified revalidates until the property changes"""
+        last_modified = self.client.get(self.detail)["Last-Modified"]
+        response = self.client.get(self.detail, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_changes_after_update(self):
+        """Test saving the property changes the ETag"""
+        etag = self.client.get(self.detail)["ETag"]
+        self.property.title = "Updated"
+        self.property.save()
+        response = self.client.get(self.detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_if_none_match(self):
+        """Test list ETags follow the filtered set"""
+        etag = self.client.get("/api/properties/", {"status": "on_market"})["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                "/api/properties/", {"status": "on_market"}, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+        other = self.client.get("/api/properties/", {"status": "off_market"})
+        self.assertNotEqual(other["ETag"], etag)
+
+        create_test_property(self.agent)
+        response = self.client.get(
+            "/api/properties/", {"status": "on_market"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_etag_ignores_parameter_order(self):
+        """Test the same parameters in another order revalidate the same list"""
+        etag = self.client.get("/api/properties/?status=on_market&city=Portland")[
+            "ETag"
+        ]
+        response = self.client.get(
+            "/api/properties/?city=Portland&status=on_market", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(PROPERTY_VALIDATOR_CACHE_TIMEOUT=0)
+    def test_list_without_shared_cache(self):
+        """Test lists carry no ETag without the shared properties version"""
+        # Only the page itself is read, no stamp is aggregated
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/properties/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+
+    def test_missing_property(self):
+        """Test unknown ids still 404"""
+        response = self.client.get("/api/properties/999999/", HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 404)
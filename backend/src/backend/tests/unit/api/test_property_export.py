@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+from unittest import mock
+
+from backend.api.properties import export
+from backend.models import Property
+from backend.tests import create_test_agent, create_test_property
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+
+class PropertyExportTests(TestCase):
+    url = "/api/properties/export/"
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        self.cheap = create_test_property(self.agent, title="Cheap", price="100000.00")
+        self.pricey = create_test_property(
+            self.agent, title="Pricey", price="900000.00"
+        )
+        create_test_property(self.agent, title="Sold", status="off_market")
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv(self):
+        """Test CSV rows follow the filters and ordering"""
+        response, content = self.export(status="on_market", ordering="-price")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="properties.csv"', response["Content-Disposition"])
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row["title"] for row in rows], ["Pricey", "Cheap"])
+        self.assertEqual(rows[1]["price"], "100000.00")
+
+    def test_ndjson_matches_api_representation(self):
+        """Test NDJSON lines carry the same values as the detail endpoint"""
+        response, content = self.export(export_format="ndjson", search="Cheap")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        lines = [json.loads(line) for line in content.splitlines()]
+        detail = self.client.get(f"/api/properties/{self.cheap.id}/").json()
+        self.assertEqual(lines, [{key: detail[key] for key in lines[0]}])
+
+    def test_ndjson_rejects_non_finite_numbers(self):
+        """Test NaN is refused like the list renderer does, not written as null"""
+        row = [float("nan")] * len(export.FIELDS)
+        with (
+            mock.patch.object(export, "iter_rows", return_value=[row]),
+            self.assertRaisesMessage(
+                ValueError, "Out of range float values are not JSON compliant"
+            ),
+        ):
+            list(export.stream_ndjson(Property.objects.none()))
+
+    @override_settings(PROPERTY_EXPORT_CHUNK_SIZE=1)
+    def test_streams_in_chunks(self):
+        """Test the header and every chunk are sent separately"""
+        response = self.client.get(self.url)
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 4)
+        self.assertTrue(chunks[0].startswith(b"id,title,"))
+
+    def test_unknown_format(self):
+        """Test unsupported formats are rejected"""
+        response = self.client.get(self.url, {"export_format": "xml"})
+        self.assertEqual(response.status_code, 400)
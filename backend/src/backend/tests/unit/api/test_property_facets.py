@@ -0,0 +1,87 @@
+from backend.tests import create_test_agent, create_test_property
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+class PropertyFacetTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        for price, city in (("100000.00", "Portland"), ("200000.00", "Portland")):
+            create_test_property(self.agent, price=price, city=city)
+        create_test_property(
+            self.agent, price="1100000.00", property_type="commercial", city="Salem"
+        )
+        create_test_property(
+            self.agent, price="500000.00", status="off_market", city="Bend"
+        )
+
+    def get_facets(self, **params):
+        response = self.client.get("/api/properties/facets/", params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_choice_counts(self):
+        """Test counts for every property type and status"""
+        data = self.get_facets()
+        self.assertEqual(data["count"], 4)
+        self.assertEqual(
+            {row["value"]: row["count"] for row in data["property_type"]},
+            {"residential": 3, "commercial": 1},
+        )
+        self.assertEqual(
+            {row["value"]: row["count"] for row in data["status"]},
+            {"on_market": 3, "off_market": 1},
+        )
+        self.assertEqual(data["city"][0], {"city": "Portland", "count": 2})
+
+    def test_histograms(self):
+        """Test price buckets span the matching range"""
+        price = self.get_facets()["price"]
+        self.assertEqual((price["min"], price["max"]), (100000, 1100000))
+        self.assertEqual(len(price["buckets"]), 10)
+        self.assertEqual(
+            price["buckets"][0], {"min": 100000, "max": 200000, "count": 1}
+        )
+        self.assertEqual(price["buckets"][-1]["count"], 1)
+        self.assertEqual(sum(bucket["count"] for bucket in price["buckets"]), 4)
+
+    def test_filters_apply(self):
+        """Test facets count only the filtered properties"""
+        data = self.get_facets(status="on_market", price_max="300000")
+        self.assertEqual(data["count"], 2)
+        self.assertEqual(data["city"], [{"city": "Portland", "count": 2}])
+        self.assertEqual(data["price"]["buckets"][-1]["max"], 200000)
+
+    def test_no_matches(self):
+        """Test an empty result still lists the choices"""
+        data = self.get_facets(city="Nowhere")
+        self.assertEqual(data["count"], 0)
+        self.assertIsNone(data["price"])
+        self.assertEqual([row["count"] for row in data["status"]], [0, 0])
+
+    def test_cached_until_properties_change(self):
+        """Test facets are served from cache and refreshed after a write"""
+        self.get_facets(status="on_market", city="Portland")
+        with self.assertNumQueries(0):
+            data = self.get_facets(city="Portland", status="on_market")
+        self.assertEqual(data["count"], 2)
+
+        create_test_property(self.agent, city="Portland")
+        self.assertEqual(
+            self.get_facets(status="on_market", city="Portland")["count"], 3
+        )
+
+    @override_settings(PROPERTY_FACETS_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self):
+        """Test a zero timeout computes the facets on every request"""
+        self.get_facets(city="Portland")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get_facets(city="Portland")["count"], 2)
+        self.assertTrue(queries.captured_queries)
@@ -0,0 +1,123 @@
+from decimal import Decimal
+
+from backend.tests import create_test_agent, create_test_property
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+class PropertyFieldsetTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        cache.clear()
+        self.property = create_test_property(
+            self.agent, latitude=Decimal("45.5"), longitude=Decimal("-122.6")
+        )
+        create_test_property(self.agent, title="Second Property")
+
+    def select_queries(self, captured):
+        return [
+            query["sql"]
+            for query in captured.captured_queries
+            if "backend_property" in query["sql"] and "COUNT(" not in query["sql"]
+        ]
+
+    def test_list_fields(self):
+        """Test `fields` keeps only the requested fields, in declared order"""
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get("/api/properties/", {"fields": "price,title"})
+
+        self.assertEqual(response.status_code, 200)
+        for item in response.data["results"]:
+            self.assertEqual(list(item), ["title", "price"])
+        for sql in self.select_queries(captured):
+            self.assertNotIn('"description"', sql)
+
+    def test_list_omit(self):
+        """Test `omit` drops fields from the full representation"""
+        response = self.client.get(
+            "/api/properties/", {"omit": "description,created_at"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        item = response.data["results"][0]
+        self.assertNotIn("description", item)
+        self.assertNotIn("created_at", item)
+        self.assertIn("title", item)
+
+    def test_presets(self):
+        """Test preset names expand to their fields and mix with plain names"""
+        response = self.client.get("/api/properties/", {"fields": "map,title"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.data["results"][0]),
+            ["id", "title", "price", "latitude", "longitude"],
+        )
+
+    def test_retrieve(self):
+        """Test detail responses and their SQL follow the fieldset"""
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(
+                f"/api/properties/{self.property.id}/", {"fields": "card"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data,
+            {
+                "id": self.property.id,
+                "title": "Test Property",
+                "price": "100000.00",
+                "city": "Test City",
+                "latitude": "45.500000",
+                "longitude": "-122.600000",
+            },
+        )
+        for sql in self.select_queries(captured):
+            self.assertNotIn('"description"', sql)
+
+    def test_unknown_field(self):
+        """Test unknown names are rejected"""
+        for params in ({"fields": "title,secret"}, {"omit": "card"}):
+            with self.subTest(params=params):
+                response = self.client.get("/api/properties/", params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(params)), response.data)
+
+    def test_cursor_pagination(self):
+        """Test keyset cursors still work without the sort keys in the fields"""
+        response = self.client.get(
+            "/api/properties/", {"fields": "title", "page_size": 1}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [{"title": "Second Property"}])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [{"title": "Test Property"}])
+
+    def test_distance(self):
+        """Test the radius annotation is rendered when selected"""
+        response = self.client.get(
+            "/api/properties/", {"near": "45.5,-122.6", "fields": "id,distance"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data["results"][0]), ["id", "distance"])
+
+    def test_writes_ignore_fieldsets(self):
+        """Test writes return the full representation"""
+        response = self.client.patch(
+            f"/api/properties/{self.property.id}/?fields=title",
+            {"price": "150000.00"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("description", response.data)
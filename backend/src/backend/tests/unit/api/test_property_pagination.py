@@ -0,0 +1,120 @@
+from decimal import Decimal
+from unittest import mock
+
+from backend.api.properties.pagination import EstimatedCountPaginator
+from backend.tests import create_test_agent, create_test_property
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+
+class PropertyPaginationTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        # Repeated prices exercise the id tiebreaker
+        self.properties = [
+            create_test_property(self.agent, price=Decimal(100000 + (i % 4) * 1000))
+            for i in range(23)
+        ]
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            ids += [row["id"] for row in response.data["results"]]
+            url = response.data["next"]
+            pages += 1
+        return ids, pages
+
+    def test_default_ordering_walks_all_rows(self):
+        """Test cursors cover every row once in -created_at order"""
+        ids, pages = self.walk("/api/properties/?page_size=5")
+
+        expected = sorted(
+            self.properties, key=lambda p: (p.created_at, p.id), reverse=True
+        )
+        self.assertEqual(ids, [p.id for p in expected])
+        self.assertEqual(pages, 5)
+
+    def test_ordering_with_ties_is_stable(self):
+        """Test price ordering uses id to break ties"""
+        ids, _ = self.walk("/api/properties/?ordering=price&page_size=4")
+
+        expected = sorted(self.properties, key=lambda p: (p.price, p.id))
+        self.assertEqual(ids, [p.id for p in expected])
+
+    def test_previous_link_returns_prior_page(self):
+        """Test walking back from the second page yields the first page"""
+        first = self.client.get("/api/properties/?ordering=-price&page_size=6")
+        second = self.client.get(first.data["next"])
+        previous = self.client.get(second.data["previous"])
+
+        self.assertEqual(
+            [row["id"] for row in previous.data["results"]],
+            [row["id"] for row in first.data["results"]],
+        )
+        self.assertIsNone(first.data["previous"])
+
+    def test_invalid_cursor(self):
+        """Test tampered cursors are rejected"""
+        response = self.client.get("/api/properties/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_mode(self):
+        """Test the page parameter keeps page-number pagination available"""
+        response = self.client.get("/api/properties/?page=3&page_size=10")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 23)
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_page_number_count_is_exact_for_small_results(self):
+        """Test small result sets report an exact count"""
+        response = self.client.get("/api/properties/?page=1")
+        self.assertTrue(response.data["count_is_exact"])
+
+    @override_settings(PROPERTY_EXACT_COUNT_THRESHOLD=1000)
+    def test_page_number_count_uses_estimate_for_large_results(self):
+        """Test large result sets report the planner estimate"""
+        with mock.patch.object(
+            EstimatedCountPaginator, "estimate_count", return_value=5000
+        ):
+            response = self.client.get("/api/properties/?page=2&page_size=10")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 5000)
+        self.assertFalse(response.data["count_is_exact"])
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def walk_estimated_pages(self, url):
+        ids, url = [], f"{url}?page=1&page_size=10"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.data["count_is_exact"])
+            ids += [row["id"] for row in response.data["results"]]
+            url = response.data["next"]
+        return ids
+
+    @override_settings(PROPERTY_EXACT_COUNT_THRESHOLD=10)
+    def test_estimated_pages_follow_the_rows(self):
+        """Test estimates above or below the row count neither cut nor pad pages"""
+        for estimate in (12, 5000):
+            for url in ("/api/properties/", "/api/async/properties/"):
+                with (
+                    self.subTest(estimate=estimate, url=url),
+                    mock.patch.object(
+                        EstimatedCountPaginator,
+                        "estimate_count",
+                        return_value=estimate,
+                    ),
+                ):
+                    ids = self.walk_estimated_pages(url)
+                    self.assertEqual(sorted(ids), sorted(p.id for p in self.properties))
+
+                    response = self.client.get(f"{url}?page=4&page_size=10")
+                    self.assertEqual(response.status_code, 404)
@@ -0,0 +1,115 @@
+import tempfile
+
+from backend.api.properties.cache import (
+    RESPONSE_PREFIX,
+    digest,
+    reset_response_cache_stats,
+    response_cache_stats,
+)
+from backend.models import Property, UserRole
+from backend.tests import create_test_agent, create_test_property, create_test_user
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+
+class PropertyResponseCacheTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        self.property = create_test_property(self.agent, title="Cached house")
+
+    def get(self, path="/api/properties/", **params):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_served_from_cache(self):
+        """Test repeated list requests skip the database"""
+        self.assertEqual(self.get(status="on_market")["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            response = self.get(status="on_market")
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.data["results"][0]["title"], "Cached house")
+
+    def test_retrieve_served_from_cache(self):
+        """Test repeated detail requests skip the database"""
+        path = f"/api/properties/{self.property.id}/"
+        self.get(path)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(path)["X-Cache"], "HIT")
+
+    def test_writes_invalidate(self):
+        """Test saving or deleting a property bumps the version"""
+        self.get()
+        self.property.title = "Renamed house"
+        self.property.save()
+        response = self.get()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["title"], "Renamed house")
+
+        Property.objects.get(pk=self.property.pk).delete()
+        self.assertEqual(self.get().data["results"], [])
+
+    def test_my_properties_scoped_per_user(self):
+        """Test `my_properties` responses are not shared between agents"""
+        self.get(my_properties="true")
+        other = create_test_user(username="other", email="other@example.com")
+        other.roles.add(UserRole.objects.get(name=UserRole.AGENT))
+        self.client.force_authenticate(user=other)
+        response = self.get(my_properties="true")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"], [])
+
+    def test_stale_while_revalidate(self):
+        """Test a stale response is served while another request rebuilds it"""
+        self.get()
+        self.property.title = "Renamed house"
+        self.property.save()
+
+        parts = ("testserver", "/api/properties/", [], None)
+        cache.add(f"{RESPONSE_PREFIX}:latest:{digest(*parts)}:lock", True)
+        response = self.get()
+        self.assertEqual(response["X-Cache"], "STALE")
+        self.assertEqual(response.data["results"][0]["title"], "Cached house")
+
+        cache.delete(f"{RESPONSE_PREFIX}:latest:{digest(*parts)}:lock")
+        self.assertEqual(self.get().data["results"][0]["title"], "Renamed house")
+
+    @override_settings(PROPERTY_RESPONSE_CACHE_STALE_TIMEOUT=0)
+    def test_without_stale_while_revalidate(self):
+        """Test a bumped version always rebuilds when stale serving is off"""
+        self.get()
+        self.property.save()
+        self.assertEqual(self.get()["X-Cache"], "MISS")
+
+    @override_settings(PROPERTY_RESPONSE_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        """Test a zero timeout turns the cache off"""
+        self.get()
+        self.assertNotIn("X-Cache", self.get())
+
+    def test_hit_rate(self):
+        """Test hits and misses are counted"""
+        reset_response_cache_stats()
+        self.get()
+        self.get()
+        self.get()
+        stats = response_cache_stats()
+        self.assertEqual((stats["hit"], stats["miss"]), (2, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+
+    def test_file_based_cache(self):
+        """Test the cache works on the file based backend"""
+        with tempfile.TemporaryDirectory() as location:
+            backend = "django.core.cache.backends.filebased.FileBasedCache"
+            with override_settings(
+                CACHES={"default": {"BACKEND": backend, "LOCATION": location}}
+            ):
+                self.get()
+                self.assertEqual(self.get()["X-Cache"], "HIT")
+                self.property.save()
+                self.assertEqual(self.get()["X-Cache"], "MISS")
@@ -0,0 +1,124 @@
+import json
+from decimal import Decimal
+
+from backend.api.properties.serializers import PropertySerializer
+from backend.api.properties.values import ValuesSerializer
+from backend.models import Property
+from backend.tests import create_test_agent, create_test_property
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import FloatField, Value
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+
+def render(data):
+    return json.loads(JSONRenderer().render(data))
+
+
+class PropertyValuesSerializerTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        cache.clear()
+        create_test_property(self.agent, price=Decimal("99.5"), size=Decimal("7"))
+        create_test_property(
+            self.agent,
+            title="Loft with a view",
+            property_type="commercial",
+            status="off_market",
+            price=Decimal("1234567890.99"),
+            latitude=Decimal("-33.868820"),
+            longitude=Decimal("151.209300"),
+        )
+        create_test_property(self.agent, latitude=Decimal("0"), longitude=Decimal("0"))
+        self.values = ValuesSerializer(PropertySerializer)
+
+    def expected(self, queryset):
+        return render(PropertySerializer(queryset, many=True).data)
+
+    def test_output_matches_model_serializer(self):
+        """Test rows render exactly like the model serializer renders instances"""
+        queryset = Property.objects.order_by("pk")
+
+        data = self.values.to_representation(
+            self.values.get_queryset(queryset), queryset
+        )
+        self.assertEqual(render(data), self.expected(queryset))
+        self.assertEqual(data[0]["price"], "99.50")
+        self.assertIsNone(data[0]["latitude"])
+        self.assertNotIn("distance", data[0])
+
+    def test_annotations_are_rendered_when_present(self):
+        """Test read-only annotations are included like on instances"""
+        queryset = Property.objects.annotate(
+            distance=Value(1.25, output_field=FloatField())
+        ).order_by("pk")
+
+        data = self.values.to_representation(
+            self.values.get_queryset(queryset), queryset
+        )
+        self.assertEqual(render(data), self.expected(queryset))
+        self.assertEqual(data[0]["distance"], 1.25)
+
+    def test_datetimes_follow_the_current_timezone(self):
+        """Test datetimes are converted like DRF does outside UTC"""
+        queryset = Property.objects.order_by("pk")
+
+        with timezone.override("America/New_York"):
+            data = self.values.to_representation(
+                self.values.get_queryset(queryset), queryset
+            )
+            self.assertEqual(render(data), self.expected(queryset))
+        self.assertFalse(data[0]["created_at"].endswith("Z"))
+
+    def test_list_endpoints_match_model_serializer(self):
+        """Test keyset, page number and radius lists render the same as before"""
+        ordered = Property.objects.order_by("-created_at", "-id")
+        for params in ({}, {"page": 1}, {"ordering": "price", "page": 1}):
+            with self.subTest(params=params):
+                response = self.client.get("/api/properties/", params)
+                self.assertEqual(response.status_code, 200)
+
+                results = json.loads(response.content)["results"]
+                if "ordering" in params:
+                    ordered = Property.objects.order_by("price")
+                self.assertEqual(results, self.expected(ordered))
+
+        response = self.client.get(
+            "/api/properties/", {"near": "-33.86,151.2", "radius_km": 10}
+        )
+        results = json.loads(response.content)["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["title"], "Loft with a view")
+        self.assertLess(results[0]["distance"], 10)
+
+    def test_writes_keep_validation(self):
+        """Test creating still runs the model serializer's validation"""
+        response = self.client.post(
+            "/api/properties/", {"title": "No price"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("price", response.data)
+
+    def test_rejects_fields_without_a_column(self):
+        """Test serializers computing fields cannot take the fast path"""
+
+        class ComputedSerializer(serializers.ModelSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Property
+                fields = ["id", "label"]
+
+            def get_label(self, obj):
+                return obj.title
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(ComputedSerializer).get_fields(Property.objects.all())
@@ -0,0 +1,188 @@
+from unittest import mock
+
+from backend.api.budgets import QueryBudgetMiddleware, get_query_budget
+from backend.api.properties.views import PropertyViewSet
+from backend.api.users.views import UserViewSet
+from backend.tests import (
+    assert_within_query_budget,
+    create_test_agent,
+    create_test_property,
+    create_test_user,
+)
+from backend.models import Property
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.property = create_test_property(
+            self.agent, latitude=45.5, longitude=-122.6
+        )
+        self.authenticate("agent")
+
+    def authenticate(self, username):
+        response = self.client.post(
+            "/api/token/", {"username": username, "password": "testpass123"}
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def assertWithinBudget(self, method, path, data=None):
+        """Request `path` with cold caches and check its action's budget"""
+        cache.clear()
+        response = assert_within_query_budget(
+            self, lambda: getattr(self.client, method)(path, data, format="json")
+        )
+        self.assertLess(response.status_code, 400, getattr(response, "data", None))
+        return response
+
+    def check_read_endpoints(self):
+        self.assertWithinBudget("get", "/api/properties/", {"page_size": 50})
+        self.assertWithinBudget("get", "/api/properties/", {"page": 1, "page_size": 50})
+        self.assertWithinBudget("get", "/api/properties/", {"search": "test"})
+        self.assertWithinBudget("get", f"/api/properties/{self.property.pk}/")
+        self.assertWithinBudget("get", "/api/properties/facets/")
+        self.assertWithinBudget("get", "/api/properties/export/")
+        self.assertWithinBudget(
+            "get", "/api/properties/clusters/", {"bbox": "-180,-90,180,90", "zoom": 3}
+        )
+        self.assertWithinBudget(
+            "get",
+            "/api/properties/clusters/",
+            {"bbox": "-123,45,-122,46", "zoom": 3, "city": "Test City"},
+        )
+        self.assertWithinBudget(
+            "get", "/api/properties/clusters/", {"bbox": "-123,45,-122,46", "zoom": 16}
+        )
+        self.assertWithinBudget("get", "/api/users/me/")
+
+    def test_read_budgets_hold_for_any_page_size(self):
+        """Test read endpoints run the same queries for one or many properties"""
+        self.check_read_endpoints()
+
+        for number in range(30):
+            create_test_property(
+                self.agent, title=f"Test {number}", latitude=45.5, longitude=-122.6
+            )
+        self.check_read_endpoints()
+
+    def test_write_budgets(self):
+        """Test property writes stay within their budgets"""
+        payload = {
+            "title": "Budgeted",
+            "description": "Within budget",
+            "property_type": "residential",
+            "price": "100000.00",
+            "size": "80.00",
+            "address": "1 Budget St",
+            "city": "Test City",
+            "state": "Test State",
+            "zip_code": "12345",
+        }
+        response = self.assertWithinBudget("post", "/api/properties/", payload)
+        url = f"/api/properties/{response.data['id']}/"
+        self.assertWithinBudget("patch", url, {"price": "110000.00"})
+        self.assertWithinBudget("delete", url)
+
+        items = [{**payload, "title": f"Bulk {number}"} for number in range(20)]
+        response = self.assertWithinBudget("post", "/api/properties/bulk/", items)
+        ids = [item["id"] for item in response.data["results"]]
+        self.assertWithinBudget(
+            "patch",
+            "/api/properties/bulk/",
+            [{"id": pk, "size": "90.00"} for pk in ids],
+        )
+        self.assertWithinBudget("delete", "/api/properties/bulk/", ids)
+
+    def test_user_budgets(self):
+        """Test user endpoints stay within their budgets"""
+        self.assertWithinBudget("get", "/api/users/")
+        self.assertWithinBudget("get", f"/api/users/{self.agent.pk}/")
+        self.assertWithinBudget("patch", "/api/users/me/", {"first_name": "Budget"})
+        self.assertWithinBudget(
+            "post",
+            "/api/users/change_password/",
+            {"old_password": "testpass123", "new_password": "newpass456"},
+        )
+
+        create_test_user()
+        self.authenticate("testuser")
+        self.assertWithinBudget("delete", "/api/users/delete_account/")
+
+    def test_exceeding_the_budget_fails(self):
+        """Test the helper reports the queries of an action over budget"""
+        with mock.patch.dict(PropertyViewSet.query_budgets, {"retrieve": 0}):
+            with self.assertRaisesMessage(
+                AssertionError,
+                "PropertyViewSet.retrieve ran 2 queries, its budget is 0",
+            ):
+                self.assertWithinBudget("get", f"/api/properties/{self.property.pk}/")
+
+    def test_every_action_has_a_budget(self):
+        """Test the API viewsets budget all of their actions"""
+        for viewset in (PropertyViewSet, UserViewSet):
+            actions = {
+                "list",
+                "retrieve",
+                "create",
+                "update",
+                "partial_update",
+                "destroy",
+            }
+            actions |= {action.__name__ for action in viewset.get_extra_actions()}
+            for action in actions:
+                with self.subTest(viewset=viewset.__name__, action=action):
+                    self.assertIsNotNone(get_query_budget(viewset(action=action)))
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    def get_response(self, request):
+        Property.objects.count()
+        response = Response()
+        response.renderer_context = {"view": PropertyViewSet(action="retrieve")}
+        return response
+
+    @override_settings(QUERY_BUDGET_WARNINGS=True)
+    def test_logs_violations(self):
+        """Test requests over budget are logged with their SQL and stack"""
+        middleware = QueryBudgetMiddleware(self.get_response)
+        request = RequestFactory().get("/api/properties/1/")
+
+        with mock.patch.dict(PropertyViewSet.query_budgets, {"retrieve": 0}):
+            with self.assertLogs("backend.api.budgets", "WARNING") as logs:
+                middleware(request)
+        self.assertIn("PropertyViewSet.retrieve ran 1 queries", logs.output[0])
+        self.assertIn("COUNT(*)", logs.output[0])
+        self.assertIn("get_response", logs.output[0])
+
+        with self.assertNoLogs("backend.api.budgets"):
+            middleware(request)
+
+    @override_settings(QUERY_BUDGET_WARNINGS=True)
+    def test_counts_streamed_queries(self):
+        """Test queries run while a response streams count against its budget"""
+
+        def get_response(request):
+            rows = (str(Property.objects.count()) for _ in range(2))
+            response = StreamingHttpResponse(rows)
+            response.renderer_context = {"view": PropertyViewSet(action="export")}
+            return response
+
+        middleware = QueryBudgetMiddleware(get_response)
+        response = middleware(RequestFactory().get("/api/properties/export/"))
+        with self.assertLogs("backend.api.budgets", "WARNING") as logs:
+            b"".join(response.streaming_content)
+        self.assertIn("PropertyViewSet.export ran 2 queries", logs.output[0])
+
+    @override_settings(QUERY_BUDGET_WARNINGS=False)
+    def test_disabled_by_default(self):
+        """Test the middleware drops out unless warnings are enabled"""
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryBudgetMiddleware(self.get_response)
@@ -0,0 +1,160 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+from unittest import skipUnless
+from zoneinfo import ZoneInfo
+
+from backend.api.parsers import ORJSONParser
+from backend.api.renderers import ORJSONRenderer, msgpack
+from backend.tests import create_test_agent, create_test_property
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+UTC = datetime.timezone.utc
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def assertSameBytes(self, data, accepted_media_type=None):
+        self.assertEqual(
+            ORJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_matches_json_renderer(self):
+        """Test the output is byte for byte what JSONRenderer writes"""
+        payloads = [
+            None,
+            [],
+            {"count": 2, "next": None, "results": [{"price": "100000.00"}]},
+            {"title": "Café «Sol» 東京", "emoji": "🏠", "escaped": 'a"b\\c\n\t'},
+            {"separators": "line\u2028paragraph\u2029"},
+            {"decimal": decimal.Decimal("12.50"), "float": 0.1, "int": -(2**40)},
+            {
+                "utc": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=UTC),
+                "zoned": datetime.datetime(
+                    2024, 5, 1, 12, 0, tzinfo=ZoneInfo("America/New_York")
+                ),
+                "naive": datetime.datetime(2024, 5, 1, 12, 0),
+                "date": datetime.date(2024, 5, 1),
+                "time": datetime.time(8, 15),
+            },
+            {"uuid": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+            {"lazy": gettext_lazy("Invalid cursor"), 1: "int key", "tuple": (1, 2)},
+            ReturnDict(
+                {"detail": ErrorDetail("Not found.", code="not_found")}, serializer=None
+            ),
+            ReturnList([{"id": 1}], serializer=None),
+            {"huge": 2**70},
+        ]
+        for data in payloads:
+            with self.subTest(data=data):
+                self.assertSameBytes(data)
+
+    def test_indented_output_keeps_json_renderer(self):
+        """Test `indent` in the Accept header still pretty prints"""
+        data = {"results": [{"id": 1}]}
+        self.assertSameBytes(data, "application/json; indent=4")
+        rendered = ORJSONRenderer().render(data, "application/json; indent=4")
+        self.assertIn(b"\n    ", rendered)
+
+    def test_non_finite_floats_raise(self):
+        """Test NaN and infinity are rejected like JSONRenderer rejects them"""
+        for value in (
+            float("nan"),
+            float("inf"),
+            -float("inf"),
+            decimal.Decimal("NaN"),
+        ):
+            data = {"next": None, "results": [{"distance": value}]}
+            for renderer in (JSONRenderer(), ORJSONRenderer()):
+                with (
+                    self.subTest(value=value, renderer=type(renderer).__name__),
+                    self.assertRaisesMessage(
+                        ValueError, "Out of range float values are not JSON compliant"
+                    ),
+                ):
+                    renderer.render(data)
+
+
+class ORJSONParserTests(SimpleTestCase):
+    def test_parses_utf8(self):
+        """Test request bodies parse like JSONParser"""
+        body = json.dumps({"title": "Café", "price": 1.5}).encode()
+
+        data = ORJSONParser().parse(io.BytesIO(body), parser_context={})
+        self.assertEqual(data, {"title": "Café", "price": 1.5})
+
+    def test_other_encodings(self):
+        """Test non UTF-8 bodies fall back to the stdlib decoder"""
+        body = '{"title": "Café"}'.encode("latin-1")
+
+        data = ORJSONParser().parse(
+            io.BytesIO(body), parser_context={"encoding": "latin-1"}
+        )
+        self.assertEqual(data, {"title": "Café"})
+
+    def test_invalid_json(self):
+        """Test malformed bodies are a parse error"""
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"title": '), parser_context={})
+
+
+class ContentNegotiationTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        create_test_property(self.agent, title="Café", latitude=45.5, longitude=-122.6)
+        cache.clear()
+
+    def test_json_responses_are_unchanged(self):
+        """Test API responses keep the exact JSONRenderer bytes"""
+        response = self.client.get("/api/properties/", {"near": "45.5,-122.6"})
+
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_malformed_json_request(self):
+        """Test malformed JSON bodies are rejected with 400"""
+        response = self.client.post(
+            "/api/properties/", data=b"{", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @skipUnless(msgpack, "requires msgpack")
+    def test_msgpack(self):
+        """Test MessagePack is negotiated for responses and request bodies"""
+        response = self.client.get(
+            "/api/properties/", HTTP_ACCEPT="application/msgpack"
+        )
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        expected = json.loads(JSONRenderer().render(response.data))
+        self.assertEqual(msgpack.unpackb(response.content), expected)
+
+        body = {
+            "title": "Packed",
+            "description": "Sent as MessagePack",
+            "property_type": "residential",
+            "price": "120000.00",
+            "size": "90.00",
+            "address": "1 Binary Rd",
+            "city": "Portland",
+            "state": "OR",
+            "zip_code": "97201",
+        }
+        response = self.client.post(
+            "/api/properties/",
+            data=msgpack.packb(body),
+            content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(msgpack.unpackb(response.content)["title"], "Packed")
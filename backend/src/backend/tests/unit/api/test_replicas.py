@@ -0,0 +1,169 @@
+import importlib.util
+import os
+from unittest import mock
+
+from backend import routers
+from backend.models import Property
+from backend.routers import ReplicaRouter, read_from_replica
+from backend.tests import create_test_agent, create_test_property, create_test_user
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.functional import Promise
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+class ReplicaSettingsTests(SimpleTestCase):
+    environ = {
+        "DB_NAME": "realwise",
+        "DB_REPLICAS": "replica-host, other-host/realwise_replica",
+        "REDIS_URL": "redis://redis:6379/0",
+    }
+
+    def load_settings(self, environ, pool=True):
+        """A fresh `backend.settings` module built from `environ`"""
+        spec = importlib.util.find_spec("backend.settings")
+        module = importlib.util.module_from_spec(spec)
+        find_spec = importlib.util.find_spec if pool else lambda name: None
+        with (
+            mock.patch.dict(os.environ, environ),
+            mock.patch("importlib.util.find_spec", find_spec),
+        ):
+            spec.loader.exec_module(module)
+        return module
+
+    def test_replicas(self):
+        """Test replicas copy the primary and mirror its test database"""
+        settings = self.load_settings(self.environ)
+        self.assertEqual(settings.DATABASE_REPLICAS, ["replica_1", "replica_2"])
+        replicas = [settings.DATABASES[alias] for alias in settings.DATABASE_REPLICAS]
+        self.assertEqual(
+            [(replica["HOST"], replica["NAME"]) for replica in replicas],
+            [("replica-host", "realwise"), ("other-host", "realwise_replica")],
+        )
+        for replica in replicas:
+            self.assertEqual(replica["TEST"], {"MIRROR": "default"})
+        # The gettext alias is not shadowed by parsing the replicas
+        self.assertIsInstance(settings.ADMIN_SITE_HEADER, Promise)
+
+    def test_replicas_need_redis(self):
+        """Test replicas are refused without a cache shared by every process"""
+        environ = {**self.environ, "REDIS_URL": ""}
+        with self.assertRaisesMessage(ImproperlyConfigured, "REDIS_URL"):
+            self.load_settings(environ)
+
+    def test_pool(self):
+        """Test every database gets the pool options, persistent connections without"""
+        settings = self.load_settings({**self.environ, "DB_POOL_MAX_SIZE": "4"})
+        for alias, database in settings.DATABASES.items():
+            with self.subTest(alias=alias):
+                self.assertEqual(
+                    database["OPTIONS"]["pool"],
+                    {"min_size": 2, "max_size": 4, "timeout": 10},
+                )
+                self.assertNotIn("CONN_MAX_AGE", database)
+
+        settings = self.load_settings(self.environ, pool=False)
+        for alias, database in settings.DATABASES.items():
+            with self.subTest(alias=alias):
+                self.assertNotIn("OPTIONS", database)
+                self.assertEqual(database["CONN_MAX_AGE"], 60)
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRouterTests(SimpleTestCase):
+    def test_reads(self):
+        """Test reads go to the request's replica, related objects stay put"""
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Property))
+
+        with read_from_replica() as alias:
+            self.assertEqual(alias, "replica")
+            self.assertEqual(router.db_for_read(Property), "replica")
+
+            instance = Property()
+            instance._state.db = "default"
+            self.assertEqual(router.db_for_read(Property, instance=instance), "default")
+        self.assertIsNone(router.db_for_read(Property))
+
+    def test_writes(self):
+        """Test writes always go to the primary"""
+        with read_from_replica():
+            self.assertEqual(ReplicaRouter().db_for_write(Property), "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        """Test everything stays on the primary without replicas"""
+        with read_from_replica() as alias:
+            self.assertIsNone(alias)
+            self.assertIsNone(ReplicaRouter().db_for_read(Property))
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], PROPERTY_RESPONSE_CACHE_TIMEOUT=0)
+class ReplicaReadTests(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        """Set up test data on the primary, the replica is left empty"""
+        cache.clear()
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        self.property = create_test_property(self.agent)
+
+    def get_count(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return len(response.data["results"])
+
+    def test_reads_go_to_replica(self):
+        """Test safe requests read the replica, not the primary"""
+        with CaptureQueriesContext(connections["default"]) as primary:
+            with CaptureQueriesContext(connections["replica"]) as replica:
+                self.assertEqual(self.get_count("/api/properties/"), 0)
+                self.assertEqual(self.get_count("/api/async/properties/"), 0)
+                response = self.client.get(f"/api/properties/{self.property.id}/")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(
+            [
+                query
+                for query in primary.captured_queries
+                if "backend_property" in query["sql"]
+            ]
+        )
+        self.assertTrue(replica.captured_queries)
+
+    def test_read_your_writes(self):
+        """Test a user reads from the primary for a while after writing"""
+        response = self.client.patch(
+            f"/api/properties/{self.property.id}/", {"title": "Renamed"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.get_count("/api/properties/"), 1)
+        self.assertEqual(self.get_count("/api/async/properties/"), 1)
+
+        other = create_test_user(username="other", email="other@example.com")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.get_count("/api/properties/"), 0)
+
+        cache.delete(routers.get_pin_key(self.agent.pk))
+        self.client.force_authenticate(user=self.agent)
+        self.assertEqual(self.get_count("/api/properties/"), 0)
+
+    def test_failed_writes_do_not_pin(self):
+        """Test rejected writes leave the user on the replica"""
+        response = self.client.post("/api/properties/", {}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(routers.is_pinned_to_primary(self.agent.pk))
+
+    @override_settings(DATABASE_REPLICA_STICKY_SECONDS=0)
+    def test_stickiness_can_be_disabled(self):
+        """Test no pin is kept without a sticky window"""
+        self.client.patch(
+            f"/api/properties/{self.property.id}/", {"title": "Renamed"}, format="json"
+        )
+        self.assertEqual(self.get_count("/api/properties/"), 0)
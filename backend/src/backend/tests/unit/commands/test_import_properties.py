@@ -0,0 +1,122 @@
+import csv
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from backend.models import Property, PropertyCluster
+from backend.tests import create_test_agent
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+HEADER = [
+    "external_id",
+    "title",
+    "description",
+    "property_type",
+    "price",
+    "size",
+    "address",
+    "city",
+    "state",
+    "zip_code",
+    "latitude",
+    "longitude",
+]
+
+
+def feed_row(external_id, **overrides):
+    row = {
+        "external_id": external_id,
+        "title": f"Listing {external_id}",
+        "description": "Imported listing",
+        "property_type": "residential",
+        "price": "250000.00",
+        "size": "120.00",
+        "address": "1 Feed St",
+        "city": "Portland",
+        "state": "OR",
+        "zip_code": "97201",
+        "latitude": "45.519000",
+        "longitude": "-122.679000",
+    }
+    row.update(overrides)
+    return row
+
+
+class ImportPropertiesTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.agent = create_test_agent()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_csv(self, rows, name="feed.csv"):
+        path = Path(self.directory.name) / name
+        with path.open("w", newline="") as file:
+            writer = csv.DictWriter(file, HEADER)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def run_import(self, path, *args):
+        out = StringIO()
+        call_command(
+            "import_properties", str(path), "--created-by", "agent", *args, stdout=out
+        )
+        return out.getvalue()
+
+    def test_import_csv(self):
+        """Test valid rows are created in batches and clusters rebuilt"""
+        rows = [feed_row(f"A{i}") for i in range(5)]
+        output = self.run_import(self.write_csv(rows), "--batch-size", "2")
+
+        self.assertIn("5 created, 0 updated, 0 rejected of 5 rows", output)
+        self.assertEqual(Property.objects.filter(created_by=self.agent).count(), 5)
+        imported = Property.objects.get(external_id="A3")
+        self.assertEqual(imported.title, "Listing A3")
+        self.assertTrue(imported.geohash)
+        self.assertEqual(PropertyCluster.objects.get(precision=1).count, 5)
+
+    def test_upsert_on_external_id(self):
+        """Test rows with a known external id update the property"""
+        self.run_import(self.write_csv([feed_row("A1"), feed_row("A2")]))
+        output = self.run_import(
+            self.write_csv([feed_row("A1", price="199000.00"), feed_row("A3")])
+        )
+
+        self.assertIn("1 created, 1 updated", output)
+        self.assertEqual(Property.objects.count(), 3)
+        self.assertEqual(str(Property.objects.get(external_id="A1").price), "199000.00")
+
+    def test_rejects_file(self):
+        """Test invalid rows are skipped and written with their errors"""
+        rejects = Path(self.directory.name) / "rejects.ndjson"
+        rows = [feed_row("A1"), feed_row("A2", price="free"), feed_row("A3", city="")]
+        output = self.run_import(self.write_csv(rows), "--rejects", str(rejects))
+
+        self.assertIn("1 created, 0 updated, 2 rejected of 3 rows", output)
+        lines = [json.loads(line) for line in rejects.read_text().splitlines()]
+        self.assertEqual([line["row"] for line in lines], [2, 3])
+        self.assertIn("price", lines[0]["errors"])
+        self.assertEqual(lines[0]["data"]["external_id"], "A2")
+
+    def test_dry_run(self):
+        """Test a dry run validates without writing"""
+        output = self.run_import(self.write_csv([feed_row("A1")]), "--dry-run")
+        self.assertIn("Dry run: 1 created", output)
+        self.assertFalse(Property.objects.exists())
+
+    def test_import_ndjson(self):
+        """Test NDJSON feeds, including a broken line"""
+        path = Path(self.directory.name) / "feed.ndjson"
+        path.write_text(json.dumps(feed_row("N1")) + "\n{broken\n\n")
+        output = self.run_import(path)
+        self.assertIn("1 created, 0 updated, 1 rejected of 2 rows", output)
+
+    def test_unknown_agent(self):
+        """Test the owner must exist"""
+        with self.assertRaises(CommandError):
+            call_command(
+                "import_properties", str(self.write_csv([])), "--created-by", "nobody"
+            )
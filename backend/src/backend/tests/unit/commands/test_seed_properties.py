@@ -0,0 +1,56 @@
+from io import StringIO
+
+from backend import seeding
+from backend.models import Property, PropertyCluster
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+SNAPSHOT_FIELDS = ("title", "price", "size", "city", "latitude", "status", "geohash")
+
+
+class SeedingTests(SimpleTestCase):
+    def test_chunks_are_reproducible(self):
+        """Test a chunk only depends on the seed and its number"""
+        seeding.init_catalog(7, 5, 1.0, 350_000, 0.6, 0.7)
+        first = seeding.generate_chunk(3, 20, 7)
+        seeding.generate_chunk(4, 20, 7)
+        seeding.init_catalog(7, 5, 1.0, 350_000, 0.6, 0.7)
+        self.assertEqual(seeding.generate_chunk(3, 20, 7), first)
+        self.assertNotEqual(seeding.generate_chunk(3, 20, 8), first)
+
+    def test_city_skew(self):
+        """Test the first city is the most popular one"""
+        seeding.init_catalog(1, 10, 1.5, 350_000, 0.6, 0.7)
+        rows = seeding.generate_chunk(0, 2000, 1)
+        cities = [row[seeding.FIELDS.index("city")] for row in rows]
+        top_city = seeding.catalog["cities"][0]["name"]
+        self.assertEqual(max(set(cities), key=cities.count), top_city)
+
+
+class SeedPropertiesTests(TestCase):
+    def seed(self, *args):
+        call_command("seed_properties", *args, stdout=StringIO())
+        return list(Property.objects.order_by("pk").values_list(*SNAPSHOT_FIELDS))
+
+    def test_seed(self):
+        """Test rows are spread over agents and clustered"""
+        self.seed(
+            "--count", "25", "--agents", "3", "--batch-size", "10", "--workers", "1"
+        )
+        self.assertEqual(Property.objects.count(), 25)
+        self.assertEqual(Property.objects.values("created_by").distinct().count(), 3)
+        self.assertEqual(
+            sum(
+                PropertyCluster.objects.filter(precision=1).values_list(
+                    "count", flat=True
+                )
+            ),
+            25,
+        )
+
+    def test_parallel_output_matches_serial(self):
+        """Test the worker count does not change the data"""
+        args = ("--count", "30", "--seed", "5", "--batch-size", "10")
+        serial = self.seed(*args, "--workers", "1")
+        Property.objects.all().delete()
+        self.assertEqual(self.seed(*args, "--workers", "2"), serial)
@@ -0,0 +1,89 @@
+from backend import geo
+from backend.tests import create_test_agent, create_test_property
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+
+class GeohashTests(SimpleTestCase):
+    def test_encode_known_point(self):
+        """Test encoding matches the reference geohash"""
+        self.assertEqual(geo.encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+
+    def test_covering_prefixes_include_center_cell(self):
+        """Test the cells covering a circle include the one of its center"""
+        prefixes = geo.covering_prefixes(45.5152, -122.6784, 5)
+        self.assertEqual(len(prefixes), 9)
+        self.assertIn(geo.encode(45.5152, -122.6784, len(prefixes[0])), prefixes)
+
+    def test_covering_prefixes_skip_huge_radius(self):
+        """Test circles larger than any cell are not prefiltered"""
+        self.assertEqual(geo.covering_prefixes(0, 0, 10_000), [])
+
+
+class PropertyGeoSearchTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        # Portland downtown, ~3km east of it, Seattle, and one without a location
+        self.downtown = create_test_property(
+            self.agent, latitude="45.519000", longitude="-122.679000"
+        )
+        self.east = create_test_property(
+            self.agent, latitude="45.520000", longitude="-122.640000"
+        )
+        self.seattle = create_test_property(
+            self.agent, latitude="47.606200", longitude="-122.332100"
+        )
+        self.unlocated = create_test_property(self.agent)
+
+    def search(self, **params):
+        response = self.client.get("/api/properties/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def test_save_sets_geohash(self):
+        """Test the geohash follows the coordinates"""
+        self.assertEqual(self.downtown.geohash, geo.encode(45.519, -122.679))
+        self.assertEqual(self.unlocated.geohash, "")
+
+        self.downtown.latitude, self.downtown.longitude = "47.6062", "-122.3321"
+        self.downtown.save(update_fields=["latitude", "longitude"])
+        self.downtown.refresh_from_db()
+        self.assertEqual(self.downtown.geohash, geo.encode(47.6062, -122.3321))
+
+    def test_radius_search(self):
+        """Test only properties within the radius are returned"""
+        results = self.search(
+            near="45.5152,-122.6784", radius_km=10, ordering="distance"
+        )
+        self.assertEqual(
+            [row["id"] for row in results], [self.downtown.id, self.east.id]
+        )
+        self.assertLess(results[0]["distance"], 1)
+        self.assertAlmostEqual(results[1]["distance"], 3, delta=0.5)
+
+    def test_nearest_first_without_radius(self):
+        """Test `near` alone orders every located property by distance"""
+        results = self.search(near="47.6,-122.33", ordering="distance")
+        self.assertEqual(
+            [row["id"] for row in results],
+            [self.seattle.id, self.east.id, self.downtown.id],
+        )
+
+    def test_distance_ordering_ignored_without_near(self):
+        """Test `ordering=distance` is ignored when there is nothing to measure"""
+        results = self.search(ordering="distance")
+        self.assertEqual(len(results), 4)
+        self.assertNotIn("distance", results[0])
+
+    def test_invalid_coordinates(self):
+        """Test malformed or out of range parameters are rejected"""
+        for params in (
+            {"near": "north"},
+            {"near": "91,0"},
+            {"near": "45,-122", "radius_km": "-1"},
+        ):
+            response = self.client.get("/api/properties/", params)
+            self.assertEqual(response.status_code, 400, params)
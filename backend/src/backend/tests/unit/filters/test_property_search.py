@@ -0,0 +1,57 @@
+from unittest import skipUnless
+
+from backend.tests import create_test_agent, create_test_property
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+
+class PropertySearchTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.agent = create_test_agent()
+        self.client.force_authenticate(user=self.agent)
+        self.cottage = create_test_property(
+            self.agent, title="Seaside cottage", description="Small house by the sea"
+        )
+        self.loft = create_test_property(
+            self.agent,
+            title="Downtown loft",
+            description="Loft close to the seaside promenade",
+            city="Portland",
+        )
+        self.office = create_test_property(
+            self.agent, title="Office space", description="Open plan offices"
+        )
+
+    def search(self, term, **params):
+        response = self.client.get("/api/properties/", {"search": term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_search_matches_all_words(self):
+        """Test every search word must match"""
+        self.assertEqual(self.search("downtown loft"), [self.loft.id])
+
+    def test_search_covers_city(self):
+        """Test the city column is searchable"""
+        self.assertEqual(self.search("portland"), [self.loft.id])
+
+    def test_search_respects_explicit_ordering(self):
+        """Test explicit ordering overrides relevance"""
+        self.assertEqual(
+            self.search("seaside", ordering="created_at"),
+            [self.cottage.id, self.loft.id],
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search needs Postgres")
+    def test_search_ranks_title_matches_first(self):
+        """Test title matches outrank description matches"""
+        self.assertEqual(self.search("seaside"), [self.cottage.id, self.loft.id])
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search needs Postgres")
+    def test_search_matches_prefix_and_stems(self):
+        """Test the last word matches as a prefix and words are stemmed"""
+        self.assertEqual(self.search("offic"), [self.office.id])
+        self.assertEqual(self.search("houses"), [self.cottage.id])
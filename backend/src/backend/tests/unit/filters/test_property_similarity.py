@@ -0,0 +1,40 @@
+from backend.api.properties.filters import PropertyFilter
+from backend.models import Property
+from backend.tests import create_test_agent, create_test_property
+from django.db import connection
+from django.test import TestCase
+
+
+def has_trigram_extension():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+class PropertyCitySimilarityTests(TestCase):
+    def setUp(self):
+        """Set up test data"""
+        if connection.vendor == "postgresql" and not has_trigram_extension():
+            self.skipTest("Trigram matching needs the pg_trgm extension")
+
+        self.agent = create_test_agent()
+        self.springfield = create_test_property(self.agent, city="Springfield")
+        self.portland = create_test_property(self.agent, city="Portland")
+
+    def filter(self, value):
+        return PropertyFilter(
+            {"city_similar": value}, queryset=Property.objects.all()
+        ).qs
+
+    def test_city_similar_matches_substring(self):
+        """Test exact fragments match"""
+        self.assertEqual(list(self.filter("spring")), [self.springfield])
+
+    def test_city_similar_matches_misspellings(self):
+        """Test misspelled city names match by trigram similarity"""
+        if connection.vendor != "postgresql":
+            self.skipTest("Trigram matching needs Postgres")
+
+        results = list(self.filter("Sprngfeld"))
+        self.assertEqual(results, [self.springfield])
+        self.assertGreater(results[0].city_similarity, 0.3)
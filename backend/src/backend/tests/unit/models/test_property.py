@@ -70,3 +70,15 @@ class PropertyModelTests(TestCase):
         properties = Property.objects.all()
         self.assertEqual(properties[0], property2)  # Most recent first
         self.assertEqual(properties[1], property1)
+
+    def test_search_vector_not_loaded(self):
+        """Test the search document is left out of property queries"""
+        loaded = Property.objects.get(pk=self.test_property.pk)
+        self.assertEqual(loaded.get_deferred_fields(), {"search_vector"})
+
+        loaded.title = "Renamed"
+        loaded.save()
+        self.assertEqual(Property.objects.get(pk=loaded.pk).title, "Renamed")
+        self.assertEqual(
+            self.agent.property_set.get().get_deferred_fields(), {"search_vector"}
+        )
@@ -1,7 +1,7 @@
 from backend.models import UserRole
 from backend.tests import create_test_user
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 
 User = get_user_model()
@@ -59,3 +59,49 @@ class UserModelTests(TestCase):
         )
         self.assertTrue(superuser.is_superuser)
         self.assertTrue(superuser.is_staff)
+
+    def test_role_checks_resolve_roles_once(self):
+        """Test role checks share a single roles query per user instance"""
+        self.test_user.add_role(UserRole.AGENT)
+        user = User.objects.get(pk=self.test_user.pk)
+        user.invalidate_role_names()
+
+        with self.assertNumQueries(1):
+            self.assertTrue(user.is_agent)
+            self.assertFalse(user.is_admin)
+            self.assertFalse(user.is_regular_user)
+
+    def test_role_checks_use_warm_cache(self):
+        """Test a fresh instance reads roles from the cache without queries"""
+        self.test_user.add_role(UserRole.AGENT)
+        self.assertTrue(self.test_user.is_agent)
+
+        user = User.objects.get(pk=self.test_user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(user.is_agent)
+
+    @override_settings(USER_ROLES_CACHE_TIMEOUT=0)
+    def test_role_cache_can_be_disabled(self):
+        """Test every instance loads its roles without a shared cache"""
+        self.test_user.add_role(UserRole.AGENT)
+        self.assertTrue(self.test_user.is_agent)
+
+        user = User.objects.get(pk=self.test_user.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(user.is_agent)
+
+    def test_role_changes_invalidate_cache(self):
+        """Test adding and removing roles is reflected immediately"""
+        self.assertTrue(self.test_user.is_regular_user)
+
+        self.test_user.add_role(UserRole.AGENT)
+        self.assertTrue(self.test_user.is_agent)
+        self.assertTrue(User.objects.get(pk=self.test_user.pk).is_agent)
+
+        self.test_user.remove_role(UserRole.AGENT)
+        self.assertFalse(self.test_user.is_agent)
+        self.assertTrue(UserRole.objects.filter(name=UserRole.AGENT).exists())
+
+        role = UserRole.objects.get(name=UserRole.AGENT)
+        role.users.add(self.test_user)
+        self.assertTrue(User.objects.get(pk=self.test_user.pk).is_agent)
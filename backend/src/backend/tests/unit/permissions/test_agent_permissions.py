@@ -1,5 +1,6 @@
-from backend.api.properties.permissions import IsAuthenticatedAndAgentForWrite
-from backend.tests import create_test_user, create_test_agent
+from backend.api.permissions import IsAuthenticatedAndAgentForWrite
+from backend.models import Property
+from backend.tests import create_test_agent, create_test_property, create_test_user
 from django.test import TestCase
 from rest_framework.test import APIRequestFactory
 
@@ -53,3 +54,18 @@ class AgentPermissionsTests(TestCase):
         request = self.factory.delete("/")
         request.user = self.agent
         self.assertTrue(self.permission.has_permission(request, None))
+
+    def test_object_permission_compares_owner_by_id(self):
+        """Test ownership checks do not load the owner row"""
+        property = create_test_property(self.agent)
+        property = Property.objects.get(pk=property.pk)
+        request = self.factory.put("/")
+        request.user = self.agent
+
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                self.permission.has_object_permission(request, None, property)
+            )
+
+        request.user = self.regular_user
+        self.assertFalse(self.permission.has_object_permission(request, None, property))
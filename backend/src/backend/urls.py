@@ -3,6 +3,13 @@ from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from backend.api.metrics import metrics_view
+from backend.api.properties.views import (
+    AsyncPropertyDetailView,
+    AsyncPropertyFacetsView,
+    AsyncPropertyListView,
+)
+from backend.api.users.views import AsyncUserMeView
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -20,8 +27,26 @@ urlpatterns = [
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/properties/", include("backend.api.properties.urls")),
     path("api/users/", include("backend.api.users.urls")),
+    # Async versions of the hot reads, served without a worker thread under ASGI
+    path(
+        "api/async/properties/",
+        AsyncPropertyListView.as_view(),
+        name="property-list-async",
+    ),
+    path(
+        "api/async/properties/facets/",
+        AsyncPropertyFacetsView.as_view(),
+        name="property-facets-async",
+    ),
+    path(
+        "api/async/properties/<pk>/",
+        AsyncPropertyDetailView.as_view(),
+        name="property-detail-async",
+    ),
+    path("api/async/users/me/", AsyncUserMeView.as_view(), name="user-me-async"),
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/metrics/", metrics_view, name="metrics"),
     path("admin/", admin.site.urls),
 ]
 